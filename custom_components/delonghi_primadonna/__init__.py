@@ -8,9 +8,14 @@ import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
 
+from .beverage import BeverageError
 from .const import BEVERAGE_SERVICE_NAME, DOMAIN
+from .coordinator import async_get_coordinator
 from .device import BeverageEntityFeature, DelongiPrimadonna
+from .model import async_get_machine_catalog
+from .statistics import async_get_statistics_catalogue
 
 PLATFORMS: list[str] = [
     Platform.IMAGE,
@@ -23,6 +28,11 @@ PLATFORMS: list[str] = [
     Platform.DEVICE_TRACKER,
 ]
 
+# Recipe values the make_beverage service may override
+BEVERAGE_OVERRIDES = (
+    'coffee_qty', 'milk_qty', 'water_qty', 'aroma', 'temperature'
+)
+
 __all__ = ['async_setup_entry', 'async_unload_entry', 'BeverageEntityFeature']
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,8 +42,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from a config entry"""
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = {}
-    delonghi_device = DelongiPrimadonna(entry.data, hass)
+    # Warm the catalog off the loop; the device looks its model up
+    await async_get_machine_catalog(hass)
+    delonghi_device = DelongiPrimadonna(
+        entry.data,
+        hass,
+        coordinator=async_get_coordinator(hass),
+        statistics_catalogue=await async_get_statistics_catalogue(hass),
+    )
+    await delonghi_device.async_load()
     hass.data[DOMAIN][entry.unique_id] = delonghi_device
+    delonghi_device.start()
     _LOGGER.debug('Device id %s', entry.unique_id)
     _LOGGER.debug("Device data %s", entry.data)
     hass.async_create_task(delonghi_device.get_device_name())
@@ -41,7 +60,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     async def make_beverage(call: ServiceCall) -> None:
         _LOGGER.debug('Make beverage %s', call.data)
-        await delonghi_device.beverage_start(call.data['beverage'])
+        overrides = {
+            key: call.data[key] for key in BEVERAGE_OVERRIDES
+            if key in call.data
+        }
+        try:
+            await delonghi_device.beverage_start(
+                call.data['beverage'],
+                profile=call.data.get('profile'),
+                **overrides,
+            )
+        except BeverageError as error:
+            raise HomeAssistantError(str(error)) from error
 
     hass.services.async_register(
         DOMAIN,
@@ -52,6 +82,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 vol.Required('beverage'): vol.In(
                     delonghi_device.available_beverages
                 ),
+                vol.Optional('profile'): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+                **{
+                    vol.Optional(key): vol.All(
+                        vol.Coerce(int), vol.Range(min=0)
+                    )
+                    for key in BEVERAGE_OVERRIDES
+                },
                 vol.Optional('entity_id'): vol.Coerce(str),
                 vol.Optional('device_id'): vol.Coerce(str),
             }
@@ -0,0 +1,148 @@
+"""Passive advertisement monitoring for Delonghi Primadonna.
+
+Advertisements arrive through Home Assistant's Bluetooth manager, so
+presence and signal strength are known without holding a connection.
+The layout of the manufacturer and service data is not documented;
+they are kept raw for diagnostics and changes are published, but no
+machine state is derived from them.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from binascii import hexlify
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.components import bluetooth
+from homeassistant.components.bluetooth import (BluetoothCallbackMatcher,
+                                                BluetoothChange,
+                                                BluetoothScanningMode,
+                                                BluetoothServiceInfoBleak)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import ADVERTISEMENT_RSSI_STEP, CONTROLL_CHARACTERISTIC
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdvertisementMonitor:
+    """Track presence, RSSI and payload of one machine's advertisements.
+
+    ``update_callback`` runs when the machine appears or disappears,
+    its payload changes or its RSSI moves by ``ADVERTISEMENT_RSSI_STEP``
+    or more, so a machine advertising every few hundred milliseconds
+    does not rewrite entity states each time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mac: str,
+        update_callback: Callable[[], None],
+    ) -> None:
+        """Initialize an idle monitor."""
+        self._hass = hass
+        self.mac = mac
+        self._update_callback = update_callback
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.present = False
+        self.rssi: int | None = None
+        self.name: str | None = None
+        self.manufacturer_data: bytes | None = None
+        self.service_data: bytes | None = None
+        self.last_seen: float | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Subscribe to the advertisements of the machine."""
+        if self._unsubs:
+            return
+        service_info = bluetooth.async_last_service_info(
+            self._hass, self.mac, connectable=False
+        )
+        if service_info is not None:
+            self._async_apply(service_info)
+        self._unsubs = [
+            bluetooth.async_register_callback(
+                self._hass,
+                self._async_advertisement,
+                BluetoothCallbackMatcher(address=self.mac, connectable=False),
+                BluetoothScanningMode.PASSIVE,
+            ),
+            bluetooth.async_track_unavailable(
+                self._hass,
+                self._async_unavailable,
+                self.mac,
+                connectable=False,
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from the advertisements."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the last advertisement for diagnostics."""
+        return {
+            'present': self.present,
+            'rssi': self.rssi,
+            'name': self.name,
+            'manufacturer_data': (
+                hexlify(self.manufacturer_data, ' ').decode()
+                if self.manufacturer_data is not None else None
+            ),
+            'service_data': (
+                hexlify(self.service_data, ' ').decode()
+                if self.service_data is not None else None
+            ),
+            'seconds_since_seen': (
+                round(time.monotonic() - self.last_seen, 1)
+                if self.last_seen is not None else None
+            ),
+        }
+
+    @callback
+    def _async_advertisement(
+        self, service_info: BluetoothServiceInfoBleak, change: BluetoothChange
+    ) -> None:
+        """Handle an advertisement of the machine."""
+        self._async_apply(service_info)
+
+    @callback
+    def _async_apply(self, service_info: BluetoothServiceInfoBleak) -> None:
+        """Store an advertisement and publish relevant changes."""
+        self.last_seen = time.monotonic()
+        manufacturer_data = (
+            # The most recently added company id holds the newest payload
+            list(service_info.manufacturer_data.values())[-1]
+            if service_info.manufacturer_data else None
+        )
+        service_data = service_info.service_data.get(CONTROLL_CHARACTERISTIC)
+        changed = (
+            not self.present
+            or manufacturer_data != self.manufacturer_data
+            or service_data != self.service_data
+            or self.rssi is None
+            or abs(service_info.rssi - self.rssi) >= ADVERTISEMENT_RSSI_STEP
+        )
+        self.present = True
+        self.name = service_info.name
+        self.manufacturer_data = manufacturer_data
+        self.service_data = service_data
+        if changed:
+            self.rssi = service_info.rssi
+            self._update_callback()
+
+    @callback
+    def _async_unavailable(
+        self, service_info: BluetoothServiceInfoBleak
+    ) -> None:
+        """Mark the machine away once Home Assistant stops seeing it."""
+        _LOGGER.debug("%s is no longer advertising", self.mac)
+        self.present = False
+        self.rssi = None
+        self._update_callback()
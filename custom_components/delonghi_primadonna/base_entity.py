@@ -1,14 +1,19 @@
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DOMAIN
-from .device import DelongiPrimadonna
+from .device import DelongiPrimadonna, DeviceUpdate
 
 
 class DelonghiDeviceEntity:
     """Entity class for the Delonghi devices"""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    # Device updates that change the state of the entity
+    _update_types: frozenset[DeviceUpdate] = frozenset()
 
     def __init__(self, delongh_device, hass: HomeAssistant):
         """Init entity with the device"""
@@ -19,6 +24,24 @@ class DelonghiDeviceEntity:
         self.device: DelongiPrimadonna = delongh_device
         self.hass = hass
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the device updates."""
+        await super().async_added_to_hass()
+        if self._update_types:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    self.device.update_signal,
+                    self._async_device_updated,
+                )
+            )
+
+    @callback
+    def _async_device_updated(self, updates: frozenset[DeviceUpdate]) -> None:
+        """Write the state when a relevant part of the device changed."""
+        if updates & self._update_types:
+            self.async_write_ha_state()
+
     @property
     def device_info(self):
         """Shared device info information"""
@@ -0,0 +1,238 @@
+"""Beverage start frames compiled from machine recipes.
+
+A start request is ``0d LEN 83 f0 RECIPE 01``, one ``[id][value]``
+record per ingredient and the trailer byte ``06``. Coffee, milk and
+hot water quantities take two big-endian bytes, every other value one.
+The ingredient order follows the frames recorded from the official
+app: quantities and taste by id, then the temperature for coffee
+recipes or the accessory flag for the others.
+
+A :class:`BeverageProgram` works the layout and the bounds of a recipe
+out once. Frames are memoised per recipe, layout and values, so
+repeating a beverage costs a dictionary lookup.
+
+Only recipes whose every ingredient has a known record, and whose
+quantities and bounds are set in the catalog, compile. Anything else
+raises :class:`BeverageError` rather than guessing a frame.
+"""
+
+from __future__ import annotations
+
+from enum import IntEnum
+from functools import lru_cache
+from typing import NamedTuple
+
+from .machine_entities import Recipe
+from .protocol import REQUEST_START, seal_payload
+
+BEVERAGE_MESSAGE_ID = 0x83
+BEVERAGE_START = 0x01
+BEVERAGE_TRAILER = 0x06
+
+# Distinct start frames kept
+BEVERAGE_CACHE_SIZE = 64
+
+# Taste: 0 is pre-ground coffee, 1 to 5 extra mild to extra strong
+TASTE_RANGE = (0, 5)
+DEFAULT_TASTE = 3
+TEMPERATURE_RANGE = (0, 3)
+DEFAULT_TEMPERATURE = 0
+
+
+class Ingredient(IntEnum):
+    """Ingredient ids used in start frames."""
+
+    TEMPERATURE = 0
+    COFFEE = 1
+    TASTE = 2
+    DOUBLE = 8
+    MILK = 9
+    HOT_WATER = 15
+    ACCESSORY = 28
+
+
+# Ingredients whose value takes two bytes
+WIDE_INGREDIENTS = frozenset(
+    {Ingredient.COFFEE, Ingredient.MILK, Ingredient.HOT_WATER}
+)
+# Recipe flags that the recorded start frames never carry
+RECIPE_FLAGS = frozenset({24, 25})
+
+
+class BeverageError(ValueError):
+    """A beverage parameter is unknown or out of bounds."""
+
+
+class Parameter(NamedTuple):
+    """One ingredient record of a start frame."""
+
+    ingredient: Ingredient
+    # Name of the override, None for fixed values
+    option: str | None
+    default: int
+    low: int
+    high: int
+
+
+def _quantity(
+    recipe: Recipe,
+    ingredient: Ingredient,
+    default: int | None,
+    low: int | None,
+    high: int | None,
+) -> tuple[int, int, int]:
+    """Return the default and bounds of a quantity set in the recipe."""
+    if not (default and low and high and low <= default <= high):
+        raise BeverageError(
+            f"Recipe {recipe.id} has no "
+            f"{ingredient.name.lower().replace('_', ' ')} quantity "
+            f"within bounds (default {default}, bounds {low} to {high})"
+        )
+    return default, low, high
+
+
+def recipe_parameters(recipe: Recipe) -> tuple[Parameter, ...]:
+    """Return the ingredient records of a recipe in frame order.
+
+    Raises :class:`BeverageError` for a recipe that uses an ingredient
+    without a known record or lacks a quantity or its bounds.
+    """
+    try:
+        ingredients = {int(ingredient) for ingredient in recipe.ingredients}
+    except ValueError as error:
+        raise BeverageError(
+            f"Recipe {recipe.id} has an invalid ingredient: {error}"
+        ) from error
+    ingredients -= RECIPE_FLAGS
+    if not ingredients:
+        raise BeverageError(f"Recipe {recipe.id} has no ingredients")
+    coffee = Ingredient.COFFEE in ingredients
+    # Coffee recipes end with the temperature, the others with the
+    # accessory flag
+    supported = set(Ingredient) - {
+        Ingredient.ACCESSORY if coffee else Ingredient.TEMPERATURE
+    }
+    unsupported = ingredients.difference(supported)
+    if unsupported:
+        raise BeverageError(
+            f"Recipe {recipe.id} uses unsupported ingredients "
+            f"{', '.join(map(str, sorted(unsupported)))}"
+        )
+    if coffee and Ingredient.HOT_WATER in ingredients:
+        # The catalog has no hot water quantity for coffee recipes
+        raise BeverageError(
+            f"Recipe {recipe.id} has no hot water quantity"
+        )
+    parameters: list[Parameter] = []
+    if coffee:
+        parameters.append(Parameter(
+            Ingredient.COFFEE, 'coffee_qty', *_quantity(
+                recipe, Ingredient.COFFEE,
+                recipe.coffee_qty, recipe.min_coffee, recipe.max_coffee,
+            ),
+        ))
+    if Ingredient.TASTE in ingredients:
+        parameters.append(Parameter(
+            Ingredient.TASTE, 'aroma', recipe.taste or DEFAULT_TASTE,
+            *TASTE_RANGE,
+        ))
+    if Ingredient.DOUBLE in ingredients:
+        parameters.append(Parameter(Ingredient.DOUBLE, None, 0, 0, 0))
+    if Ingredient.MILK in ingredients:
+        parameters.append(Parameter(
+            Ingredient.MILK, 'milk_qty', *_quantity(
+                recipe, Ingredient.MILK,
+                recipe.milk_qty, recipe.min_milk, recipe.max_milk,
+            ),
+        ))
+    if Ingredient.HOT_WATER in ingredients:
+        # Water-only recipes keep the water in the coffee fields
+        parameters.append(Parameter(
+            Ingredient.HOT_WATER, 'water_qty', *_quantity(
+                recipe, Ingredient.HOT_WATER,
+                recipe.coffee_qty, recipe.min_coffee, recipe.max_coffee,
+            ),
+        ))
+    if coffee:
+        parameters.append(Parameter(
+            Ingredient.TEMPERATURE, 'temperature', DEFAULT_TEMPERATURE,
+            *TEMPERATURE_RANGE,
+        ))
+    else:
+        parameters.append(Parameter(Ingredient.ACCESSORY, None, 1, 1, 1))
+    return tuple(parameters)
+
+
+@lru_cache(maxsize=BEVERAGE_CACHE_SIZE)
+def encode_start(
+    recipe_id: int,
+    ingredients: tuple[Ingredient, ...],
+    values: tuple[int, ...],
+) -> bytes:
+    """Return the sealed start frame for ingredient values."""
+    body = bytearray((0xF0, recipe_id, BEVERAGE_START))
+    for ingredient, value in zip(ingredients, values):
+        body.append(ingredient)
+        body += value.to_bytes(
+            2 if ingredient in WIDE_INGREDIENTS else 1, 'big'
+        )
+    body.append(BEVERAGE_TRAILER)
+    # The length byte counts the CRC as well
+    return seal_payload(
+        bytes((REQUEST_START, len(body) + 4, BEVERAGE_MESSAGE_ID)) + body
+    )
+
+
+class BeverageProgram:
+    """Start frames of one recipe, checked against its bounds."""
+
+    __slots__ = ('name', 'recipe_id', 'parameters', 'options',
+                 '_ingredients', '_defaults', 'default_frame')
+
+    def __init__(
+        self, name: str, recipe_id: int, parameters: tuple[Parameter, ...]
+    ) -> None:
+        """Compile a recipe and its frame with default values."""
+        if not 0 <= recipe_id <= 0xFF:
+            raise BeverageError(f"Recipe id {recipe_id} does not fit a byte")
+        self.name = name
+        self.recipe_id = recipe_id
+        self.parameters = parameters
+        self.options = frozenset(
+            parameter.option for parameter in parameters if parameter.option
+        )
+        self._ingredients = tuple(
+            parameter.ingredient for parameter in parameters
+        )
+        self._defaults = tuple(
+            min(max(parameter.default, parameter.low), parameter.high)
+            for parameter in parameters
+        )
+        self.default_frame = encode_start(
+            recipe_id, self._ingredients, self._defaults
+        )
+
+    @classmethod
+    def from_recipe(cls, name: str, recipe: Recipe) -> BeverageProgram:
+        """Compile a recipe of the machine catalog."""
+        return cls(name, int(recipe.id), recipe_parameters(recipe))
+
+    def start_frame(self, **overrides: int) -> bytes:
+        """Return the start frame with some values overridden."""
+        if not overrides:
+            return self.default_frame
+        unknown = overrides.keys() - self.options
+        if unknown:
+            raise BeverageError(
+                f"{self.name} does not support {', '.join(sorted(unknown))}"
+            )
+        values = []
+        for parameter, default in zip(self.parameters, self._defaults):
+            value = overrides.get(parameter.option, default)
+            if not parameter.low <= value <= parameter.high:
+                raise BeverageError(
+                    f"{parameter.option} of {self.name} must be between "
+                    f"{parameter.low} and {parameter.high}, got {value}"
+                )
+            values.append(value)
+        return encode_start(self.recipe_id, self._ingredients, tuple(values))
@@ -10,7 +10,7 @@ from homeassistant.helpers.restore_state import RestoreEntity
 
 from .base_entity import DelonghiDeviceEntity
 from .const import DOMAIN
-from .device import DelongiPrimadonna
+from .device import DelongiPrimadonna, DeviceUpdate
 
 
 async def async_setup_entry(
@@ -41,12 +41,12 @@ class DelongiPrimadonnaEnabledSensor(
     _attr_device_class = BinarySensorDeviceClass.RUNNING
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'enabled'
+    _update_types = frozenset({DeviceUpdate.STATUS, DeviceUpdate.CONNECTION})
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         if (last_state := await self.async_get_last_state()) is not None:
             self._attr_is_on = last_state.state == 'on'
-            self.device.switches.is_on = self._attr_is_on
 
     @property
     def icon(self) -> str:
@@ -76,6 +76,7 @@ class DelongiPrimadonnaDescaleSensor(
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'descaling'
+    _update_types = frozenset({DeviceUpdate.ALARMS})
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -108,6 +109,7 @@ class DelongiPrimadonnaFilterSensor(
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'filter'
+    _update_types = frozenset({DeviceUpdate.ALARMS})
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -0,0 +1,167 @@
+"""Raw packet capture and replay for Delonghi Primadonna.
+
+Received chunks are stored as they arrived from Bleak, before frame
+assembly, so a replay exercises the decoder exactly like the live
+link did. See :mod:`.capture_format` for the file layout.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .capture_format import FILE_HEADER, RECORD, Direction, iter_capture
+from .const import CAPTURE_FLUSH_INTERVAL, CAPTURE_MAX_BYTES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Flush early once this much is buffered
+_FLUSH_SIZE = 16 * 1024
+
+
+def _read_received(path: str | os.PathLike) -> list[tuple[int, bytes]]:
+    """Return ``(timestamp_ns, payload)`` of the received packets."""
+    return [
+        (timestamp, payload)
+        for direction, timestamp, payload in iter_capture(path)
+        if direction is Direction.RX
+    ]
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    path: str | os.PathLike,
+    receive: Callable[[str, bytearray], None],
+    speed: float = 1.0,
+) -> int:
+    """Feed the received packets of a capture to ``receive``.
+
+    The capture is read in the executor. ``speed`` scales the original
+    timing; 0 replays as fast as possible. Return the number of
+    packets fed.
+    """
+    records = await hass.async_add_executor_job(_read_received, path)
+    first: int | None = None
+    started = time.monotonic()
+    for timestamp, payload in records:
+        if speed > 0:
+            if first is None:
+                first = timestamp
+            due = started + (timestamp - first) / 1e9 / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        receive('replay', bytearray(payload))
+    return len(records)
+
+
+class PacketCapture:
+    """Rolling binary capture of raw BLE traffic.
+
+    Records are buffered in memory and appended to the file from the
+    executor. When the file would exceed ``max_bytes`` it is moved to
+    ``<path>.1`` and a new one is started, so at most two files exist.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str | os.PathLike,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+    ) -> None:
+        """Initialize an idle capture."""
+        self._hass = hass
+        self.path = Path(path)
+        self._max_bytes = max_bytes
+        self._buffer = bytearray()
+        self._flushing: asyncio.Future | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self.records = 0
+
+    @callback
+    def record(self, direction: Direction, data: bytes | bytearray) -> None:
+        """Buffer one packet."""
+        self._buffer += RECORD.pack(
+            direction, time.monotonic_ns(), len(data)
+        )
+        self._buffer += data
+        self.records += 1
+        if len(self._buffer) >= _FLUSH_SIZE:
+            self.async_flush()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, CAPTURE_FLUSH_INTERVAL, self._async_timer
+            )
+
+    @callback
+    def async_flush(self) -> asyncio.Future | None:
+        """Write the buffered records unless a write is running."""
+        if not self._buffer or (
+            self._flushing is not None and not self._flushing.done()
+        ):
+            return self._flushing
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._flushing = self._hass.async_add_executor_job(
+            self._write, chunk
+        )
+        self._flushing.add_done_callback(self._flushed)
+        return self._flushing
+
+    async def async_close(self) -> None:
+        """Write everything that is still buffered."""
+        while (future := self.async_flush()) is not None:
+            # Write errors are logged by the done callback
+            await asyncio.wait((future,))
+            if not self._buffer:
+                break
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _async_timer(self, now: datetime) -> None:
+        """Flush on the periodic timer."""
+        self._unsub_flush = None
+        self.async_flush()
+
+    @callback
+    def _flushed(self, future: asyncio.Future) -> None:
+        """Log write errors and pick up records buffered meanwhile."""
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.warning(
+                "Failed to write packet capture %s: %s",
+                self.path,
+                future.exception(),
+            )
+        if len(self._buffer) >= _FLUSH_SIZE:
+            self.async_flush()
+        elif self._buffer and self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, CAPTURE_FLUSH_INTERVAL, self._async_timer
+            )
+
+    def _write(self, chunk: bytes) -> None:
+        """Append a chunk, rolling the file over when it is full."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(chunk) > self._max_bytes:
+            os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+            size = 0
+        with self.path.open('ab') as file:
+            if size == 0:
+                file.write(FILE_HEADER)
+            file.write(chunk)
@@ -0,0 +1,52 @@
+"""Record layout of Delonghi Primadonna packet captures.
+
+A capture file starts with ``MAGIC`` and a format version byte,
+followed by length-prefixed records: direction (1 byte), monotonic
+timestamp in nanoseconds (8 bytes), payload length (2 bytes), all big
+endian, then the payload.
+
+This module has no package imports so scripts can read captures
+without Home Assistant.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from collections.abc import Iterator
+from enum import IntEnum
+
+MAGIC = b'DLCP'
+FORMAT_VERSION = 1
+
+FILE_HEADER = MAGIC + bytes((FORMAT_VERSION,))
+RECORD = struct.Struct('>BQH')
+
+
+class Direction(IntEnum):
+    """Direction of a captured packet."""
+
+    RX = 0
+    TX = 1
+
+
+def iter_capture(path: str | os.PathLike) -> Iterator[
+    tuple[Direction, int, bytes]
+]:
+    """Yield ``(direction, timestamp_ns, payload)`` from a capture."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f'{path} is not a packet capture')
+    if data[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError(f'Unsupported capture format {data[len(MAGIC)]}')
+    offset = len(FILE_HEADER)
+    while offset + RECORD.size <= len(data):
+        direction, timestamp, size = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        payload = data[offset:offset + size]
+        if len(payload) < size:
+            # Truncated by a crash while writing
+            return
+        offset += size
+        yield Direction(direction), timestamp, payload
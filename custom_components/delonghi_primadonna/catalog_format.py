@@ -0,0 +1,126 @@
+"""Compact binary form of the bundled machine catalog.
+
+The blob starts with a fixed header (magic, format version, index
+size), followed by a zlib compressed JSON index with the catalog
+metadata and the header fields of every machine, and then one zlib
+compressed block per distinct recipe list. Machines refer to their
+block by number, so recipe lists shared by several models are stored
+once. Recipes are kept as value rows in ``RECIPE_FIELDS`` order.
+
+This module has no package imports so the build script can load it
+without Home Assistant.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import Any
+
+MAGIC = b'DLMC'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('>4sHI')
+
+RECIPE_FIELDS = (
+    'id',
+    'name',
+    'taste',
+    'coffee_qty',
+    'milk_qty',
+    'min_coffee',
+    'max_coffee',
+    'min_milk',
+    'max_milk',
+    'ingredients',
+    'useForCustomRecipes',
+)
+
+
+def _dump(value: Any) -> bytes:
+    """Serialize a value as compact JSON."""
+    return json.dumps(
+        value, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+
+
+def encode_catalog(data: dict[str, Any]) -> bytes:
+    """Pack the parsed ``MachinesModels.json`` into a catalog blob."""
+    blocks: list[bytes] = []
+    block_numbers: dict[bytes, int] = {}
+    machines: list[list[Any]] = []
+    for machine in data.get('machines', []):
+        rows = [
+            [recipe.get(name) for name in RECIPE_FIELDS]
+            for recipe in machine.get('recipes', [])
+        ]
+        raw = _dump(rows)
+        number = block_numbers.setdefault(raw, len(blocks))
+        if number == len(blocks):
+            blocks.append(zlib.compress(raw, 9))
+        header = {
+            key: value for key, value in machine.items() if key != 'recipes'
+        }
+        machines.append([header, number])
+
+    offsets: list[list[int]] = []
+    offset = 0
+    for block in blocks:
+        offsets.append([offset, len(block)])
+        offset += len(block)
+
+    index = zlib.compress(
+        _dump(
+            {
+                'result': data.get('result', {}),
+                'name': data.get('name'),
+                'version': data.get('version'),
+                'recipe_fields': RECIPE_FIELDS,
+                'machines': machines,
+                'blocks': offsets,
+            }
+        ),
+        9,
+    )
+    return b''.join(
+        [_HEADER.pack(MAGIC, FORMAT_VERSION, len(index)), index, *blocks]
+    )
+
+
+class CatalogBlob:
+    """Read access to a catalog blob.
+
+    Only the index is decompressed on construction. Recipe blocks stay
+    compressed until :meth:`recipes` asks for one of them.
+    """
+
+    def __init__(self, blob: bytes) -> None:
+        """Validate the blob header and decode the index."""
+        if len(blob) < _HEADER.size:
+            raise ValueError('Machine catalog blob is truncated')
+        magic, version, index_size = _HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise ValueError('Not a machine catalog blob')
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f'Unsupported machine catalog format {version}'
+            )
+        start = _HEADER.size
+        self._blob = blob
+        self._base = start + index_size
+        index = json.loads(zlib.decompress(blob[start:self._base]))
+        self.result: dict[str, Any] = index['result']
+        self.name: str | None = index['name']
+        self.version: str | None = index['version']
+        self._fields: tuple[str, ...] = tuple(index['recipe_fields'])
+        self._blocks: list[list[int]] = index['blocks']
+        # (header fields, recipe block number) per machine
+        self.machines: list[list[Any]] = index['machines']
+
+    def recipes(self, block: int) -> list[dict[str, Any]]:
+        """Decode one recipe block into recipe dictionaries."""
+        offset, size = self._blocks[block]
+        start = self._base + offset
+        rows = json.loads(zlib.decompress(self._blob[start:start + size]))
+        return [dict(zip(self._fields, row)) for row in rows]
@@ -0,0 +1,175 @@
+"""Command pipelining for Delonghi Primadonna."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+from homeassistant.core import callback
+
+from .const import MAX_IN_FLIGHT_COMMANDS, RESPONSE_TIMEOUT
+from .coordinator import Priority
+from .metrics import DeviceMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandScheduler:
+    """Match outstanding commands with their responses.
+
+    The machine answers with the request ID (byte 2) of the command,
+    so every command waits on its own future in a per-ID FIFO instead
+    of on a single shared event. Up to ``max_in_flight`` commands may
+    be outstanding at the same time.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bytes, Priority], Awaitable[None]],
+        max_in_flight: int = MAX_IN_FLIGHT_COMMANDS,
+        timeout: float = RESPONSE_TIMEOUT,
+        metrics: DeviceMetrics | None = None,
+    ) -> None:
+        """Initialize the scheduler with a raw frame writer."""
+        self._write = write
+        self._metrics = metrics
+        self._timeout = timeout
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._pending: dict[int, deque[asyncio.Future]] = defaultdict(deque)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of commands awaiting a response."""
+        return sum(len(waiters) for waiters in self._pending.values())
+
+    async def async_submit(
+        self, frame: bytes, priority: Priority = Priority.CONTROL
+    ) -> asyncio.Future:
+        """Write a frame and return a future for its response.
+
+        The future resolves to the response frame or fails with
+        ``asyncio.TimeoutError`` when the machine does not answer.
+        """
+        loop = asyncio.get_running_loop()
+        waiting = loop.time()
+        await self._slots.acquire()
+        started = loop.time()
+        if self._metrics is not None:
+            self._metrics.lock_wait.record(started - waiting)
+        answer_id = frame[2]
+        future = loop.create_future()
+        waiters = self._pending[answer_id]
+        waiters.append(future)
+        future.add_done_callback(partial(self._release, answer_id, started))
+        try:
+            await self._write(frame, priority)
+        except BaseException:
+            # Nothing was sent, so no response can be matched to it
+            if future in waiters:
+                waiters.remove(future)
+            future.cancel()
+            raise
+        # The response timeout runs from the end of the write
+        if not future.done():
+            timer = loop.call_later(self._timeout, self._expire, future)
+            future.add_done_callback(lambda _: timer.cancel())
+        return future
+
+    async def async_request(
+        self, frame: bytes, priority: Priority = Priority.CONTROL
+    ) -> bytes:
+        """Write a frame and wait for its response."""
+        return await (await self.async_submit(frame, priority))
+
+    @callback
+    def async_resolve(self, frame: bytes | memoryview) -> bool:
+        """Hand a received frame to the oldest matching request.
+
+        The frame is copied only when a request is waiting for it.
+        """
+        if len(frame) < 3:
+            return False
+        waiters = self._pending.get(frame[2])
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(bytes(frame))
+                return True
+        return False
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Cancel every outstanding request."""
+        for waiters in self._pending.values():
+            for future in list(waiters):
+                future.cancel()
+
+    @staticmethod
+    def _expire(future: asyncio.Future) -> None:
+        """Fail a request that got no response in time."""
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+
+    def _release(
+        self,
+        answer_id: int,
+        started: float,
+        future: asyncio.Future,
+    ) -> None:
+        """Free the in-flight slot of a finished request."""
+        if self._metrics is not None and not future.cancelled():
+            if future.exception() is None:
+                self._metrics.record_response(
+                    answer_id, future.get_loop().time() - started
+                )
+            elif isinstance(future.exception(), asyncio.TimeoutError):
+                self._metrics.record_timeout(answer_id)
+        waiters = self._pending.get(answer_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+        self._slots.release()
+
+
+class CoalescedWriter:
+    """Collapse bursts of state changes into as few writes as possible.
+
+    Every call marks the state dirty. One task waits out the cooldown
+    and writes the state as it is then; a change made while that write
+    is in flight marks it dirty again, so the task keeps writing until
+    nothing changed during the last write.
+    """
+
+    def __init__(
+        self, write: Callable[[], Awaitable[None]], cooldown: float
+    ) -> None:
+        """Initialize the writer with the function that sends the state."""
+        self._write = write
+        self._cooldown = cooldown
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+
+    async def async_call(self) -> None:
+        """Mark the state changed and wait until it has been written."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        # One caller giving up must not cancel the write for the others
+        await asyncio.shield(self._task)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop any pending change and stop the running write."""
+        self._dirty = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        """Write until the state stops changing."""
+        while self._dirty:
+            await asyncio.sleep(self._cooldown)
+            self._dirty = False
+            await self._write()
@@ -0,0 +1,33 @@
+"""Request frames for Delonghi Primadonna.
+
+The layouts live in :mod:`.protocol`; this module exposes the compiled
+requests under the names the device uses and seals hand-built frames,
+such as the beverage commands and those typed into the debug text
+entity.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from . import protocol
+from .protocol import seal_payload
+
+
+def seal(message: Sequence[int]) -> bytes:
+    """Return a request with its two trailing CRC bytes filled in."""
+    return seal_payload(bytes(message[:-2]))
+
+
+POWER = protocol.POWER.render()
+STATUS_REQUEST = protocol.STATUS_REQUEST.render()
+
+SWITCHES = protocol.SWITCHES
+AUTO_POWER_OFF = protocol.AUTO_POWER_OFF
+WATER_HARDNESS = protocol.WATER_HARDNESS
+WATER_TEMPERATURE = protocol.WATER_TEMPERATURE
+SET_TIME = protocol.SET_TIME
+STATISTICS = protocol.STATISTICS
+LOAD_PROFILES = protocol.LOAD_PROFILES
+SELECT_PROFILE = protocol.SELECT_PROFILE
+BEVERAGE_STOP = protocol.BEVERAGE_STOP
@@ -10,38 +10,47 @@ import voluptuous
 from homeassistant import config_entries
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
 from homeassistant.const import CONF_MAC, CONF_MODEL, CONF_NAME
+from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import (SelectOptionDict, SelectSelector,
                                             SelectSelectorConfig,
                                             SelectSelectorMode)
 
-from .const import DOMAIN
-from .model import get_machine_models_by_connection, guess_machine_model
+from .const import CONF_KEEP_ALIVE, DOMAIN, KEEP_ALIVE_INTERVAL
+from .model import async_get_machine_catalog, guess_machine_model
 
 _LOGGER = logging.getLogger(__name__)
 
 
-MODEL_OPTIONS = [
-    SelectOptionDict(value=model.product_code, label=model.name)
-    for model in get_machine_models_by_connection()
-    if model.product_code and model.name
-]
-
-STEP_USER_DATA_SCHEMA = voluptuous.Schema(
-    {
-        voluptuous.Required(
-            CONF_NAME, description={"suggested_value": "My Precious"}
-        ): str,
-        voluptuous.Required(CONF_MAC): str,
-        voluptuous.Required(CONF_MODEL): SelectSelector(
-            SelectSelectorConfig(
-                options=MODEL_OPTIONS,
-                mode=SelectSelectorMode.DROPDOWN,
-                sort=True,
-            )
-        ),
-    }
-)
+# Model dropdown options memoised per connection type
+_MODEL_OPTIONS: dict[str, list[SelectOptionDict]] = {}
+
+
+async def async_get_model_options(
+    hass: HomeAssistant, connection_type: str = "BT"
+) -> list[SelectOptionDict]:
+    """Return the model dropdown options, loading the catalog once."""
+    options = _MODEL_OPTIONS.get(connection_type)
+    if options is None:
+        catalog = await async_get_machine_catalog(hass)
+        options = [
+            SelectOptionDict(value=model.product_code, label=model.name)
+            for model in catalog.by_connection(connection_type)
+            if model.product_code and model.name
+        ]
+        _MODEL_OPTIONS[connection_type] = options
+    return options
+
+
+def _model_selector(options: list[SelectOptionDict]) -> SelectSelector:
+    """Return the model dropdown selector."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=options,
+            mode=SelectSelectorMode.DROPDOWN,
+            sort=True,
+        )
+    )
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -50,7 +59,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     def __init__(self):
-        self._schema = STEP_USER_DATA_SCHEMA
+        self._schema: voluptuous.Schema | None = None
 
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
@@ -80,6 +89,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         await self.async_set_unique_id(discovery_info.address)
         self._abort_if_unique_id_configured()
 
+        options = await async_get_model_options(self.hass)
         default_machine = guess_machine_model(discovery_info.name)
         model_schema = voluptuous.Required(CONF_MODEL)
         suggested_name = discovery_info.name
@@ -99,13 +109,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_MAC,
                     description={"suggested_value": discovery_info.address},
                 ): str,
-                model_schema: SelectSelector(
-                    SelectSelectorConfig(
-                        options=MODEL_OPTIONS,
-                        mode=SelectSelectorMode.DROPDOWN,
-                        sort=True,
-                    )
-                ),
+                model_schema: _model_selector(options),
             }
         )
 
@@ -117,6 +121,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
 
         if user_input is None:
+            if self._schema is None:
+                options = await async_get_model_options(self.hass)
+                self._schema = voluptuous.Schema(
+                    {
+                        voluptuous.Required(
+                            CONF_NAME,
+                            description={"suggested_value": "My Precious"},
+                        ): str,
+                        voluptuous.Required(CONF_MAC): str,
+                        voluptuous.Required(CONF_MODEL): _model_selector(
+                            options
+                        ),
+                    }
+                )
             return self.async_show_form(
                 step_id="user",
                 data_schema=self._schema,
@@ -145,6 +163,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         if user_input is None:
             data = self.config_entry.data
+            options = await async_get_model_options(self.hass)
             return self.async_show_form(
                 step_id="init",
                 data_schema=voluptuous.Schema(
@@ -157,12 +176,15 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         ): str,
                         voluptuous.Required(
                             CONF_MODEL, default=data.get(CONF_MODEL)
-                        ): SelectSelector(
-                            SelectSelectorConfig(
-                                options=MODEL_OPTIONS,
-                                mode=SelectSelectorMode.DROPDOWN,
-                                sort=True,
-                            )
+                        ): _model_selector(options),
+                        voluptuous.Optional(
+                            CONF_KEEP_ALIVE,
+                            default=data.get(
+                                CONF_KEEP_ALIVE, KEEP_ALIVE_INTERVAL
+                            ),
+                        ): voluptuous.All(
+                            voluptuous.Coerce(int),
+                            voluptuous.Range(min=0, max=600),
                         ),
                     }
                 ),
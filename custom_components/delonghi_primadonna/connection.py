@@ -0,0 +1,317 @@
+"""BLE session management for Delonghi Primadonna."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from bleak import BleakClient
+from bleak.exc import BleakError
+from homeassistant.components import bluetooth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .commands import STATUS_REQUEST
+from .const import (CONNECT_TIMEOUT, CONTROLL_CHARACTERISTIC,
+                    IDLE_CHECK_INTERVAL, IDLE_DISCONNECT_DELAY,
+                    KEEP_ALIVE_INTERVAL, RECONNECT_ATTEMPTS,
+                    RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY)
+from .coordinator import AdapterCoordinator
+from .metrics import DeviceMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DelongiConnection:
+    """Own the BleakClient lifecycle of a single machine.
+
+    Callers await :meth:`async_get_client` instead of connecting
+    themselves. Reconnects run in one shared background task with
+    exponential backoff, so a burst of commands waits for a single
+    session instead of each one driving its own connect.
+
+    Sessions are opened on demand only and closed once no command was
+    written for ``IDLE_DISCONNECT_DELAY``, with or without keep-alive.
+    The keep-alive pokes a session that is still in use; presence
+    comes from advertisements.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mac: str,
+        notification_callback: Callable,
+        keep_alive_interval: int = KEEP_ALIVE_INTERVAL,
+        state_callback: Callable[[], None] | None = None,
+        client_factory: Callable[..., BleakClient] | None = None,
+        metrics: DeviceMetrics | None = None,
+        coordinator: AdapterCoordinator | None = None,
+    ) -> None:
+        """Initialize the connection manager.
+
+        ``client_factory`` replaces the Bluetooth lookup, e.g. with a
+        simulated machine; it is called with ``disconnected_callback``.
+        With a ``coordinator`` the session takes a connection slot of
+        the shared adapter and the keep-alive runs in turn with the
+        other machines.
+        """
+        self._hass = hass
+        self.mac = mac
+        self._notification_callback = notification_callback
+        self._state_callback = state_callback
+        self._client_factory = client_factory
+        self._metrics = metrics
+        self._coordinator = coordinator
+        self._keep_alive_interval = keep_alive_interval
+        self._client: BleakClient | None = None
+        self._ready = False
+        self._closing = False
+        self._reconnect_task: asyncio.Task | None = None
+        self._unsub_keep_alive: CALLBACK_TYPE | None = None
+        self._unsub_idle_check: CALLBACK_TYPE | None = None
+        self._last_activity = 0.0
+        self._last_command = 0.0
+        self._last_error: Exception | None = None
+        # Called with every frame written, e.g. by a packet capture
+        self.write_listener: Callable[[bytes], None] | None = None
+        # Keeps an idle session open while it returns True, e.g. while
+        # a beverage is being made
+        self.hold_open: Callable[[], bool] | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True when the session is ready for commands."""
+        return (
+            self._ready
+            and self._client is not None
+            and self._client.is_connected
+        )
+
+    @property
+    def client(self) -> BleakClient | None:
+        """Return the current client, connected or not."""
+        return self._client
+
+    @callback
+    def async_start(self) -> None:
+        """Start the idle check and keep-alive timers."""
+        self._closing = False
+        if self._unsub_idle_check is None:
+            self._unsub_idle_check = async_track_time_interval(
+                self._hass,
+                self._async_close_if_idle,
+                timedelta(seconds=IDLE_CHECK_INTERVAL),
+            )
+        if self._unsub_keep_alive is not None:
+            return
+        if self._coordinator is not None:
+            self._unsub_keep_alive = self._coordinator.async_register(
+                self.mac,
+                self.async_invalidate,
+                self._async_keep_alive if self._keep_alive_interval else None,
+                self._keep_alive_interval,
+            )
+        elif self._keep_alive_interval:
+            self._unsub_keep_alive = async_track_time_interval(
+                self._hass,
+                self._async_keep_alive,
+                timedelta(seconds=self._keep_alive_interval),
+            )
+
+    async def async_close(self) -> None:
+        """Stop reconnecting and drop the session."""
+        self._closing = True
+        if self._unsub_idle_check is not None:
+            self._unsub_idle_check()
+            self._unsub_idle_check = None
+        if self._unsub_keep_alive is not None:
+            self._unsub_keep_alive()
+            self._unsub_keep_alive = None
+        task = self._reconnect_task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self._async_drop_client()
+
+    async def async_get_client(
+        self, timeout: float | None = None
+    ) -> BleakClient:
+        """Return a ready client, waiting for a reconnect if needed."""
+        if self.is_connected:
+            return self._client
+        if self._closing:
+            raise BleakError(f"Connection to {self.mac} is closed")
+        task = self.async_request_reconnect()
+        client = await asyncio.wait_for(asyncio.shield(task), timeout)
+        if client is None:
+            raise BleakError(
+                f"Could not connect to {self.mac}: {self._last_error}"
+            )
+        return client
+
+    @callback
+    def async_request_reconnect(self) -> asyncio.Task:
+        """Start the background reconnect unless one is running."""
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = self._hass.async_create_background_task(
+                self._async_reconnect(),
+                f'delonghi_primadonna reconnect {self.mac}',
+            )
+        return self._reconnect_task
+
+    async def async_invalidate(self) -> None:
+        """Drop a session that failed so the next caller reconnects."""
+        await self._async_drop_client()
+
+    async def async_write(self, data: bytes | bytearray) -> None:
+        """Write a raw frame to the control characteristic."""
+        await self._async_write(data)
+        self._last_command = self._last_activity
+
+    async def _async_write(self, data: bytes | bytearray) -> None:
+        """Write a frame without counting it as use of the session."""
+        client = await self.async_get_client()
+        await client.write_gatt_char(CONTROLL_CHARACTERISTIC, data)
+        self._last_activity = time.monotonic()
+        if self.write_listener is not None:
+            self.write_listener(data)
+
+    async def _async_reconnect(self) -> BleakClient | None:
+        """Connect with exponential backoff, return None on give up."""
+        delay = RECONNECT_MIN_DELAY
+        for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+            if self._closing:
+                return None
+            started = time.monotonic()
+            try:
+                client = await self._async_connect(attempt)
+            except Exception as error:
+                if self._metrics is not None:
+                    self._metrics.record_connect(
+                        time.monotonic() - started, False
+                    )
+                _LOGGER.warning(
+                    "BLE connect error: %s (type: %s, attempt %d)",
+                    error,
+                    type(error).__name__,
+                    attempt,
+                )
+                self._last_error = error
+                await self._async_drop_client()
+            else:
+                if self._metrics is not None:
+                    self._metrics.record_connect(
+                        time.monotonic() - started, True
+                    )
+                return client
+            if attempt < RECONNECT_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        return None
+
+    async def _async_connect(self, attempt: int) -> BleakClient:
+        """Build a client, connect it and subscribe to notifications."""
+        if self._coordinator is not None:
+            await self._coordinator.async_acquire_connection(self.mac)
+        if self._client_factory is not None:
+            client = self._client_factory(
+                disconnected_callback=self._async_on_disconnected
+            )
+        else:
+            device = bluetooth.async_ble_device_from_address(
+                self._hass, self.mac, connectable=True
+            )
+            if not device:
+                raise BleakError(
+                    f"A device with address {self.mac} could not be found."
+                )
+            client = BleakClient(
+                device, disconnected_callback=self._async_on_disconnected
+            )
+        self._client = client
+        _LOGGER.info("Connect to %s (attempt %d)", self.mac, attempt)
+        await asyncio.wait_for(client.connect(), timeout=CONNECT_TIMEOUT)
+        # Service discovery is performed during the connection
+        # process. Accessing ``get_services`` directly raises a
+        # ``FutureWarning`` in recent versions of Bleak.
+        await asyncio.wait_for(
+            client.start_notify(
+                uuid.UUID(CONTROLL_CHARACTERISTIC),
+                self._notification_callback,
+            ),
+            timeout=CONNECT_TIMEOUT,
+        )
+        self._ready = True
+        self._last_activity = self._last_command = time.monotonic()
+        self._async_state_changed()
+        return client
+
+    async def _async_drop_client(self) -> None:
+        """Forget the current client and disconnect it if needed."""
+        client, self._client = self._client, None
+        if self._coordinator is not None:
+            self._coordinator.async_release_connection(self.mac)
+        if self._ready:
+            self._ready = False
+            self._async_state_changed()
+        if client is None or not client.is_connected:
+            return
+        try:
+            await asyncio.wait_for(client.disconnect(), timeout=5)
+        except Exception as error:  # noqa: BLE001
+            _LOGGER.warning(
+                "Forced disconnect [%s]: %s",
+                type(error).__name__,
+                error
+            )
+
+    @callback
+    def _async_on_disconnected(self, client: BleakClient) -> None:
+        """Handle an unexpected link loss reported by Bleak."""
+        if client is not self._client:
+            return
+        _LOGGER.info("Disconnected from %s", self.mac)
+        self._ready = False
+        if self._coordinator is not None:
+            self._coordinator.async_release_connection(self.mac)
+        self._async_state_changed()
+
+    @callback
+    def _async_state_changed(self) -> None:
+        """Report a change of the session state."""
+        if self._state_callback is not None:
+            self._state_callback()
+
+    async def _async_close_if_idle(
+        self, now: datetime | None = None
+    ) -> bool:
+        """Close a session no longer used, return True when closed."""
+        if not self.is_connected:
+            return False
+        if (
+            time.monotonic() - self._last_command < IDLE_DISCONNECT_DELAY
+            or (self.hold_open is not None and self.hold_open())
+        ):
+            return False
+        _LOGGER.debug("Closing idle session to %s", self.mac)
+        await self._async_drop_client()
+        return True
+
+    async def _async_keep_alive(self, now: datetime | None = None) -> None:
+        """Poke a session in use unless it is about to be closed."""
+        if not self.is_connected or await self._async_close_if_idle():
+            return
+        if time.monotonic() - self._last_activity < self._keep_alive_interval:
+            return
+        try:
+            await self._async_write(STATUS_REQUEST)
+        except BleakError as error:
+            _LOGGER.debug("Keep-alive to %s failed: %s", self.mac, error)
+            await self._async_drop_client()
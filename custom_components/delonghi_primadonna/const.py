@@ -20,7 +20,74 @@ DEFAULT_IMAGE_URL = (
 
 BEVERAGE_SERVICE_NAME = 'make_beverage'
 
-# Mapping of profile id to profile name
+CONF_KEEP_ALIVE = 'keep_alive'
+
+# BLE session management (seconds)
+KEEP_ALIVE_INTERVAL = 30
+CONNECT_TIMEOUT = 10
+RECONNECT_ATTEMPTS = 5
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+# Close a session when no command was sent for this long
+IDLE_DISCONNECT_DELAY = 120
+# How often an open session is checked for being idle
+IDLE_CHECK_INTERVAL = 30
+# Smallest RSSI change (dB) published from advertisements
+ADVERTISEMENT_RSSI_STEP = 5
+
+# hass.data keys of objects shared by every config entry
+DATA_CATALOG = f'{DOMAIN}_catalog'
+DATA_COORDINATOR = f'{DOMAIN}_coordinator'
+DATA_STATISTICS_CATALOGUE = f'{DOMAIN}_statistics_catalogue'
+
+# Dispatcher signal for device state changes, formatted with the MAC
+SIGNAL_DEVICE_UPDATE = f'{DOMAIN}_device_update_{{}}'
+
+# Statistics refresh intervals (seconds): soon after a beverage,
+# while the machine idles and while it is switched off
+STATISTICS_FAST_INTERVAL = 15
+STATISTICS_IDLE_INTERVAL = 600
+STATISTICS_OFF_INTERVAL = 3600
+# How long the fast interval applies after a beverage completes
+STATISTICS_FAST_WINDOW = 60
+# Delay that coalesces refresh triggers, e.g. sensors registering
+STATISTICS_SETTLE_DELAY = 1
+# Delayed save of the discovered parameters per model
+STATISTICS_CATALOGUE_SAVE_DELAY = 10
+
+# Delayed save of profile names read from the machine (seconds)
+PROFILES_SAVE_DELAY = 10
+
+# Delayed save of the last known device state (seconds)
+SNAPSHOT_SAVE_DELAY = 30
+
+# Usage history: rows kept per tier and the delayed save (seconds)
+HISTORY_RAW_SAMPLES = 256
+HISTORY_HOURLY_BUCKETS = 14 * 24
+HISTORY_DAILY_BUCKETS = 400
+HISTORY_SAVE_DELAY = 60
+
+# Packet capture: file size cap (bytes) and flush interval (seconds)
+CAPTURE_MAX_BYTES = 1024 * 1024
+CAPTURE_FLUSH_INTERVAL = 5
+
+# Window that coalesces switch changes into one command (seconds)
+SWITCH_WRITE_DELAY = 0.15
+
+# Command pipelining
+MAX_IN_FLIGHT_COMMANDS = 4
+RESPONSE_TIMEOUT = 10
+# Pause before resending a command whose write failed (seconds)
+COMMAND_RETRY_DELAY = 0.5
+
+# Adapter sharing between machines: simultaneous connections, writes
+# in progress, and how long a connection must be quiet before another
+# machine may take its slot (seconds)
+ADAPTER_CONNECTION_SLOTS = 3
+ADAPTER_COMMAND_SLOTS = 2
+CONNECTION_IDLE_GRACE = RESPONSE_TIMEOUT
+
+# Default profile names by id
 AVAILABLE_PROFILES = {
     1: 'Profile 1',
     2: 'Profile 2',
@@ -88,48 +155,11 @@ DEVICE_STATUS = {
 """
 Command bytes
 """
-BYTES_POWER = [0x0d, 0x07, 0x84, 0x0f, 0x02, 0x01, 0x55, 0x12]
-
 # Default bitmask for commands
 BASE_COMMAND = '10000001'
 
-BYTES_TIME_COMMAND = [
-    0x0d, 0x07, 0xE2, 0xF0, 0x00, 0x00, 0x00, 0x00
-]
-
-# This command change device switches
-BYTES_SWITCH_COMMAND = [
-    0x0d, 0x0b, 0x90, 0x0f, 0x00, 0x3f,
-    0x00, 0x00, 0x00, 0x00, 0x00, 0x00
-]
-
-BYTES_AUTOPOWEROFF_COMMAND = [
-    0x0d, 0x0b, 0x90, 0x0f, 0x00, 0x3e,
-    0x00, 0x00, 0x00, 0x00, 0x81, 0xe3
-]
-
-BYTES_WATER_HARDNESS_COMMAND = [
-    0x0d, 0x0b, 0x90, 0x0f, 0x00, 0x32,
-    0x00, 0x00, 0x00, 0x00, 0x00, 0x00
-]
-
-BYTES_WATER_TEMPERATURE_COMMAND = [
-    0x0d, 0x0b, 0x90, 0x0f, 0x00, 0x3d,
-    0x00, 0x00, 0x00, 0x00, 0x6f, 0x31
-]
-
-BYTES_STATISTICS_COMMAND = [
-    0x0d, 0x08, 0xa2, 0x0f, 0x00, 0x64,
-    0x0a, 0x00, 0x00
-]
-
-# Commands that load user profiles from the device. They must be
-# executed once after the first successful connection. The CRC
-# bytes are zeros as they are calculated at runtime.
-BYTES_LOAD_PROFILES = [0x0d, 0x07, 0xa4, 0xf0, 0x01, 0x06, 0x00, 0x00]
-BYTES_LOAD_PROFILES_1 = [0x0d, 0x07, 0xa4, 0xf0, 0x01, 0x03, 0x00, 0x00]
-BYTES_LOAD_PROFILES_2 = [0x0d, 0x07, 0xa4, 0xf0, 0x04, 0x06, 0x00, 0x00]
-
+# Beverage commands, sealed at import. The layouts of the other
+# requests are described in protocol.py.
 COFFE_ON = [0x0d, 0x0f, 0x83, 0xf0, 0x02, 0x01, 0x01,
             0x00, 0x67, 0x02, 0x02, 0x00, 0x00, 0x06, 0x77, 0xff]
 COFFE_OFF = [0x0d, 0x08, 0x83, 0xf0, 0x02, 0x02, 0x06, 0xc4, 0xb1]
@@ -164,9 +194,6 @@ ESPRESSO_ON = [0x0d, 0x11, 0x83, 0xf0, 0x01, 0x01, 0x01, 0x00,
                0x28, 0x02, 0x03, 0x08, 0x00, 0x00, 0x00, 0x06, 0x8f, 0xfc]
 ESPRESSO_OFF = [0x0d, 0x08, 0x83, 0xf0, 0x01, 0x02, 0x06, 0x9d, 0xe1]
 
-# This commands return the current device state
-DEBUG = [0x0d, 0x05, 0x75, 0x0f, 0xda, 0x25]
-
 """
 Status bytes
 """
@@ -0,0 +1,332 @@
+"""Adapter sharing between Delonghi Primadonna machines.
+
+Every machine of the domain registers with one :class:`AdapterCoordinator`.
+It limits how many machines hold a connection at once, interleaves the
+writes of all machines by priority and round-robin, and spreads the
+keep-alive status reads evenly over time instead of letting every
+machine poll on its own timer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from enum import IntEnum
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import (async_call_later,
+                                         async_track_time_interval)
+
+from .const import (ADAPTER_COMMAND_SLOTS, ADAPTER_CONNECTION_SLOTS,
+                    CONNECTION_IDLE_GRACE, DATA_COORDINATOR, DOMAIN,
+                    KEEP_ALIVE_INTERVAL)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Scheduling class of a command, most urgent first."""
+
+    BEVERAGE = 0
+    CONTROL = 1
+    STATUS = 2
+    STATISTICS = 3
+
+
+class FairGate:
+    """Grant a bounded number of leases.
+
+    Waiters are served by priority. Within one priority the machines
+    take turns, so a machine with many queued commands delays the
+    others by at most one lease each.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize a gate with ``limit`` leases."""
+        self.limit = limit
+        self.in_use = 0
+        self.waiting = 0
+        self._levels: list[OrderedDict[str, deque[asyncio.Future]]] = [
+            OrderedDict() for _ in Priority
+        ]
+
+    async def acquire(self, key: str, priority: Priority) -> None:
+        """Wait for a lease on behalf of machine ``key``."""
+        if self.in_use < self.limit and not self.waiting:
+            self.in_use += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        level = self._levels[priority]
+        level.setdefault(key, deque()).append(future)
+        self.waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right before the waiter was cancelled
+                self.release()
+            else:
+                self._discard(level, key, future)
+            raise
+
+    def release(self) -> None:
+        """Return a lease and grant it to the next waiter."""
+        self.in_use -= 1
+        while self.in_use < self.limit and (future := self._next()):
+            self.in_use += 1
+            future.set_result(None)
+
+    def _next(self) -> asyncio.Future | None:
+        """Dequeue the next waiter, rotating the machine to the back."""
+        for level in self._levels:
+            while level:
+                key, queue = next(iter(level.items()))
+                future = queue.popleft()
+                self.waiting -= 1
+                if queue:
+                    level.move_to_end(key)
+                else:
+                    del level[key]
+                if not future.done():
+                    return future
+        return None
+
+    def _discard(
+        self,
+        level: OrderedDict[str, deque[asyncio.Future]],
+        key: str,
+        future: asyncio.Future,
+    ) -> None:
+        """Forget a cancelled waiter."""
+        queue = level.get(key)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self.waiting -= 1
+        if not queue:
+            del level[key]
+
+
+class _Machine:
+    """Coordinator bookkeeping of one registered machine."""
+
+    __slots__ = (
+        'release', 'keep_alive', 'interval', 'connected', 'releasing',
+        'active', 'last_activity',
+    )
+
+    def __init__(
+        self,
+        release: Callable[[], Awaitable[None]],
+        keep_alive: Callable[[], Awaitable[None]] | None,
+        interval: float,
+    ) -> None:
+        self.release = release
+        self.keep_alive = keep_alive
+        self.interval = interval
+        self.connected = False
+        self.releasing = False
+        self.active = 0
+        self.last_activity = 0.0
+
+
+class AdapterCoordinator:
+    """Schedule connections, writes and status reads of all machines.
+
+    The connection slots of the adapter are leased to machines while
+    they are connected. When a machine waits for a slot, the machine
+    that has been quiet the longest is asked to disconnect; it
+    reconnects the next time it has a command to send.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection_slots: int = ADAPTER_CONNECTION_SLOTS,
+        command_slots: int = ADAPTER_COMMAND_SLOTS,
+    ) -> None:
+        """Initialize the coordinator."""
+        self._hass = hass
+        self._connections = FairGate(connection_slots)
+        self._commands = FairGate(command_slots)
+        self._machines: dict[str, _Machine] = {}
+        # Machines with a keep-alive, in polling order
+        self._rotation: deque[str] = deque()
+        self._unsub_poll: CALLBACK_TYPE | None = None
+        self._unsub_evict: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(
+        self,
+        mac: str,
+        release: Callable[[], Awaitable[None]],
+        keep_alive: Callable[[], Awaitable[None]] | None = None,
+        interval: float = KEEP_ALIVE_INTERVAL,
+    ) -> CALLBACK_TYPE:
+        """Register a machine and return the callback removing it.
+
+        ``release`` disconnects the machine to free its slot.
+        ``keep_alive`` is called about every ``interval`` seconds, in
+        turn with the other machines.
+        """
+        self._machines[mac] = _Machine(release, keep_alive, interval)
+        if keep_alive is not None:
+            self._rotation.append(mac)
+            self._async_schedule_polls()
+
+        @callback
+        def _unregister() -> None:
+            machine = self._machines.pop(mac, None)
+            if machine is None:
+                return
+            if machine.connected:
+                self._connections.release()
+            if mac in self._rotation:
+                self._rotation.remove(mac)
+                self._async_schedule_polls()
+
+        return _unregister
+
+    async def async_acquire_connection(self, mac: str) -> None:
+        """Wait until ``mac`` may connect."""
+        machine = self._machines.get(mac)
+        if machine is None or machine.connected:
+            return
+        if self._connections.in_use >= self._connections.limit:
+            # Runs once this waiter is queued
+            self._hass.loop.call_soon(self._async_check_eviction)
+        await self._connections.acquire(mac, Priority.CONTROL)
+        if self._machines.get(mac) is not machine:
+            # Unregistered while waiting
+            self._connections.release()
+            return
+        machine.connected = True
+        machine.last_activity = time.monotonic()
+
+    @callback
+    def async_release_connection(self, mac: str) -> None:
+        """Return the connection slot held by ``mac``."""
+        machine = self._machines.get(mac)
+        if machine is None or not machine.connected:
+            return
+        machine.connected = False
+        self._connections.release()
+
+    @asynccontextmanager
+    async def async_command(
+        self, mac: str, priority: Priority
+    ) -> AsyncIterator[None]:
+        """Hold a write lease of the adapter for ``mac``."""
+        await self._commands.acquire(mac, priority)
+        machine = self._machines.get(mac)
+        if machine is not None:
+            machine.active += 1
+        try:
+            yield
+        finally:
+            if machine is not None:
+                machine.active -= 1
+                machine.last_activity = time.monotonic()
+            self._commands.release()
+            if self._connections.waiting:
+                self._async_check_eviction()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the scheduling state for diagnostics."""
+        return {
+            'connection_slots': self._connections.limit,
+            'machines': len(self._machines),
+            'connected': self._connections.in_use,
+            'waiting_connections': self._connections.waiting,
+            'command_slots': self._commands.limit,
+            'active_commands': self._commands.in_use,
+            'waiting_commands': self._commands.waiting,
+            'polled': len(self._rotation),
+        }
+
+    @callback
+    def _async_check_eviction(self, now: datetime | None = None) -> None:
+        """Free a slot for a waiting machine if one holder is quiet."""
+        if now is not None:
+            self._unsub_evict = None
+        gate = self._connections
+        if not gate.waiting or gate.in_use < gate.limit:
+            return
+        idle = [
+            (mac, machine)
+            for mac, machine in self._machines.items()
+            if machine.connected
+            and not machine.active
+            and not machine.releasing
+        ]
+        if not idle:
+            # The next finished command checks again
+            return
+        mac, machine = min(idle, key=lambda item: item[1].last_activity)
+        wait = machine.last_activity + CONNECTION_IDLE_GRACE - time.monotonic()
+        if wait > 0:
+            if self._unsub_evict is None:
+                self._unsub_evict = async_call_later(
+                    self._hass, wait, self._async_check_eviction
+                )
+            return
+        machine.releasing = True
+        self._hass.async_create_background_task(
+            self._async_evict(mac, machine), f'{DOMAIN} release {mac}'
+        )
+
+    async def _async_evict(self, mac: str, machine: _Machine) -> None:
+        """Ask a machine to give its slot up."""
+        _LOGGER.debug("Releasing the slot of %s for another machine", mac)
+        try:
+            await machine.release()
+        finally:
+            machine.releasing = False
+
+    @callback
+    def _async_schedule_polls(self) -> None:
+        """Spread one round of keep-alives over the shortest interval."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if not self._rotation:
+            return
+        interval = min(
+            self._machines[mac].interval for mac in self._rotation
+        )
+        self._unsub_poll = async_track_time_interval(
+            self._hass,
+            self._async_poll_next,
+            timedelta(seconds=interval / len(self._rotation)),
+        )
+
+    @callback
+    def _async_poll_next(self, now: datetime) -> None:
+        """Run the keep-alive of the next machine in turn."""
+        mac = self._rotation[0]
+        self._rotation.rotate(-1)
+        self._hass.async_create_background_task(
+            self._async_poll(mac, self._machines[mac].keep_alive),
+            f'{DOMAIN} keep-alive {mac}',
+        )
+
+    async def _async_poll(
+        self, mac: str, keep_alive: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Run one keep-alive under a status lease."""
+        async with self.async_command(mac, Priority.STATUS):
+            await keep_alive()
+
+
+@callback
+def async_get_coordinator(hass: HomeAssistant) -> AdapterCoordinator:
+    """Return the coordinator shared by every config entry."""
+    if DATA_COORDINATOR not in hass.data:
+        hass.data[DATA_COORDINATOR] = AdapterCoordinator(hass)
+    return hass.data[DATA_COORDINATOR]
@@ -1,6 +1,5 @@
 """Delongi primadonna device description"""
 import asyncio
-import copy
 
 try:
     from enum import StrEnum
@@ -8,41 +7,59 @@ except ImportError:  # pragma: no cover - fallback for older Home Assistant
     from homeassistant.backports.enum import StrEnum
 
 import logging
+import operator
 import time
 import uuid
-from binascii import crc_hqx, hexlify
+from binascii import hexlify
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntFlag
+from functools import lru_cache, partial
 
 from bleak import BleakClient
 from bleak.exc import BleakDBusError, BleakError
-from homeassistant.components import bluetooth
 from homeassistant.const import CONF_MAC, CONF_MODEL, CONF_NAME
-from homeassistant.core import HomeAssistant
-
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .advertisement import AdvertisementMonitor
+from .beverage import BeverageError, BeverageProgram
+from .capture import PacketCapture, async_replay
+from .capture_format import Direction
+from .command_queue import CoalescedWriter, CommandScheduler
+from .commands import (AUTO_POWER_OFF, BEVERAGE_STOP, LOAD_PROFILES, POWER,
+                       SELECT_PROFILE, SET_TIME, STATISTICS, STATUS_REQUEST,
+                       SWITCHES, WATER_HARDNESS, WATER_TEMPERATURE, seal)
+from .connection import DelongiConnection
 from .const import (AMERICANO_OFF, AMERICANO_ON, AVAILABLE_PROFILES,
-                    BASE_COMMAND, BEVERAGE_NONE, BYTES_AUTOPOWEROFF_COMMAND,
-                    BYTES_LOAD_PROFILES, BYTES_POWER, BYTES_STATISTICS_COMMAND,
-                    BYTES_SWITCH_COMMAND, BYTES_TIME_COMMAND,
-                    BYTES_WATER_HARDNESS_COMMAND,
-                    BYTES_WATER_TEMPERATURE_COMMAND, COFFE_OFF, COFFE_ON,
+                    BASE_COMMAND, BEVERAGE_NONE, COFFE_OFF, COFFE_ON,
                     COFFEE_GROUNDS_CONTAINER_CLEAN,
                     COFFEE_GROUNDS_CONTAINER_DETACHED,
-                    COFFEE_GROUNDS_CONTAINER_FULL, CONTROLL_CHARACTERISTIC,
-                    DEBUG, DEFAULT_IMAGE_URL, DEVICE_READY, DEVICE_STATUS,
-                    DEVICE_TURNOFF, DOMAIN, DOPPIO_OFF, DOPPIO_ON,
-                    ESPRESSO2_OFF, ESPRESSO2_ON, ESPRESSO_OFF, ESPRESSO_ON,
-                    HOTWATER_OFF, HOTWATER_ON, LONG_OFF, LONG_ON,
-                    NAME_CHARACTERISTIC, NOZZLE_STATE, START_COFFEE, STEAM_OFF,
-                    STEAM_ON, WATER_SHORTAGE, WATER_TANK_DETACHED)
+                    COFFEE_GROUNDS_CONTAINER_FULL, COMMAND_RETRY_DELAY,
+                    CONF_KEEP_ALIVE, DEFAULT_IMAGE_URL, DEVICE_READY,
+                    DEVICE_STATUS, DEVICE_TURNOFF, DOMAIN, DOPPIO_OFF,
+                    DOPPIO_ON, ESPRESSO2_OFF, ESPRESSO2_ON, ESPRESSO_OFF,
+                    ESPRESSO_ON, HOTWATER_OFF, HOTWATER_ON,
+                    KEEP_ALIVE_INTERVAL, LONG_OFF, LONG_ON,
+                    NAME_CHARACTERISTIC, NOZZLE_STATE, RESPONSE_TIMEOUT,
+                    SIGNAL_DEVICE_UPDATE, START_COFFEE, STEAM_OFF, STEAM_ON,
+                    SWITCH_WRITE_DELAY, WATER_SHORTAGE, WATER_TANK_DETACHED)
+from .coordinator import AdapterCoordinator, Priority
+from .frame import FrameDecoder
+from .history import StatisticsHistory
 from .machine_switch import MachineSwitch, parse_switches
+from .metrics import DeviceMetrics
 from .model import get_machine_model
+from .profiles import ProfileRegistry
+from .protocol import (MONITOR_V1, MONITOR_V2, PROFILES_ANSWER,
+                       SELECT_PROFILE_ANSWER, ProtocolError)
+from .snapshot import DeviceSnapshot
+from .statistics import (StatisticsCatalogue, StatisticsScheduler,
+                         apply_derived_metrics, iter_statistics)
 
 _LOGGER = logging.getLogger(__name__)
 
-START_BYTE = 0xD0
-
 
 @dataclass
 class MonitorData:
@@ -58,69 +75,32 @@ def parse_monitor_data(data: bytes) -> MonitorData | None:
     """Parse Monitor Data packet (v1 0x70 or v2 0x75)"""
     if len(data) < 3:
         return None
-
     answer_id = data[2]
-
-    # Defaults
-    switches = 0
-    alarms = 0
-    status = 0
-    sub_status = 0
-    nozzle_state = -1
-
-    if answer_id == 0x75:  # MonitorDataV2
-        if len(data) < 14:
-            return None
-        # Switches: Bytes 5, 6 (Little Endian)
-        switches = data[5] + (data[6] << 8)
-
-        # Alarms: Bytes 7, 8, 12, 13 (Little Endian in blocks)
-        # Based on MonitorDataV2.b():
-        # iS = z.S(bArr[7]) + (z.S(bArr[8]) << 8)
-        #     + (z.S(bArr[12]) << 16) + (z.S(bArr[13]) << 24)
-        alarms = (data[7] + (data[8] << 8)
-                  + (data[12] << 16) + (data[13] << 24))
-
-        # Status/State: Byte 9
-        status = data[9]
-
-        # SubStatus: Byte 10
-        sub_status = data[10]
-
-        # Nozzle State: Byte 4 (from MonitorDataV2.a())
-        nozzle_state = data[4]
-
-    elif answer_id == 0x70:  # MonitorData (v1)
-        if len(data) < 11:
-            return None
-
-        # Switches: Bytes 9, 10
-        # Based on MonitorData.g(): bArr[9] + (bArr[10] << 8)
-        switches = data[9] + (data[10] << 8)
-
-        # Alarms: Bytes 4, 5
-        # Based on MonitorData.b(): bArr[4] + (bArr[5] << 8)
-        alarms = data[4] + (data[5] << 8)
-
-        # Status/State: Byte 8
-        # Based on MonitorData.f(): bArr[8]
-        status = data[8]
-
-        # SubStatus: Byte 9
-        # Based on MonitorData.e(): bArr[9]
-        # Note: Byte 9 is also used for switches low byte?
-        # MonitorData.g (Switches) uses 9, 10.
-        # MonitorData.e (SubState/Aux) uses 9.
-        # We will extract it as sub_status anyway.
-        sub_status = data[9]
-
-        # Nozzle State: a() returns -1 for v1.
-        nozzle_state = -1
-
-    else:
-        return None
-
-    return MonitorData(switches, alarms, status, sub_status, nozzle_state)
+    try:
+        if answer_id == MONITOR_V2.message_id:
+            fields = MONITOR_V2.decode(data)
+            # Based on MonitorDataV2.b(): bytes 7, 8, 12 and 13
+            alarms = fields.alarms_low | (fields.alarms_high << 16)
+            return MonitorData(
+                fields.switches,
+                alarms,
+                fields.status,
+                fields.sub_status,
+                fields.nozzle_state,
+            )
+        if answer_id == MONITOR_V1.message_id:
+            fields = MONITOR_V1.decode(data)
+            # Nozzle State: MonitorData.a() returns -1 for v1
+            return MonitorData(
+                fields.switches,
+                fields.alarms,
+                fields.status,
+                fields.sub_status,
+                -1,
+            )
+    except ProtocolError as error:
+        _LOGGER.debug("Ignoring monitor data: %s", error)
+    return None
 
 
 class BeverageEntityFeature(IntFlag):
@@ -152,6 +132,30 @@ class NotificationType(StrEnum):
     PROCESS = 'process'
 
 
+class DeviceUpdate(StrEnum):
+    """Kinds of device state changes published to entities"""
+
+    STATUS = 'status'
+    NOZZLE = 'nozzle'
+    SWITCHES = 'switches'
+    ALARMS = 'alarms'
+    STATISTICS = 'statistics'
+    PROFILE = 'profile'
+    CONNECTION = 'connection'
+    PRESENCE = 'presence'
+
+
+# Updates that change the state kept across restarts
+SNAPSHOT_UPDATES = frozenset({
+    DeviceUpdate.STATUS,
+    DeviceUpdate.NOZZLE,
+    DeviceUpdate.SWITCHES,
+    DeviceUpdate.ALARMS,
+    DeviceUpdate.STATISTICS,
+    DeviceUpdate.PROFILE,
+})
+
+
 class BeverageCommand:
     """Coffee machine beverage commands"""
 
@@ -180,15 +184,27 @@ class DeviceSwitches:
 
 
 BEVERAGE_COMMANDS = {
-    AvailableBeverage.NONE: BeverageCommand(DEBUG, DEBUG),
-    AvailableBeverage.STEAM: BeverageCommand(STEAM_ON, STEAM_OFF),
-    AvailableBeverage.LONG: BeverageCommand(LONG_ON, LONG_OFF),
-    AvailableBeverage.COFFEE: BeverageCommand(COFFE_ON, COFFE_OFF),
-    AvailableBeverage.DOPIO: BeverageCommand(DOPPIO_ON, DOPPIO_OFF),
-    AvailableBeverage.HOTWATER: BeverageCommand(HOTWATER_ON, HOTWATER_OFF),
-    AvailableBeverage.ESPRESSO: BeverageCommand(ESPRESSO_ON, ESPRESSO_OFF),
-    AvailableBeverage.AMERICANO: BeverageCommand(AMERICANO_ON, AMERICANO_OFF),
-    AvailableBeverage.ESPRESSO2: BeverageCommand(ESPRESSO2_ON, ESPRESSO2_OFF),
+    AvailableBeverage.NONE: BeverageCommand(STATUS_REQUEST, STATUS_REQUEST),
+    AvailableBeverage.STEAM: BeverageCommand(seal(STEAM_ON), seal(STEAM_OFF)),
+    AvailableBeverage.LONG: BeverageCommand(seal(LONG_ON), seal(LONG_OFF)),
+    AvailableBeverage.COFFEE: BeverageCommand(
+        seal(COFFE_ON), seal(COFFE_OFF)
+    ),
+    AvailableBeverage.DOPIO: BeverageCommand(
+        seal(DOPPIO_ON), seal(DOPPIO_OFF)
+    ),
+    AvailableBeverage.HOTWATER: BeverageCommand(
+        seal(HOTWATER_ON), seal(HOTWATER_OFF)
+    ),
+    AvailableBeverage.ESPRESSO: BeverageCommand(
+        seal(ESPRESSO_ON), seal(ESPRESSO_OFF)
+    ),
+    AvailableBeverage.AMERICANO: BeverageCommand(
+        seal(AMERICANO_ON), seal(AMERICANO_OFF)
+    ),
+    AvailableBeverage.ESPRESSO2: BeverageCommand(
+        seal(ESPRESSO2_ON), seal(ESPRESSO2_OFF)
+    ),
 }
 
 # Map recipe IDs from MachinesModels.json to existing hardcoded commands
@@ -204,9 +220,9 @@ RECIPE_ID_TO_BEVERAGE = {
 }
 
 
-def _build_stop_command(recipe_id: int) -> list[int]:
+def _build_stop_command(recipe_id: int) -> bytes:
     """Build a stop command for any recipe ID."""
-    return [0x0D, 0x08, 0x83, 0xF0, recipe_id & 0xFF, 0x02, 0x06, 0x00, 0x00]
+    return BEVERAGE_STOP.render(recipe=recipe_id & 0xFF)
 
 
 def _build_start_command(recipe_id: int, coffee_qty: int = 0,
@@ -215,6 +231,7 @@ def _build_start_command(recipe_id: int, coffee_qty: int = 0,
 
     The command structure varies by recipe type, but this covers the common
     coffee-only and milk-drink patterns observed from the DeLonghi protocol.
+    It starts recipes the catalog describes too sparsely to compile.
     """
     rid = recipe_id & 0xFF
     if milk_qty > 0:
@@ -236,51 +253,87 @@ def _build_start_command(recipe_id: int, coffee_qty: int = 0,
         ]
 
 
+# Bytes that identify a monitor notification: the answer id and every
+# byte the monitor parser reads (nozzle, switch and alarm words,
+# activity and cooking stage). The progress counter and the CRC are
+# masked out, so their variants match too.
+NOTIFICATION_KEY_BYTES = (2, 4, 5, 6, 7, 8, 9, 10, 12, 13)
+_notification_key = operator.itemgetter(*NOTIFICATION_KEY_BYTES)
+
 DEVICE_NOTIFICATION = {
-    str(bytearray(DEVICE_READY)): BeverageNotify(
+    _notification_key(DEVICE_READY): BeverageNotify(
         NotificationType.STATUS, 'DeviceOK'
     ),
-    str(bytearray(DEVICE_TURNOFF)): BeverageNotify(
+    _notification_key(DEVICE_TURNOFF): BeverageNotify(
         NotificationType.STATUS, 'DeviceOFF'
     ),
-    str(bytearray(WATER_TANK_DETACHED)): BeverageNotify(
+    _notification_key(WATER_TANK_DETACHED): BeverageNotify(
         NotificationType.STATUS, 'NoWaterTank'
     ),
-    str(bytearray(WATER_SHORTAGE)): BeverageNotify(
+    _notification_key(WATER_SHORTAGE): BeverageNotify(
         NotificationType.STATUS, 'NoWater'
     ),
-    str(bytearray(COFFEE_GROUNDS_CONTAINER_DETACHED)): BeverageNotify(
+    _notification_key(COFFEE_GROUNDS_CONTAINER_DETACHED): BeverageNotify(
         NotificationType.STATUS, 'NoGroundsContainer'
     ),
-    str(bytearray(COFFEE_GROUNDS_CONTAINER_FULL)): BeverageNotify(
+    _notification_key(COFFEE_GROUNDS_CONTAINER_FULL): BeverageNotify(
         NotificationType.STATUS, 'GroundsContainerFull'
     ),
-    str(bytearray(COFFEE_GROUNDS_CONTAINER_CLEAN)): BeverageNotify(
+    _notification_key(COFFEE_GROUNDS_CONTAINER_CLEAN): BeverageNotify(
         NotificationType.STATUS, 'GroundsContainerFull'
     ),
-    str(bytearray(START_COFFEE)): BeverageNotify(
+    _notification_key(START_COFFEE): BeverageNotify(
         NotificationType.STATUS, 'START_COFFEE'
     ),
 }
 
 
+def find_notification(packet: bytes) -> BeverageNotify | None:
+    """Return the known notification matching a packet."""
+    if len(packet) <= NOTIFICATION_KEY_BYTES[-1]:
+        return None
+    return DEVICE_NOTIFICATION.get(_notification_key(packet))
+
+
+@lru_cache(maxsize=64)
+def _notification_payload(packet: bytes) -> tuple[dict[str, str], str]:
+    """Build event data and notification text once per packet."""
+    hex_value = str(hexlify(packet, ' '))
+    event_data = {'data': hex_value}
+    notification_message = (
+        hex_value
+        .replace(' ', ', 0x')
+        .replace("b'", '[0x')
+        .replace("'", ']')
+    )
+    notify = find_notification(packet)
+    if notify is not None:
+        notification_message = notify.description
+        event_data['type'] = notify.kind
+        event_data['description'] = notify.description
+    return event_data, notification_message
+
+
 class DelongiPrimadonna:
     """Delongi Primadonna class"""
 
-    def __init__(self, config: dict, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        config: dict,
+        hass: HomeAssistant,
+        client_factory: Callable[..., BleakClient] | None = None,
+        coordinator: AdapterCoordinator | None = None,
+        statistics_catalogue: StatisticsCatalogue | None = None,
+    ) -> None:
         """Initialize device"""
-        self._device_status = None
-        self._client = None
+        self._device_status: bytes | None = None
         self._hass = hass
-        self._device = None
-        self._connecting = False
         self.mac = config.get(CONF_MAC)
         self.name = config.get(CONF_NAME)
         self.product_code = config.get(CONF_MODEL)
         self.hostname = ''
         self.friendly_name = ''
         self.cooking = BEVERAGE_NONE
-        self.connected = False
         self.notify = False
         self.steam_nozzle = NOZZLE_STATE[-1]
         self.service = 0
@@ -289,12 +342,42 @@ class DelongiPrimadonna:
         self.active_switches: list[MachineSwitch] = []
         self.sync_time = False
         self._lock = asyncio.Lock()
-        self._rx_buffer = bytearray()
-        self._response_event = None
-        self._last_response: bytes | None = None
+        self.metrics = DeviceMetrics()
+        self._connection = DelongiConnection(
+            hass,
+            self.mac,
+            self._process_raw_data,
+            config.get(CONF_KEEP_ALIVE, KEEP_ALIVE_INTERVAL),
+            self._async_connection_changed,
+            client_factory,
+            self.metrics,
+            coordinator,
+        )
+        self._coordinator = coordinator
+        self._connection.hold_open = lambda: self._busy
+        self.advertisements = AdvertisementMonitor(
+            hass, self.mac, partial(self._async_publish, DeviceUpdate.PRESENCE)
+        )
+        # Switch changes made together go out as one settings command
+        self._switch_writer = CoalescedWriter(
+            self._async_write_switches, SWITCH_WRITE_DELAY
+        )
+        self._commands = CommandScheduler(
+            self._async_write, metrics=self.metrics
+        )
+        self._decoder = FrameDecoder()
+        self.suppressed_frames = 0
+        self.capture: PacketCapture | None = None
         self.statistics: dict[int, int | float] = {}
-        self._last_stats_request = 0.0
-        self._stats_lock = asyncio.Lock()
+        self.history = StatisticsHistory(hass, self.mac, self.name)
+        self.statistics_scheduler = StatisticsScheduler(
+            hass,
+            self.get_statistics,
+            lambda: self.present,
+            self.product_code,
+            statistics_catalogue,
+        )
+        self._busy = False
         machine = get_machine_model(self.product_code)
         self.model = (
             machine.name if machine and machine.name else 'Prima Donna'
@@ -309,17 +392,18 @@ class DelongiPrimadonna:
             else len(AVAILABLE_PROFILES)
         )
         self.active_profile_id: int | None = None
-        for pid in range(1, self._n_profiles + 1):
-            AVAILABLE_PROFILES.setdefault(pid, f"Profile {pid}")
-        for pid in list(AVAILABLE_PROFILES):
-            if pid > self._n_profiles:
-                AVAILABLE_PROFILES.pop(pid)
-        self.profiles = list(AVAILABLE_PROFILES.values())
-        self._profiles_loaded = False
-
-        # Build dynamic beverage list from machine recipes
-        # name -> {id, coffee_qty, milk_qty}
-        self._recipe_map: dict[str, dict] = {}
+        self.profile_registry = ProfileRegistry(
+            hass, self.mac, self._n_profiles
+        )
+        self.snapshot = DeviceSnapshot(hass, self)
+
+        # Build dynamic beverage list from machine recipes. Recipes that
+        # compile can be adjusted; the others start with a frame recorded
+        # from the app or with the generic start command.
+        self._recipe_ids: dict[str, int] = {}
+        self._programs: dict[str, BeverageProgram] = {}
+        # name -> (coffee_qty, milk_qty) of recipes that did not compile
+        self._fixed_recipes: dict[str, tuple[int, int]] = {}
         self.available_beverages: list[str] = [BEVERAGE_NONE]
         if machine and machine.recipes:
             custom_idx = 0
@@ -331,102 +415,134 @@ class DelongiPrimadonna:
                     if rname == "Custom":
                         custom_idx += 1
                         rname = f"Custom {custom_idx}"
-                    elif rname in self._recipe_map:
+                    elif rname in self._recipe_ids:
                         rname = f"{rname} ({rid})"
-                    self._recipe_map[rname] = {
-                        'id': rid,
-                        'coffee_qty': recipe.coffee_qty or 0,
-                        'milk_qty': recipe.milk_qty or 0,
-                    }
+                    try:
+                        self._programs[rname] = BeverageProgram.from_recipe(
+                            rname, recipe
+                        )
+                    except BeverageError as error:
+                        _LOGGER.debug(
+                            "Beverage %s cannot be adjusted: %s", rname, error
+                        )
+                        self._fixed_recipes[rname] = (
+                            recipe.coffee_qty or 0,
+                            recipe.milk_qty or 0,
+                        )
+                    self._recipe_ids[rname] = rid
                     self.available_beverages.append(rname)
         if len(self.available_beverages) <= 1:
             # Fallback to legacy enum if no recipes
             self.available_beverages = [*AvailableBeverage]
 
+    @property
+    def connected(self) -> bool:
+        """Return True when the BLE session is ready."""
+        return self._connection.is_connected
+
+    @property
+    def present(self) -> bool:
+        """Return True when the machine is connected or advertising."""
+        return self.connected or self.advertisements.present
+
+    @property
+    def profiles(self) -> list[str]:
+        """Return the profile names ordered by id."""
+        return self.profile_registry.names
+
+    @property
+    def decoder_stats(self) -> dict[str, int]:
+        """Return the frame decoder counters."""
+        return {
+            'frames': self._decoder.frames,
+            'crc_errors': self._decoder.crc_errors,
+            'dropped_bytes': self._decoder.dropped_bytes,
+            'resynced_bytes': self._decoder.resynced_bytes,
+            'suppressed_frames': self.suppressed_frames,
+        }
+
+    @property
+    def update_signal(self) -> str:
+        """Return the dispatcher signal for this device's updates."""
+        return SIGNAL_DEVICE_UPDATE.format(self.mac)
+
+    def start(self) -> None:
+        """Start listening for the machine and its BLE session."""
+        self.advertisements.async_start()
+        self._connection.async_start()
+        self.statistics_scheduler.async_start()
+
+    async def async_load(self) -> None:
+        """Restore the state stored for this machine."""
+        await self.snapshot.async_load()
+        await self.history.async_load()
+        await self.profile_registry.async_load()
+
     async def disconnect(self):
         """Disconnect from the device."""
         _LOGGER.info("Disconnect from %s", self.mac)
+        self.statistics_scheduler.async_stop()
+        self.advertisements.async_stop()
+        self._switch_writer.async_cancel()
         async with self._lock:
-            client = self._client
-            if client is not None and client.is_connected:
-                try:
-                    await asyncio.wait_for(client.disconnect(), timeout=5)
-                except (
-                    asyncio.TimeoutError,
-                    Exception,
-                ) as error:  # noqa: BLE001
-                    _LOGGER.warning(
-                        "Forced disconnect [%s]: %s",
-                        type(error).__name__,
-                        error
-                    )
-                finally:
-                    self._client = None
-                    self.connected = False
-            else:
-                self._client = None
-                self.connected = False
+            self._commands.async_cancel_all()
+            await self._connection.async_close()
+        await self.async_stop_capture()
+        await self.history.async_flush()
+        await self.snapshot.async_flush()
+
+    async def async_start_capture(self, path: str | None = None) -> str:
+        """Record every raw packet to a rolling capture file."""
+        await self.async_stop_capture()
+        if path is None:
+            path = self._hass.config.path(
+                f"{DOMAIN}_{self.mac.replace(':', '').lower()}.dlcap"
+            )
+        capture = PacketCapture(self._hass, path)
+        self.capture = capture
+        self._connection.write_listener = partial(
+            capture.record, Direction.TX
+        )
+        _LOGGER.info("Capturing packets of %s to %s", self.mac, path)
+        return path
+
+    async def async_stop_capture(self) -> None:
+        """Stop recording and write the remaining packets."""
+        capture, self.capture = self.capture, None
+        self._connection.write_listener = None
+        if capture is not None:
+            await capture.async_close()
+            _LOGGER.info(
+                "Captured %d packets to %s", capture.records, capture.path
+            )
 
-    async def _connect(self, retries=3):
-        """Connect to the device."""
-        self._connecting = True
-        last_error = None
-        for attempt in range(retries):
-            try:
-                if self._client is None or not self._client.is_connected:
-                    self._device = bluetooth.async_ble_device_from_address(
-                        self._hass, self.mac, connectable=True
-                    )
-                    if not self._device:
-                        raise BleakError(
-                            (
-                                f"A device with address {self.mac}"
-                                " could not be found."
-                            )
-                        )
-                    self._client = BleakClient(self._device)
-                    _LOGGER.info(
-                        "Connect to %s (attempt %d)",
-                        self.mac,
-                        attempt + 1,
-                    )
-                    await asyncio.wait_for(
-                        self._client.connect(),
-                        timeout=10,
-                    )
-                    # Service discovery is performed during the connection
-                    # process. Accessing ``get_services`` directly raises a
-                    # ``FutureWarning`` in recent versions of Bleak.
-                    # ``self._client.services`` will contain the discovered
-                    # services once the connection succeeds.
-                    await asyncio.wait_for(
-                        self._client.start_notify(
-                            uuid.UUID(CONTROLL_CHARACTERISTIC),
-                            self._process_raw_data,
-                        ),
-                        timeout=10,
-                    )
-                self._connecting = False
-                return
-            except Exception as error:
-                _LOGGER.warning(
-                    "BLE connect error: %s (type: %s, attempt %d)",
-                    error,
-                    type(error).__name__,
-                    attempt + 1,
-                )
-                if self._client is not None:
-                    try:
-                        await asyncio.wait_for(
-                            self._client.disconnect(), timeout=5
-                        )
-                    except Exception:  # noqa: BLE001
-                        pass
-                self._client = None
-                last_error = error
-                await asyncio.sleep(2)
-        self._connecting = False
-        raise last_error
+    async def async_replay(self, path: str, speed: float = 1.0) -> int:
+        """Feed a capture back through the notification handler."""
+        return await async_replay(
+            self._hass, path, self._process_raw_data, speed
+        )
+
+    @callback
+    def _async_publish(self, *updates: DeviceUpdate) -> None:
+        """Tell entities which parts of the device state changed."""
+        if updates:
+            changed = frozenset(updates)
+            if not changed.isdisjoint(SNAPSHOT_UPDATES):
+                self.snapshot.async_schedule_save()
+            async_dispatcher_send(self._hass, self.update_signal, changed)
+
+    @callback
+    def _async_connection_changed(self) -> None:
+        """Publish BLE session changes."""
+        if self.connected:
+            self.statistics_scheduler.async_refresh_soon()
+            # Profiles may have been renamed on the machine since the
+            # last session; read them without holding up the caller
+            self._hass.async_create_background_task(
+                self._async_load_profiles(),
+                f'delonghi_primadonna profiles {self.mac}',
+            )
+        self._async_publish(DeviceUpdate.CONNECTION)
 
     def _make_switch_command(self):
         """Make hex command"""
@@ -434,480 +550,421 @@ class DelongiPrimadonna:
         base_command[3] = '1' if self.switches.energy_save else '0'
         base_command[4] = '1' if self.switches.cup_light else '0'
         base_command[5] = '1' if self.switches.sounds else '0'
-        hex_command = BYTES_SWITCH_COMMAND.copy()
-        hex_command[9] = int(''.join(base_command), 2)
-        return hex_command
+        return SWITCHES.render(mask=int(''.join(base_command), 2))
 
-    async def _event_trigger(self, value):
+    async def _async_write_switches(self) -> None:
+        """Send the switch bitmask as it is after the latest change."""
+        self.snapshot.async_schedule_save()
+        await self.send_command(self._make_switch_command())
+
+    @callback
+    def _event_trigger(self, value):
         """
         Trigger event
         :param value: event value
         """
-        event_data = {'data': str(hexlify(value, ' '))}
-
-        notification_message = (
-            str(hexlify(value, ' '))
-            .replace(' ', ', 0x')
-            .replace("b'", '[0x')
-            .replace("'", ']')
+        event_data, notification_message = _notification_payload(
+            bytes(value)
         )
-
-        if str(bytearray(value)) in DEVICE_NOTIFICATION:
-            notification_message = DEVICE_NOTIFICATION.get(
-                str(bytearray(value))
-            ).description
-            event_data.setdefault(
-                'type', DEVICE_NOTIFICATION.get(str(bytearray(value))).kind
-            )
-            event_data.setdefault(
-                'description',
-                DEVICE_NOTIFICATION.get(str(bytearray(value))).description,
-            )
+        event_data = dict(event_data)
         self._hass.bus.async_fire(f'{DOMAIN}_event', event_data)
 
         if self.notify:
             answer_id = f"{value[2]:02x}"
-            await self._hass.services.async_call(
-                'persistent_notification',
-                'create',
-                {
-                    'message': notification_message,
-                    'title': f'{self.name} {answer_id}',
-                    'notification_id': f'{self.mac}_err_{uuid.uuid4()}',
-                },
+            self._hass.async_create_task(
+                self._hass.services.async_call(
+                    'persistent_notification',
+                    'create',
+                    {
+                        'message': notification_message,
+                        'title': f'{self.name} {answer_id}',
+                        'notification_id': f'{self.mac}_err_{uuid.uuid4()}',
+                    },
+                )
             )
         _LOGGER.info('Event triggered: %s', event_data)
 
-    async def _process_raw_data(self, sender, value):
-        """Assemble incoming BLE packets and pass complete messages."""
-        self._rx_buffer.extend(value)
-
-        while True:
-            if len(self._rx_buffer) < 2:
-                return
-            try:
-                start_index = self._rx_buffer.index(START_BYTE)
-            except ValueError:
-                self._rx_buffer.clear()
-                return
+    @callback
+    def _process_raw_data(self, sender, value):
+        """Assemble incoming BLE packets and pass complete messages.
 
-            if start_index > 0:
-                del self._rx_buffer[:start_index]
-
-            if len(self._rx_buffer) < 2:
-                return
-
-            msg_len = self._rx_buffer[1] + 1
-
-            if len(self._rx_buffer) < msg_len:
-                return
-
-            packet = bytes(self._rx_buffer[:msg_len])
-            del self._rx_buffer[:msg_len]
-            await self._handle_data(sender, packet)
-
-    async def _handle_data(self, sender, value):
+        Frames are views into the decoder buffer, so the whole chain
+        runs synchronously and copies only what it keeps.
+        """
+        if self.capture is not None:
+            self.capture.record(Direction.RX, value)
+        for frame in self._decoder.feed(value):
+            self.metrics.frame_rate.record()
+            self._handle_data(sender, frame)
+
+    @callback
+    def _handle_data(self, sender, value):
         """Handle notifications from the device."""
-        if (
-            self._response_event is not None
-            and not self._response_event.is_set()
-        ):
-            self._response_event.set()
+        self._commands.async_resolve(value)
         answer_id = value[2] if len(value) > 2 else None
 
-        if answer_id in [0x75, 0x70]:
+        if answer_id in (0x75, 0x70):
+            # The machine repeats identical monitor frames constantly,
+            # skip a repeat of the last frame before any parsing or
+            # event work. Any other frame in between ends the repeat,
+            # so the event stream is unchanged.
+            if self._device_status == value:
+                self.suppressed_frames += 1
+                return
             monitor_data = parse_monitor_data(value)
             if monitor_data:
                 self._handle_monitor_data(monitor_data, answer_id, value)
         elif answer_id == 0xA4:
-            parsed = []
+            parsed = {}
             try:
-                parsed = self._parse_profile_response(
-                    list(value)
-                )
+                parsed = self._parse_profile_response(value)
             except Exception as err:  # noqa: BLE001
                 _LOGGER.warning("Failed to parse profile response: %s", err)
-            for pid, name in parsed.items():
-                AVAILABLE_PROFILES[pid] = name
-            _LOGGER.debug(
-                "Available profiles: %s",
-                AVAILABLE_PROFILES
-            )
-            self.profiles = list(AVAILABLE_PROFILES.values())
+            if self.profile_registry.async_update(parsed):
+                self._async_publish(DeviceUpdate.PROFILE)
         elif answer_id == 0xA9:
-            profile_id = value[4] if len(value) > 4 else None
-            status = value[5] if len(value) > 5 else None
+            try:
+                answer = SELECT_PROFILE_ANSWER.decode(value)
+            except ProtocolError as error:
+                _LOGGER.warning("Invalid profile change response: %s", error)
+                answer = None
             _LOGGER.debug(
-                "Profile change response id=%s status=%s raw=%s",
-                profile_id,
-                status,
+                "Profile change response %s raw=%s",
+                answer,
                 hexlify(value, " "),
             )
-            if profile_id is not None and status == 0:
-                self.active_profile_id = profile_id
+            if answer is not None and answer.status == 0:
+                self.active_profile_id = answer.profile
+                self._async_publish(DeviceUpdate.PROFILE)
         elif answer_id == 0xA2:
-            await self._parse_statistics(value)
-
-        hex_value = hexlify(value, ' ')
+            try:
+                self._parse_statistics(value)
+            except ProtocolError as error:
+                _LOGGER.warning("Invalid statistics response: %s", error)
+            else:
+                self.history.async_record(self.statistics)
+                self._async_publish(DeviceUpdate.STATISTICS)
 
-        if self._device_status != hex_value:
+        if self._device_status != value:
             _LOGGER.info(
                 'Received data: %s from %s',
-                hex_value,
+                hexlify(value, ' '),
                 sender
             )
-            await self._event_trigger(value)
-
-        self._device_status = hex_value
+            self._event_trigger(value)
+            self._device_status = bytes(value)
 
     def _handle_monitor_data(
         self, monitor_data: MonitorData, answer_id: int, raw_packet: bytes
     ) -> None:
         """Apply parsed monitor data to device state."""
+        updates: list[DeviceUpdate] = []
+
         # Power state
-        self.switches.is_on = monitor_data.status > 0
+        is_on = monitor_data.status > 0
+        if is_on != self.switches.is_on:
+            self.switches.is_on = is_on
+            updates.append(DeviceUpdate.STATUS)
+        self.statistics_scheduler.async_set_powered(is_on)
+
+        # Counters change when a beverage is done, poll them soon after.
+        # Rinsing, brewing and cleaning report states above ready (7).
+        busy = monitor_data.status > 7
+        if self._busy and not busy:
+            self.statistics_scheduler.async_mark_activity()
+        self._busy = busy
 
         # Nozzle state (only present in v2 / 0x75 packets)
         if monitor_data.nozzle_state != -1:
-            self.steam_nozzle = NOZZLE_STATE.get(
+            steam_nozzle = NOZZLE_STATE.get(
                 monitor_data.nozzle_state, monitor_data.nozzle_state
             )
+            if steam_nozzle != self.steam_nozzle:
+                self.steam_nozzle = steam_nozzle
+                updates.append(DeviceUpdate.NOZZLE)
 
         # Alarm bitmask — feeds the Descale binary sensor (bit 2)
-        self.service = monitor_data.alarms
+        if monitor_data.alarms != self.service:
+            self.service = monitor_data.alarms
+            updates.append(DeviceUpdate.ALARMS)
 
         # Display status: show first active alarm, or machine state
         if monitor_data.alarms > 0:
             for i in range(32):
                 if (monitor_data.alarms >> i) & 1:
-                    self.status = DEVICE_STATUS.get(i, f"Alarm {i}")
+                    status = DEVICE_STATUS.get(i, f"Alarm {i}")
                     break
         elif monitor_data.status in (0, 1, 5):
-            self.status = "Ready"
+            status = "Ready"
         else:
-            self.status = f"State {monitor_data.status}"
+            status = f"State {monitor_data.status}"
+        if status != self.status:
+            self.status = status
+            updates.append(DeviceUpdate.STATUS)
 
         # Active switches (v2 only; v1 uses different byte offsets)
         if answer_id == 0x75:
-            self.active_switches = parse_switches(raw_packet)
+            active_switches = parse_switches(raw_packet)
+            if active_switches != self.active_switches:
+                self.active_switches = active_switches
+                updates.append(DeviceUpdate.SWITCHES)
 
-    def _parse_profile_response(
-        self,
-        data: list[int],
-    ) -> dict[int, str]:
-        """Parse profile names sent by the machine."""
+        self._async_publish(*updates)
 
-        b = bytes(data)
-        if len(b) < 4 or b[0] != 0xD0:
-            raise ValueError("Wrong start byte")
-
-        profiles: dict[int, str] = {}
-        NAME_SIZE = 20
-        NAME_OFFSET = 1
-        NAME_HEADER = 4
-        profile_index = 1
-        idx = NAME_HEADER
-        while idx + NAME_SIZE < len(b):
-            profiles.setdefault(
-                profile_index,
-                b[idx:idx + NAME_SIZE]
-                .decode("utf-16-be")
-                .rstrip("\x00")
-                .strip(),
+    def _parse_profile_response(self, data: bytes) -> dict[int, str]:
+        """Parse profile names sent by the machine."""
+        return {
+            profile_id: name.decode('utf-16-be').rstrip('\x00').strip()
+            for profile_id, (name, _) in enumerate(
+                PROFILES_ANSWER.iter_records(data), 1
             )
-            profile_index += 1
-            idx += NAME_SIZE + NAME_OFFSET
-        return profiles
+        }
 
     async def power_on(self) -> None:
         """Turn the device on."""
-        await self.send_command(BYTES_POWER)
+        await self.send_command(POWER)
 
     async def cup_light_on(self) -> None:
         """Turn the cup light on."""
         self.switches.cup_light = True
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
 
     async def cup_light_off(self) -> None:
         """Turn the cup light off."""
         self.switches.cup_light = False
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
 
     async def energy_save_on(self):
         """Enable energy save mode"""
         self.switches.energy_save = True
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
 
     async def energy_save_off(self):
         """Enable energy save mode"""
         self.switches.energy_save = False
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
 
     async def sound_alarm_on(self):
         """Enable sound alarm"""
         self.switches.sounds = True
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
 
     async def sound_alarm_off(self):
         """Disable sound alarm"""
         self.switches.sounds = False
-        await self.send_command(self._make_switch_command())
+        await self._switch_writer.async_call()
+
+    async def beverage_start(
+        self, beverage: str, profile: int | None = None, **overrides: int
+    ) -> None:
+        """Start beverage by name (recipe or legacy enum).
 
-    async def beverage_start(self, beverage: str) -> None:
-        """Start beverage by name (recipe or legacy enum)."""
+        ``overrides`` replace recipe values such as ``coffee_qty`` or
+        ``aroma`` and are checked against the recipe bounds. Unknown
+        beverages, and overrides for a beverage without a compiled
+        recipe, raise ``BeverageError`` before anything is sent.
+        ``profile`` selects a user profile first.
+        """
         if beverage == BEVERAGE_NONE:
             return
-        # Try recipe map (dynamic from machine model)
-        recipe = self._recipe_map.get(beverage)
-        if recipe:
-            rid = recipe['id']
-            # Use hardcoded command if available for this recipe ID
-            legacy = RECIPE_ID_TO_BEVERAGE.get(rid)
-            if legacy and legacy in BEVERAGE_COMMANDS:
-                _LOGGER.info(
-                    "Starting %s (recipe %d) via legacy",
-                    beverage, rid,
+        recipe_id = self._recipe_ids.get(beverage)
+        if recipe_id is not None:
+            legacy = RECIPE_ID_TO_BEVERAGE.get(recipe_id)
+            program = self._programs.get(beverage)
+            if not overrides and legacy in BEVERAGE_COMMANDS:
+                # Frames recorded from the app for the default recipe
+                frame = BEVERAGE_COMMANDS[legacy].on
+            elif program is not None:
+                frame = program.start_frame(**overrides)
+            elif overrides:
+                raise BeverageError(
+                    f"{beverage} cannot be adjusted: its recipe is "
+                    "incomplete in the machine catalog"
                 )
-                await self.send_command(BEVERAGE_COMMANDS[legacy].on)
             else:
-                _LOGGER.info(
-                    "Starting %s (recipe %d) via dynamic",
-                    beverage, rid,
+                frame = _build_start_command(
+                    recipe_id, *self._fixed_recipes[beverage]
                 )
-                cmd = _build_start_command(
-                    rid, recipe['coffee_qty'], recipe['milk_qty']
+        elif beverage in BEVERAGE_COMMANDS:
+            if overrides:
+                raise BeverageError(
+                    f"{beverage} has no recipe to apply "
+                    f"{', '.join(sorted(overrides))} to"
                 )
-                await self.send_command(cmd)
-            self.cooking = beverage
-            return
-        _LOGGER.warning("Unknown beverage: %s", beverage)
+            frame = BEVERAGE_COMMANDS[beverage].on
+        else:
+            raise BeverageError(f"Unknown beverage: {beverage}")
+        if profile is not None and profile != self.active_profile_id:
+            await self.select_profile(profile)
+        _LOGGER.info("Starting %s %s", beverage, overrides or '')
+        await self.send_command(frame, priority=Priority.BEVERAGE)
+        self.cooking = beverage
 
     async def beverage_cancel(self) -> None:
         """Cancel beverage"""
         if self.cooking == BEVERAGE_NONE:
             return
-        recipe = self._recipe_map.get(self.cooking)
-        if recipe:
-            await self.send_command(_build_stop_command(recipe['id']))
+        recipe_id = self._recipe_ids.get(self.cooking)
+        if recipe_id is not None:
+            await self.send_command(
+                _build_stop_command(recipe_id),
+                priority=Priority.BEVERAGE,
+            )
+        elif self.cooking in BEVERAGE_COMMANDS:
+            await self.send_command(
+                BEVERAGE_COMMANDS[self.cooking].off,
+                priority=Priority.BEVERAGE,
+            )
         else:
             _LOGGER.warning("Cannot cancel unknown beverage: %s", self.cooking)
         self.cooking = BEVERAGE_NONE
 
     async def debug(self):
         """Send command which causes status reply"""
-        await self.send_command(DEBUG)
+        await self.send_command(STATUS_REQUEST, priority=Priority.STATUS)
 
     async def get_device_name(self):
         """
         Get device name
         :return: device name
         """
-        async with self._lock:
-            try:
-                await self._connect()
-                self.hostname = bytes(
-                    await self._client.read_gatt_char(
+        try:
+            client = await self._connection.async_get_client()
+            waiting = time.monotonic()
+            async with self._lock:
+                self.metrics.lock_wait.record(time.monotonic() - waiting)
+                hostname = bytes(
+                    await client.read_gatt_char(
                         uuid.UUID(NAME_CHARACTERISTIC)
                     )
                 ).decode('utf-8')
-                await self._client.write_gatt_char(
-                    uuid.UUID(CONTROLL_CHARACTERISTIC), bytearray(DEBUG)
-                )
-                self.connected = True
-            except BleakDBusError as error:
-                self.connected = False
-                _LOGGER.warning('BleakDBusError: %s', error)
-            except BleakError as error:
-                self.connected = False
-                _LOGGER.warning('BleakError: %s', error)
-            except asyncio.exceptions.TimeoutError as error:
-                self.connected = False
-                _LOGGER.info('TimeoutError: %s at device connection', error)
-            except asyncio.exceptions.CancelledError as error:
-                self.connected = False
-                _LOGGER.warning('CancelledError: %s', error)
-
-        if self.connected and not self._profiles_loaded:
-            command = BYTES_LOAD_PROFILES.copy()
-            command[5] = self._n_profiles
-            await self.send_command(command)
-            # Default to first profile until the user switches
-            if self.active_profile_id is None:
-                self.active_profile_id = 1
-            self._profiles_loaded = True
+                if hostname != self.hostname:
+                    self.hostname = hostname
+                    self.snapshot.async_schedule_save()
+                await self._connection.async_write(STATUS_REQUEST)
+        except BleakDBusError as error:
+            _LOGGER.warning('BleakDBusError: %s', error)
+        except BleakError as error:
+            _LOGGER.warning('BleakError: %s', error)
+        except asyncio.exceptions.TimeoutError as error:
+            _LOGGER.info('TimeoutError: %s at device connection', error)
+        except asyncio.exceptions.CancelledError as error:
+            _LOGGER.warning('CancelledError: %s', error)
+
+        # Default to first profile until the user switches
+        if self.connected and self.active_profile_id is None:
+            self.active_profile_id = 1
+
+    async def _async_load_profiles(self) -> None:
+        """Read the profile names; the answer updates the registry."""
+        await self.send_command(
+            LOAD_PROFILES.render(last=self._n_profiles),
+            priority=Priority.STATUS,
+        )
 
     async def set_time(self, dt: datetime) -> None:
         """Set device clock from provided datetime."""
-        packet = BYTES_TIME_COMMAND.copy()
-        packet[4] = dt.hour & 0xFF
-        packet[5] = dt.minute & 0xFF
-        await self.send_command(packet)
+        await self.send_command(
+            SET_TIME.render(hour=dt.hour & 0xFF, minute=dt.minute & 0xFF)
+        )
 
     async def select_profile(self, profile_id) -> None:
         """select a profile."""
         _LOGGER.debug("Send select profile command id=%s", profile_id)
-        message = [0x0D, 0x06, 0xA9, 0xF0, profile_id, 0xD7, 0xC0]
-        await self.send_command(message)
+        await self.send_command(SELECT_PROFILE.render(profile=profile_id))
 
     async def set_auto_power_off(self, power_off_interval) -> None:
         """Set auto power off time."""
-        message = copy.deepcopy(BYTES_AUTOPOWEROFF_COMMAND)
-        message[9] = power_off_interval
-        await self.send_command(message)
+        await self.send_command(
+            AUTO_POWER_OFF.render(value=power_off_interval)
+        )
 
     async def set_water_hardness(self, hardness_level) -> None:
         """Set water hardness"""
-        message = copy.deepcopy(BYTES_WATER_HARDNESS_COMMAND)
-        message[9] = hardness_level
-        await self.send_command(message)
+        await self.send_command(WATER_HARDNESS.render(value=hardness_level))
 
     async def set_water_temperature(self, temperature_level) -> None:
         """Set water temperature"""
-        message = copy.deepcopy(BYTES_WATER_TEMPERATURE_COMMAND)
-        message[9] = temperature_level
-        await self.send_command(message)
+        await self.send_command(
+            WATER_TEMPERATURE.render(value=temperature_level)
+        )
 
     async def common_command(self, command: str) -> None:
         """Send custom BLE command"""
         message = [int(x, 16) for x in command.split(' ')]
         await self.send_command(message)
 
-    async def send_command(self, message, retries=3):
-        async with self._lock:
-            message_to_send = copy.deepcopy(message)
-            for attempt in range(retries):
-                try:
-                    await self._connect()
-                    crc = crc_hqx(bytearray(message_to_send[:-2]), 0x1D0F)
-                    crc_bytes = crc.to_bytes(2, byteorder='big')
-                    message_to_send[-2] = crc_bytes[0]
-                    message_to_send[-1] = crc_bytes[1]
-                    _LOGGER.info(
-                        'Send command: %s',
-                        hexlify(bytearray(message_to_send), " ")
-                    )
-                    self._response_event = asyncio.Event()
-                    await self._client.write_gatt_char(
-                        CONTROLL_CHARACTERISTIC, bytearray(message_to_send)
-                    )
-                    try:
-                        await asyncio.wait_for(
-                            self._response_event.wait(),
-                            timeout=10,
-                        )
-                    except asyncio.TimeoutError:
-                        _LOGGER.warning(
-                            'Timeout waiting for response to command: %s',
-                            hexlify(bytearray(message_to_send), " ")
-                        )
-                    finally:
-                        self._response_event = None
-                    return
-                except BleakError as error:
-                    self.connected = False
-                    self._client = None
-                    _LOGGER.warning(
-                        'BleakError: %s (attempt %d)',
-                        error,
-                        attempt + 1
-                    )
-                    await asyncio.sleep(2)
-            _LOGGER.error('Failed to send command after %d attempts', retries)
-
-    async def _parse_statistics(self, data: bytes) -> None:
-        """Parse statistics response"""
-        if len(data) < 8:
-            return
-
-        hex_data = hexlify(data, " ").decode('utf-8')
-        _LOGGER.debug("Statistics Parser. Raw: %s", hex_data)
+    async def send_command(
+        self, message, retries=3, priority=Priority.CONTROL
+    ) -> bytes | None:
+        """Send a command and return the response frame, if any.
 
-        # [0]=D0 [1]=Len [2]=A2 [3]=0F [4-5]=StartAddr
-        start_param_id = (data[4] << 8) | data[5]
-
-        # Offset to first value (byte 6)
-        current_offset = 6
-        current_param_id = start_param_id
+        ``message`` is either a sealed frame from :mod:`.commands`, sent
+        as is, or a list of ints whose two CRC bytes are filled in.
+        ``priority`` orders the write against other machines sharing
+        the adapter.
+        """
+        frame = message if isinstance(message, bytes) else seal(message)
+        for attempt in range(retries):
+            try:
+                _LOGGER.info('Send command: %s', hexlify(frame, " "))
+                return await self._commands.async_request(frame, priority)
+            except asyncio.TimeoutError:
+                _LOGGER.warning(
+                    'No response to request 0x%02x within %ss: %s',
+                    frame[2],
+                    RESPONSE_TIMEOUT,
+                    hexlify(frame, " ")
+                )
+                return None
+            except BleakError as error:
+                await self._connection.async_invalidate()
+                _LOGGER.warning(
+                    'BleakError on request 0x%02x: %s (attempt %d)',
+                    frame[2],
+                    error,
+                    attempt + 1
+                )
+                if attempt + 1 < retries:
+                    await asyncio.sleep(COMMAND_RETRY_DELAY * (attempt + 1))
+        _LOGGER.error(
+            'Failed to send request 0x%02x after %d attempts',
+            frame[2],
+            retries
+        )
+        return None
 
-        # 1. First value belongs to StartAddr
-        if current_offset + 4 <= len(data) - 2:
-            val = int.from_bytes(
-                data[current_offset:current_offset + 4],
-                byteorder='big',
-            )
-            self.statistics[current_param_id] = val
-            _LOGGER.debug(
-                "Statistics Parser.Parsed (Implicit): ID %s = %s",
-                current_param_id, val,
-            )
-            current_offset += 4
+    async def _async_write(self, frame: bytes, priority: Priority) -> None:
+        """Write a frame, taking turns with the other machines."""
+        if self._coordinator is None:
+            await self._connection.async_write(frame)
+            return
+        # Connect first so a slow connect does not hold the write lease
+        await self._connection.async_get_client()
+        async with self._coordinator.async_command(self.mac, priority):
+            await self._connection.async_write(frame)
 
-        # 2. Subsequent parameters are [ID 2B] + [Value 4B]
-        while current_offset + 6 <= len(data) - 2:
-            pid = (
-                (data[current_offset] << 8)
-                | data[current_offset + 1]
-            )
-            val = int.from_bytes(
-                data[current_offset + 2:current_offset + 6],
-                byteorder='big',
-            )
-            self.statistics[pid] = val
+    def _parse_statistics(self, data: bytes) -> None:
+        """Parse statistics response"""
+        values = dict(iter_statistics(data))
+        if _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug(
-                "Statistics Parser.Parsed (Explicit): ID %s = %s",
-                pid, val,
+                "Statistics Parser. Raw: %s, values: %s",
+                hexlify(data, " ").decode('utf-8'),
+                values,
             )
-            current_offset += 6
-
-        # Calculate combined values for total coffee
-        if 3000 in self.statistics:
-            total = self.statistics[3000] + self.statistics.get(3077, 0)
-            self.statistics[-3077] = total
-
-        # Convert water quantity to liters (divide by 2000).
-        # Use float division to preserve precision.
-        if 106 in self.statistics:
-            water_ml = self.statistics.get(106, 0)
-            if water_ml > 0:
-                self.statistics[10106] = round(water_ml / 2000.0, 2)
+        self.statistics.update(values)
+        apply_derived_metrics(self.statistics, values)
 
     async def update_statistics(self) -> None:
-        """Update statistics with throttling."""
-        # Prevent concurrent updates from multiple sensors
-        if self._stats_lock.locked():
-            return
+        """Refresh the polled statistics now."""
+        await self.statistics_scheduler.async_refresh()
 
-        async with self._stats_lock:
-            current_time = time.monotonic()
-            # Update at most once every 60 seconds
-            if current_time - self._last_stats_request < 60:
-                return
-
-            self._last_stats_request = current_time
-            # Maintenance counters (100-109)
-            await self.get_statistics(100, 10)
-            await asyncio.sleep(0.3)
-
-            # Extended maintenance (110-119)
-            await self.get_statistics(110, 10)
-            await asyncio.sleep(0.3)
-
-            # Coffee beverage totals (3000-3009)
-            await self.get_statistics(3000, 10)
-            await asyncio.sleep(0.3)
-
-            # Request additional coffee totals range
-            # Covers: 3077-3080 (3077 is combined with 3000 for total coffee)
-            await self.get_statistics(3077, 4)
-            await asyncio.sleep(0.3)
-
-            # Optional: Request tea/other beverages if needed
-            # await self.get_statistics(3025, 1)  # Tea counter
-
-    async def get_statistics(self, start_index: int, count: int) -> None:
+    async def get_statistics(
+        self, start_index: int, count: int
+    ) -> bytes | None:
         """Get statistics from the machine"""
-        message = copy.deepcopy(BYTES_STATISTICS_COMMAND)
-        message[4] = (start_index >> 8) & 0xFF
-        message[5] = start_index & 0xFF
-        message[6] = count
-        await self.send_command(message)
+        return await self.send_command(
+            STATISTICS.render(start=start_index & 0xFFFF, count=count),
+            priority=Priority.STATISTICS,
+        )
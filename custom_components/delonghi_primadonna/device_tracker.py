@@ -1,5 +1,7 @@
 """Device tracker entity for Delonghi Primadonna."""
 
+from typing import Any
+
 from homeassistant.components.device_tracker.config_entry import ScannerEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -7,7 +9,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .base_entity import DelonghiDeviceEntity
 from .const import DOMAIN
-from .device import DelongiPrimadonna
+from .device import DelongiPrimadonna, DeviceUpdate
 
 
 async def async_setup_entry(
@@ -25,6 +27,9 @@ async def async_setup_entry(
 class DelongiPrimadonnaDeviceTracker(DelonghiDeviceEntity, ScannerEntity):
     """Implementation of a Delonghi Primadonna device tracker"""
     _attr_name = None
+    _update_types = frozenset(
+        {DeviceUpdate.STATUS, DeviceUpdate.CONNECTION, DeviceUpdate.PRESENCE}
+    )
 
     @property
     def icon(self) -> str:
@@ -52,9 +57,13 @@ class DelongiPrimadonnaDeviceTracker(DelonghiDeviceEntity, ScannerEntity):
 
     @property
     def is_connected(self) -> bool:
-        """Return true if the device is connected to the network."""
-        return self.device.connected
+        """Return true if the device is connected or advertising."""
+        return self.device.present
 
-    async def async_update(self):
-        """Updates the device status"""
-        self.hass.async_create_task(self.device.get_device_name())
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the signal strength and session state."""
+        return {
+            'rssi': self.device.advertisements.rssi,
+            'connected': self.device.connected,
+        }
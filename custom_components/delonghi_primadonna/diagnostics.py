@@ -0,0 +1,43 @@
+"""Diagnostics support for Delonghi Primadonna."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_MAC
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import async_get_coordinator
+from .device import DelongiPrimadonna
+
+TO_REDACT = {CONF_MAC}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    device: DelongiPrimadonna = hass.data[DOMAIN][entry.unique_id]
+    return {
+        'entry': async_redact_data(dict(entry.data), TO_REDACT),
+        'device': {
+            'model': device.model,
+            'product_code': device.product_code,
+            'connected': device.connected,
+            'status': device.status,
+            'is_on': device.switches.is_on,
+            'steam_nozzle': device.steam_nozzle,
+            'active_profile_id': device.active_profile_id,
+            'profiles': device.profiles,
+            'statistics': device.statistics,
+            'statistics_ranges': device.statistics_scheduler.ranges,
+            'statistics_populated': device.statistics_scheduler.populated,
+        },
+        'advertisement': device.advertisements.as_dict(),
+        'decoder': device.decoder_stats,
+        'metrics': device.metrics.as_dict(),
+        'adapter': async_get_coordinator(hass).as_dict(),
+    }
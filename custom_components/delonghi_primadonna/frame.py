@@ -0,0 +1,140 @@
+"""Frame assembly for Delonghi Primadonna notifications."""
+
+from __future__ import annotations
+
+from binascii import crc_hqx
+from collections.abc import Iterator
+
+START_BYTE = 0xD0
+CRC_SEED = 0x1D0F
+
+# Smallest frame: start, length, answer id and two CRC bytes
+MIN_FRAME_SIZE = 5
+# The length byte counts everything after the start byte
+MAX_FRAME_SIZE = 0x100
+
+
+class FrameDecoder:
+    """Reassemble BLE notification chunks into CRC checked frames.
+
+    Chunks are copied once into a fixed-capacity ring buffer. Complete
+    frames are yielded as ``memoryview`` slices of that buffer, so a
+    frame is only valid until the next one is requested. Copy it with
+    ``bytes()`` to keep it.
+    """
+
+    def __init__(self, capacity: int = 4 * MAX_FRAME_SIZE) -> None:
+        """Initialize an empty decoder."""
+        if capacity < MAX_FRAME_SIZE:
+            raise ValueError(f"Capacity must be at least {MAX_FRAME_SIZE}")
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._scratch = bytearray(MAX_FRAME_SIZE)
+        self._scratch_view = memoryview(self._scratch)
+        self._head = 0
+        self._size = 0
+        self.frames = 0
+        self.crc_errors = 0
+        self.dropped_bytes = 0
+        self.resynced_bytes = 0
+
+    def __len__(self) -> int:
+        """Return the number of buffered bytes."""
+        return self._size
+
+    def reset(self) -> None:
+        """Discard buffered bytes, e.g. after a reconnect."""
+        self._head = 0
+        self._size = 0
+
+    def feed(self, chunk: bytes | bytearray | memoryview) -> Iterator[
+        memoryview
+    ]:
+        """Buffer a chunk and yield every complete, valid frame."""
+        data = memoryview(chunk)
+        offset = 0
+        while offset < len(data):
+            # A full buffer always holds a complete candidate frame, so
+            # draining it frees space for the rest of the chunk.
+            free = self._capacity - self._size
+            self._write(data[offset:offset + free])
+            offset += free
+            yield from self._drain()
+
+    def _drain(self) -> Iterator[memoryview]:
+        """Yield buffered frames until more data is needed."""
+        while self._size >= MIN_FRAME_SIZE:
+            if not self._seek_start() or self._size < MIN_FRAME_SIZE:
+                return
+            length = self._at(1) + 1
+            if length < MIN_FRAME_SIZE:
+                self._skip(1)
+                self.resynced_bytes += 1
+                continue
+            if self._size < length:
+                return
+            frame = self._frame(length)
+            crc = (frame[-2] << 8) | frame[-1]
+            if crc_hqx(frame[:-2], CRC_SEED) != crc:
+                # A start byte inside a broken frame may begin the next
+                # one, so resynchronise on the following byte.
+                self.crc_errors += 1
+                self.resynced_bytes += 1
+                self._skip(1)
+                continue
+            self._skip(length)
+            self.frames += 1
+            yield frame
+
+    def _write(self, data: memoryview) -> None:
+        """Append bytes that fit into the free space."""
+        size = len(data)
+        if self._size == 0:
+            self._head = 0
+        tail = (self._head + self._size) % self._capacity
+        first = min(size, self._capacity - tail)
+        self._view[tail:tail + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+        self._size += size
+
+    def _seek_start(self) -> bool:
+        """Drop bytes up to the next start byte."""
+        end = self._head + self._size
+        index = self._buffer.find(
+            START_BYTE, self._head, min(end, self._capacity)
+        )
+        if index < 0 and end > self._capacity:
+            index = self._buffer.find(START_BYTE, 0, end - self._capacity)
+            if index >= 0:
+                index += self._capacity
+        if index < 0:
+            self.dropped_bytes += self._size
+            self.reset()
+            return False
+        skipped = index - self._head
+        if skipped:
+            self.dropped_bytes += skipped
+            self._skip(skipped)
+        return True
+
+    def _at(self, offset: int) -> int:
+        """Return a buffered byte relative to the head."""
+        return self._buffer[(self._head + offset) % self._capacity]
+
+    def _frame(self, length: int) -> memoryview:
+        """Return a contiguous view of the next ``length`` bytes."""
+        start = self._head
+        end = start + length
+        if end <= self._capacity:
+            return self._view[start:end]
+        first = self._capacity - start
+        self._scratch_view[:first] = self._view[start:]
+        self._scratch_view[first:length] = self._view[:length - first]
+        return self._scratch_view[:length]
+
+    def _skip(self, count: int) -> None:
+        """Consume ``count`` bytes from the head."""
+        self._size -= count
+        self._head = (self._head + count) % self._capacity if self._size else 0
@@ -0,0 +1,297 @@
+"""Usage history of the Delonghi Primadonna counters.
+
+The machine reports lifetime totals. :class:`CounterHistory` turns
+consecutive totals into deltas and keeps them in three tiers of
+``array`` columns: raw samples, hourly buckets and daily buckets, each
+capped so the oldest entries fall off. Usage over a period is summed
+from the finest tier that still covers it.
+
+:class:`StatisticsHistory` keeps one history per tracked parameter,
+persists them with a delayed ``Store`` save and imports hourly sums
+into the recorder's long-term statistics.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (DOMAIN, HISTORY_DAILY_BUCKETS, HISTORY_HOURLY_BUCKETS,
+                    HISTORY_RAW_SAMPLES, HISTORY_SAVE_DELAY)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+HOUR = 3600
+
+# Parameters with a history: id -> (key, unit)
+TRACKED_PARAMETERS: dict[int, tuple[str, str | None]] = {
+    -3077: ('total_coffee', None),
+    3001: ('total_coffee_with_milk', None),
+    10106: ('total_water', 'L'),
+    105: ('descaling_count', None),
+    115: ('milk_cleaning_count', None),
+    108: ('filter_replace_count', None),
+}
+
+
+class _Tier:
+    """Append-only ``(start, delta)`` columns capped at ``size`` rows."""
+
+    __slots__ = ('size', 'starts', 'deltas', 'evicted_until')
+
+    def __init__(self, size: int, typecode: str) -> None:
+        self.size = size
+        self.starts = array(typecode)
+        self.deltas = array('d')
+        # Entries before this time were dropped
+        self.evicted_until = float('-inf')
+
+    def add(self, start: float, delta: float, merge: bool) -> None:
+        """Append a row, or add to the last one when ``merge`` matches."""
+        if merge and self.starts and self.starts[-1] == start:
+            self.deltas[-1] += delta
+            return
+        self.starts.append(start)
+        self.deltas.append(delta)
+        excess = len(self.starts) - self.size
+        if excess > 0:
+            # The next remaining row starts where the dropped ones end
+            self.evicted_until = self.starts[excess]
+            del self.starts[:excess]
+            del self.deltas[:excess]
+
+    def covers(self, start: float) -> bool:
+        """Return True if no entry at or after ``start`` was dropped."""
+        return start >= self.evicted_until
+
+    def total_since(self, start: float) -> float:
+        """Return the sum of the rows starting at or after ``start``."""
+        return sum(self.deltas[bisect_left(self.starts, start):])
+
+    def as_list(self) -> list[list[float]]:
+        """Return the columns for storage."""
+        return [self.starts.tolist(), self.deltas.tolist()]
+
+    def load(self, data: list[list[float]]) -> None:
+        """Replace the columns with stored ones."""
+        starts, deltas = data
+        self.starts = array(self.starts.typecode, starts)
+        self.deltas = array('d', deltas)
+
+
+class CounterHistory:
+    """Deltas of one lifetime counter at three resolutions."""
+
+    __slots__ = ('value', 'sum', 'raw', 'hourly', 'daily')
+
+    def __init__(self) -> None:
+        """Initialize an empty history."""
+        # Last total seen and the sum of all deltas since tracking began
+        self.value: float | None = None
+        self.sum = 0.0
+        self.raw = _Tier(HISTORY_RAW_SAMPLES, 'd')
+        self.hourly = _Tier(HISTORY_HOURLY_BUCKETS, 'q')
+        self.daily = _Tier(HISTORY_DAILY_BUCKETS, 'q')
+
+    def record(self, value: float, timestamp: float, day_start: int) -> float:
+        """Record a total and return its delta to the previous one.
+
+        A total lower than the previous one means the counter was reset
+        or the machine was replaced; it becomes the new baseline.
+        """
+        previous, self.value = self.value, value
+        if previous is None or value <= previous:
+            return 0.0
+        delta = value - previous
+        self.sum += delta
+        self.raw.add(timestamp, delta, merge=False)
+        self.hourly.add(int(timestamp) // HOUR * HOUR, delta, merge=True)
+        self.daily.add(day_start, delta, merge=True)
+        return delta
+
+    def total_since(self, start: float) -> float:
+        """Return the usage since ``start`` (epoch seconds).
+
+        Raw samples are exact. Older periods are summed from hourly or
+        daily buckets, which include the whole bucket ``start`` is in.
+        """
+        if self.raw.covers(start):
+            return self.raw.total_since(start)
+        if self.hourly.covers(start):
+            return self.hourly.total_since(int(start) // HOUR * HOUR)
+        local = dt_util.as_local(dt_util.utc_from_timestamp(start))
+        day = dt_util.start_of_local_day(local).timestamp()
+        return self.daily.total_since(int(day))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the history for storage."""
+        return {
+            'value': self.value,
+            'sum': self.sum,
+            'raw': self.raw.as_list(),
+            'hourly': self.hourly.as_list(),
+            'daily': self.daily.as_list(),
+            'evicted': [
+                tier.evicted_until if tier.evicted_until > 0 else None
+                for tier in (self.raw, self.hourly, self.daily)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CounterHistory:
+        """Return a history restored from storage."""
+        history = cls()
+        history.value = data['value']
+        history.sum = data['sum']
+        tiers = (history.raw, history.hourly, history.daily)
+        for tier, key in zip(tiers, ('raw', 'hourly', 'daily')):
+            tier.load(data[key])
+        for tier, evicted in zip(tiers, data['evicted']):
+            if evicted is not None:
+                tier.evicted_until = evicted
+        return history
+
+
+class StatisticsHistory:
+    """Usage histories of one machine."""
+
+    def __init__(self, hass: HomeAssistant, mac: str, name: str) -> None:
+        """Initialize empty histories."""
+        self._hass = hass
+        self._name = name
+        self._slug = mac.replace(':', '').lower()
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f'{DOMAIN}.history_{self._slug}'
+        )
+        self.counters: dict[int, CounterHistory] = {}
+        # Hours whose sums the recorder has not received yet
+        self._pending_import: dict[int, set[int]] = {}
+        self._importer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=HISTORY_SAVE_DELAY,
+            immediate=False,
+            function=self._async_import,
+        )
+
+    async def async_load(self) -> None:
+        """Restore the stored histories."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        for param_id, stored in data.get('counters', {}).items():
+            try:
+                self.counters[int(param_id)] = CounterHistory.from_dict(
+                    stored
+                )
+            except (KeyError, TypeError, ValueError) as error:
+                _LOGGER.warning(
+                    "Dropping unreadable history of %s: %s", param_id, error
+                )
+
+    async def async_flush(self) -> None:
+        """Write pending changes now, e.g. before unloading."""
+        self._importer.async_cancel()
+        await self._async_import()
+        await self._store.async_save(self._data_to_save())
+
+    def total_since(self, param_id: int, period: timedelta) -> float | None:
+        """Return the usage of a parameter over the last ``period``."""
+        counter = self.counters.get(param_id)
+        if counter is None or counter.value is None:
+            return None
+        return counter.total_since(time.time() - period.total_seconds())
+
+    @callback
+    def async_record(self, statistics: dict[int, int | float]) -> None:
+        """Record the tracked totals of a statistics refresh."""
+        timestamp = time.time()
+        day_start = int(dt_util.start_of_local_day().timestamp())
+        hour = int(timestamp) // HOUR * HOUR
+        changed = False
+        for param_id in TRACKED_PARAMETERS:
+            value = statistics.get(param_id)
+            if value is None:
+                continue
+            counter = self.counters.get(param_id)
+            if counter is None:
+                counter = self.counters[param_id] = CounterHistory()
+            if counter.value == value:
+                continue
+            changed = True
+            if counter.record(value, timestamp, day_start):
+                self._pending_import.setdefault(param_id, set()).add(hour)
+        if changed:
+            self._store.async_delay_save(
+                self._data_to_save, HISTORY_SAVE_DELAY
+            )
+        if self._pending_import:
+            self._hass.async_create_task(self._importer.async_call())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return everything to store."""
+        return {
+            'counters': {
+                str(param_id): counter.as_dict()
+                for param_id, counter in self.counters.items()
+            }
+        }
+
+    async def _async_import(self) -> None:
+        """Hand the hourly sums to the recorder's long-term statistics."""
+        pending, self._pending_import = self._pending_import, {}
+        if not pending or 'recorder' not in self._hass.config.components:
+            return
+        # Imported lazily, the recorder is an optional dependency
+        from homeassistant.components.recorder.models import (
+            StatisticData, StatisticMetaData)
+        from homeassistant.components.recorder.statistics import \
+            async_add_external_statistics
+
+        for param_id, hours in pending.items():
+            counter = self.counters[param_id]
+            key, unit = TRACKED_PARAMETERS[param_id]
+            rows = []
+            hourly = counter.hourly
+            # Cumulative sum at the end of every bucket, counted back
+            # from the current total
+            running = counter.sum
+            ends: dict[int, float] = {}
+            for index in range(len(hourly.starts) - 1, -1, -1):
+                ends[hourly.starts[index]] = running
+                running -= hourly.deltas[index]
+            for hour in sorted(hours):
+                if hour not in ends:
+                    continue
+                rows.append(
+                    StatisticData(
+                        start=datetime.fromtimestamp(hour, timezone.utc),
+                        sum=ends[hour],
+                    )
+                )
+            if not rows:
+                continue
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f'{self._name} {key.replace("_", " ")}',
+                    source=DOMAIN,
+                    statistic_id=f'{DOMAIN}:{self._slug}_{key}',
+                    unit_of_measurement=unit,
+                ),
+                rows,
+            )
@@ -0,0 +1,167 @@
+"""Runtime metrics for Delonghi Primadonna.
+
+Recording is a bucket lookup and a few integer updates on storage
+allocated up front, so it is cheap enough for the notification path.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency buckets (seconds); one overflow bucket
+# follows the last bound.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Seconds covered by the frame rate
+RATE_WINDOW = 60
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize empty buckets."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Count one duration."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which ``fraction`` falls."""
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                break
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.max if self.count else None,
+            'buckets': {
+                **{
+                    f'le_{bound:g}': count
+                    for bound, count in zip(self.bounds, self.counts)
+                },
+                'overflow': self.counts[-1],
+            },
+        }
+
+
+class RateCounter:
+    """Events per second over a sliding window of one-second slots."""
+
+    __slots__ = ('_window', '_slots', '_seconds')
+
+    def __init__(self, window: int = RATE_WINDOW) -> None:
+        """Initialize an empty window."""
+        self._window = window
+        self._slots = [0] * window
+        self._seconds = [0] * window
+
+    def record(self, now: float | None = None) -> None:
+        """Count one event."""
+        second = int(time.monotonic() if now is None else now)
+        index = second % self._window
+        if self._seconds[index] != second:
+            self._seconds[index] = second
+            self._slots[index] = 0
+        self._slots[index] += 1
+
+    def rate(self, now: float | None = None) -> float:
+        """Return the average events per second in the window."""
+        second = int(time.monotonic() if now is None else now)
+        oldest = second - self._window
+        total = sum(
+            count
+            for count, slot_second in zip(self._slots, self._seconds)
+            if slot_second > oldest
+        )
+        return total / self._window
+
+
+class DeviceMetrics:
+    """Latency and error counters of one machine."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.connect_latency = Histogram()
+        self.connect_attempts = 0
+        self.connect_failures = 0
+        self.lock_wait = Histogram()
+        self.response_latency = Histogram()
+        # Latency per request id byte, created on the first response
+        self._latency_by_id: list[Histogram | None] = [None] * 256
+        self._timeouts_by_id = [0] * 256
+        self.timeouts = 0
+        self.frame_rate = RateCounter()
+
+    def record_connect(self, duration: float, success: bool) -> None:
+        """Count a connect attempt."""
+        self.connect_attempts += 1
+        if success:
+            self.connect_latency.record(duration)
+        else:
+            self.connect_failures += 1
+
+    def record_response(self, request_id: int, duration: float) -> None:
+        """Count the write-to-response time of a command."""
+        self.response_latency.record(duration)
+        histogram = self._latency_by_id[request_id]
+        if histogram is None:
+            histogram = self._latency_by_id[request_id] = Histogram()
+        histogram.record(duration)
+
+    def record_timeout(self, request_id: int) -> None:
+        """Count a command that got no response."""
+        self.timeouts += 1
+        self._timeouts_by_id[request_id] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric for diagnostics."""
+        return {
+            'connect': {
+                'attempts': self.connect_attempts,
+                'failures': self.connect_failures,
+                'latency': self.connect_latency.as_dict(),
+            },
+            'lock_wait': self.lock_wait.as_dict(),
+            'response_latency': self.response_latency.as_dict(),
+            'response_latency_by_id': {
+                f'0x{request_id:02x}': histogram.as_dict()
+                for request_id, histogram in enumerate(self._latency_by_id)
+                if histogram is not None
+            },
+            'timeouts': self.timeouts,
+            'timeouts_by_id': {
+                f'0x{request_id:02x}': count
+                for request_id, count in enumerate(self._timeouts_by_id)
+                if count
+            },
+            'frames_per_second': self.frame_rate.rate(),
+        }
@@ -3,16 +3,44 @@
 from __future__ import annotations
 
 import json
+import logging
+import zlib
 from functools import lru_cache
 from importlib import resources
+from typing import TYPE_CHECKING, Any
 
+from .catalog_format import CatalogBlob
+from .const import DATA_CATALOG
 from .machine_entities import BeverageName, MachineModel, MachineModels, Recipe
 
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
 
-@lru_cache
-def get_machine_models() -> MachineModels:
-    """Return machine data parsed into dataclasses."""
-    with resources.files(__package__).joinpath("MachinesModels.json").open(
+_LOGGER = logging.getLogger(__name__)
+
+
+CATALOG_BLOB = "MachinesModels.bin"
+CATALOG_SOURCE = "MachinesModels.json"
+
+
+def _make_recipe(recipe: dict[str, Any]) -> Recipe:
+    """Build a recipe, mapping unknown beverage names to None."""
+    name = recipe.get("name")
+    return Recipe(
+        **{
+            **recipe,
+            "name": (
+                BeverageName(name)
+                if name in BeverageName._value2member_map_
+                else None
+            ),
+        }
+    )
+
+
+def _load_source_catalog() -> MachineCatalog:
+    """Parse the JSON catalog with every recipe up front."""
+    with resources.files(__package__).joinpath(CATALOG_SOURCE).open(
         "r", encoding="utf-8"
     ) as file:
         data = json.load(file)
@@ -23,42 +51,161 @@ def get_machine_models() -> MachineModels:
         version=data.get("version"),
     )
     for machine in data.get("machines", []):
-        recipes: list[Recipe] = []
-        for r in machine.get("recipes", []):
-            name = r.get("name")
-            r["name"] = (
-                BeverageName(name)
-                if name in BeverageName._value2member_map_
-                else None
-            )
-            recipes.append(Recipe(**r))
+        recipes = [_make_recipe(r) for r in machine.get("recipes", [])]
         models.machines.append(MachineModel(**{**machine, "recipes": recipes}))
-    return models
+    return MachineCatalog(models)
+
+
+def _load_blob_catalog(blob: bytes) -> MachineCatalog:
+    """Decode the machine headers of the precompiled catalog."""
+    catalog = CatalogBlob(blob)
+    models = MachineModels(
+        result=catalog.result,
+        name=catalog.name,
+        version=catalog.version,
+    )
+    blocks: dict[int, int] = {}
+    for header, block in catalog.machines:
+        model = MachineModel(**header)
+        models.machines.append(model)
+        blocks[id(model)] = block
+    return MachineCatalog(models, catalog, blocks)
+
+
+class MachineCatalog:
+    """Machine models with lookup indexes built once.
+
+    Models loaded from the precompiled blob start without recipes;
+    :meth:`load_recipes` decodes them on first use.
+    """
+
+    def __init__(
+        self,
+        models: MachineModels,
+        blob: CatalogBlob | None = None,
+        recipe_blocks: dict[int, int] | None = None,
+    ) -> None:
+        """Index the given machine models."""
+        self.models = models
+        self._blob = blob
+        # Recipe block of every model whose recipes are not decoded yet
+        self._pending: dict[int, int] = dict(recipe_blocks or {})
+        self._decoded: dict[int, list[Recipe]] = {}
+        self._by_product_code: dict[str, MachineModel] = {}
+        self._by_app_model_id: dict[str, MachineModel] = {}
+        self._by_id: dict[int, MachineModel] = {}
+        self._by_connection: dict[str, list[MachineModel]] = {}
+        # Every suffix of every product code, mapped to the first model
+        # that ends with it, so guessing by Bluetooth name is one lookup.
+        self._by_suffix: dict[str, MachineModel] = {}
+        for model in models.machines:
+            if model.product_code:
+                code = str(model.product_code)
+                self._by_product_code.setdefault(code, model)
+                for index in range(len(code)):
+                    self._by_suffix.setdefault(code[index:], model)
+            if model.appModelId:
+                self._by_app_model_id.setdefault(model.appModelId, model)
+            if model.id is not None:
+                self._by_id.setdefault(model.id, model)
+            self._by_connection.setdefault(
+                model.connectionType, []
+            ).append(model)
+
+    def load_recipes(self, model: MachineModel) -> MachineModel:
+        """Decode the recipes of a model if they are still pending."""
+        block = self._pending.pop(id(model), None)
+        if block is None or self._blob is None:
+            return model
+        recipes = self._decoded.get(block)
+        if recipes is None:
+            recipes = [_make_recipe(r) for r in self._blob.recipes(block)]
+            self._decoded[block] = recipes
+        model.recipes = list(recipes)
+        return model
+
+    def by_product_code(self, product_code: str) -> MachineModel | None:
+        """Return machine model by product code."""
+        return self._by_product_code.get(product_code)
+
+    def by_app_model_id(self, app_model_id: str) -> MachineModel | None:
+        """Return machine model by application model id."""
+        return self._by_app_model_id.get(app_model_id)
+
+    def by_id(self, model_id: int) -> MachineModel | None:
+        """Return machine model by catalog id."""
+        return self._by_id.get(model_id)
+
+    def by_connection(self, connection_type: str) -> list[MachineModel]:
+        """Return machine models of the given connection type."""
+        return list(self._by_connection.get(connection_type, []))
+
+    def by_suffix(self, suffix: str) -> MachineModel | None:
+        """Return the first machine whose product code ends with suffix."""
+        return self._by_suffix.get(suffix)
+
+
+@lru_cache
+def get_machine_catalog() -> MachineCatalog:
+    """Return the indexed catalog of bundled machine models.
+
+    The precompiled ``MachinesModels.bin`` is preferred; the JSON
+    source is only parsed when the blob is missing or unreadable.
+    """
+    try:
+        blob = resources.files(__package__).joinpath(CATALOG_BLOB).read_bytes()
+        return _load_blob_catalog(blob)
+    except (OSError, ValueError, TypeError, zlib.error) as error:
+        _LOGGER.debug("Falling back to %s: %s", CATALOG_SOURCE, error)
+    return _load_source_catalog()
+
+
+async def async_get_machine_catalog(hass: HomeAssistant) -> MachineCatalog:
+    """Return the catalog, loading it in the executor on first use.
+
+    The pending load is shared through ``hass.data`` so concurrent
+    callers wait for the same job.
+    """
+    future = hass.data.get(DATA_CATALOG)
+    if future is None:
+        future = hass.async_add_executor_job(get_machine_catalog)
+        hass.data[DATA_CATALOG] = future
+    try:
+        return await future
+    except Exception:
+        hass.data.pop(DATA_CATALOG, None)
+        raise
+
+
+async def async_get_machine_models(hass: HomeAssistant) -> MachineModels:
+    """Return machine data without blocking the event loop."""
+    return (await async_get_machine_catalog(hass)).models
+
+
+def get_machine_models() -> MachineModels:
+    """Return machine data parsed into dataclasses.
+
+    Recipes of a model are only guaranteed after ``get_machine_model``.
+    """
+    return get_machine_catalog().models
 
 
 def get_machine_model(product_code: str) -> MachineModel | None:
-    """Return machine model by product code."""
+    """Return machine model by product code, recipes included."""
     if product_code is None:
         return None
-    return next(
-        (
-            model
-            for model in get_machine_models().machines
-            if model.product_code == product_code
-        ),
-        None,
-    )
+    catalog = get_machine_catalog()
+    model = catalog.by_product_code(product_code)
+    if model is None:
+        return None
+    return catalog.load_recipes(model)
 
 
 def get_machine_models_by_connection(
     connection_type: str = "BT",
 ) -> list[MachineModel]:
     """Return machine models of the given connection type."""
-    return [
-        model
-        for model in get_machine_models().machines
-        if model.connectionType == connection_type
-    ]
+    return get_machine_catalog().by_connection(connection_type)
 
 
 def guess_machine_model(name: str) -> MachineModel | None:
@@ -70,10 +217,4 @@ def guess_machine_model(name: str) -> MachineModel | None:
     if len(base) <= 2:
         return None
 
-    suffix = base[:-2]
-
-    for model in get_machine_models().machines:
-        product_code = model.product_code
-        if product_code and str(product_code).endswith(suffix):
-            return model
-    return None
+    return get_machine_catalog().by_suffix(base[:-2])
@@ -0,0 +1,105 @@
+"""User profiles of a Delonghi Primadonna machine."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import AVAILABLE_PROFILES, DOMAIN, PROFILES_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class ProfileRegistry:
+    """Profile names of one machine, looked up by id or by name.
+
+    Names read from the machine are stored, so a restart shows them
+    before the machine answers. The device reads them again once per
+    connection, which picks up profiles renamed on the machine. Empty
+    and duplicate names are replaced by unique ones, which keeps both
+    lookups unambiguous.
+    """
+
+    def __init__(self, hass: HomeAssistant, mac: str, count: int) -> None:
+        """Initialize with default names for ``count`` profiles."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f'{DOMAIN}.profiles_{mac.replace(":", "").lower()}',
+        )
+        self._count = count
+        # Names as the machine reported them
+        self._reported: dict[int, str] = {}
+        self._by_id: dict[int, str] = {}
+        self._by_name: dict[str, int] = {}
+        self._rebuild()
+
+    @property
+    def names(self) -> list[str]:
+        """Return the profile names ordered by id."""
+        return list(self._by_id.values())
+
+    def name(self, profile_id: int | None) -> str | None:
+        """Return the name of a profile id."""
+        return self._by_id.get(profile_id)
+
+    def profile_id(self, name: str) -> int | None:
+        """Return the id of a profile name."""
+        return self._by_name.get(name)
+
+    async def async_load(self) -> None:
+        """Restore the names stored for this machine."""
+        data = await self._store.async_load()
+        if not data or data.get('count') != self._count:
+            return
+        self._reported = {
+            int(profile_id): name for profile_id, name in data['names']
+        }
+        self._rebuild()
+
+    @callback
+    def async_update(self, names: Mapping[int, str]) -> bool:
+        """Take names read from the machine, return True on a change."""
+        reported = {
+            **self._reported,
+            **{
+                profile_id: name for profile_id, name in names.items()
+                if 1 <= profile_id <= self._count
+            },
+        }
+        if reported == self._reported:
+            return False
+        self._reported = reported
+        self._rebuild()
+        _LOGGER.debug("Profiles: %s", self._by_id)
+        self._store.async_delay_save(self._data_to_save, PROFILES_SAVE_DELAY)
+        return True
+
+    def _rebuild(self) -> None:
+        """Rebuild both lookups from the reported names and defaults."""
+        by_id: dict[int, str] = {}
+        by_name: dict[str, int] = {}
+        for profile_id in range(1, self._count + 1):
+            name = self._reported.get(profile_id) or AVAILABLE_PROFILES.get(
+                profile_id, f'Profile {profile_id}'
+            )
+            if name in by_name:
+                name = f'{name} ({profile_id})'
+            by_id[profile_id] = name
+            by_name[name] = profile_id
+        self._by_id = by_id
+        self._by_name = by_name
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the names to store."""
+        return {
+            'count': self._count,
+            'names': list(self._reported.items()),
+        }
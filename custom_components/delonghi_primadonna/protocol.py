@@ -0,0 +1,333 @@
+"""Message layouts of the Delonghi Primadonna protocol.
+
+Every request and answer is described once below, by its message id,
+its constant bytes and the offset and ``struct`` format of each field.
+The descriptions are compiled when the module is imported: adjacent
+fields sharing a byte order are packed or unpacked with one
+``struct.Struct``, requests keep a prebuilt buffer and sealed frames
+are memoised per payload.
+
+A frame is ``[start][length][message id][body...][crc16]``. Requests
+start with ``0x0D`` and answers with ``0xD0``. The length byte counts
+everything after the start byte, the big-endian CRC included.
+Decoding checks the start byte, the length byte, the message id, the
+CRC and the minimum size before any field is read.
+
+This module has no package imports besides :mod:`.frame`, so scripts
+can encode and decode frames without Home Assistant.
+"""
+
+from __future__ import annotations
+
+import struct
+from binascii import crc_hqx
+from collections import namedtuple
+from collections.abc import Iterator
+from functools import lru_cache
+from itertools import chain
+from typing import Any, NamedTuple
+
+from .frame import CRC_SEED, START_BYTE
+
+REQUEST_START = 0x0D
+# Start byte, length byte and message id
+HEADER_SIZE = 3
+CRC_SIZE = 2
+
+# Distinct payloads whose sealed frame is kept
+SEAL_CACHE_SIZE = 256
+
+
+class ProtocolError(ValueError):
+    """A frame or a field value does not match its message layout."""
+
+
+class Field(NamedTuple):
+    """One field at a frame offset, ``format`` as in :mod:`struct`."""
+
+    offset: int
+    format: str
+
+
+@lru_cache(maxsize=SEAL_CACHE_SIZE)
+def seal_payload(payload: bytes) -> bytes:
+    """Return ``payload`` followed by its big-endian CRC."""
+    return payload + crc_hqx(payload, CRC_SEED).to_bytes(2, 'big')
+
+
+def _compile(
+    fields: dict[str, Field]
+) -> list[tuple[struct.Struct, int, tuple[str, ...]]]:
+    """Group fields into as few ``struct.Struct`` runs as possible.
+
+    A run continues while the next field starts where the previous one
+    ends and uses the same byte order, so it never covers bytes that
+    belong to no field.
+    """
+    runs: list[tuple[str, int, str, list[str]]] = []
+    end = -1
+    for name, field in sorted(fields.items(), key=lambda item: item[1][0]):
+        order = field.format[0] if field.format[0] in '<>!=@' else ''
+        code = field.format[len(order):]
+        size = struct.calcsize('>' + code)
+        if field.offset < end:
+            raise ValueError(f"Field {name} overlaps the previous one")
+        if (
+            runs
+            and field.offset == end
+            and (not order or not runs[-1][0] or order == runs[-1][0])
+        ):
+            run_order, offset, codes, names = runs[-1]
+            runs[-1] = (run_order or order, offset, codes + code, names)
+        else:
+            runs.append((order, field.offset, code, []))
+        runs[-1][3].append(name)
+        end = field.offset + size
+    return [
+        (struct.Struct((order or '>') + codes), offset, tuple(names))
+        for order, offset, codes, names in runs
+    ]
+
+
+class Request:
+    """Compiled encoder of one request."""
+
+    __slots__ = ('name', 'message_id', 'size', '_buffer', '_payload', '_runs',
+                 '_names', '_frame')
+
+    def __init__(
+        self, name: str, message_id: int, body: bytes, **fields: Field
+    ) -> None:
+        """Compile a request with constant ``body`` bytes after the id."""
+        self.name = name
+        self.message_id = message_id
+        self.size = HEADER_SIZE + len(body) + CRC_SIZE
+        self._buffer = bytearray(
+            (REQUEST_START, self.size - 1, message_id)
+        ) + body
+        self._payload = memoryview(self._buffer)
+        for field_name, field in fields.items():
+            if (
+                field.offset < HEADER_SIZE
+                or field.offset + struct.calcsize(field.format)
+                > len(self._buffer)
+            ):
+                raise ValueError(
+                    f"Field {field_name} is outside the {name} payload"
+                )
+        self._runs = _compile(fields)
+        self._names = frozenset(fields)
+        # Requests without fields are sealed once
+        self._frame = (
+            None if fields else seal_payload(self._payload.tobytes())
+        )
+
+    def render(self, **values: int) -> bytes:
+        """Return the sealed frame for the given field values."""
+        if self._frame is not None and not values:
+            return self._frame
+        if values.keys() != self._names:
+            raise TypeError(
+                f"{self.name} expects fields {sorted(self._names)}, "
+                f"got {sorted(values)}"
+            )
+        buffer = self._buffer
+        try:
+            for layout, offset, names in self._runs:
+                layout.pack_into(
+                    buffer, offset, *[values[name] for name in names]
+                )
+        except struct.error as error:
+            raise ProtocolError(f"{self.name}: {error}") from error
+        return seal_payload(self._payload.tobytes())
+
+
+class Answer:
+    """Compiled decoder of one answer.
+
+    ``records`` describes a repeated group filling the frame from its
+    offset up to the CRC. A trailing partial record is ignored unless
+    it has at least ``short_record`` bytes; its missing bytes then
+    read as zero.
+    """
+
+    __slots__ = ('name', 'message_id', 'min_size', 'type', '_runs',
+                 '_records', '_records_offset', '_short_record')
+
+    def __init__(
+        self,
+        name: str,
+        message_id: int,
+        min_size: int = HEADER_SIZE + CRC_SIZE,
+        records: Field | None = None,
+        short_record: int | None = None,
+        **fields: Field,
+    ) -> None:
+        """Compile an answer of at least ``min_size`` bytes."""
+        self.name = name
+        self.message_id = message_id
+        self.min_size = max(
+            [min_size] + [
+                field.offset + struct.calcsize(field.format) + CRC_SIZE
+                for field in fields.values()
+            ]
+        )
+        if _overlaps(fields):
+            # Overlapping fields are decoded one by one
+            self._runs = [
+                run
+                for field_name, field in fields.items()
+                for run in _compile({field_name: field})
+            ]
+        else:
+            self._runs = _compile(fields)
+        self.type = namedtuple(
+            ''.join(part.title() for part in name.split('_')), fields
+        )
+        self._records = (
+            struct.Struct(records.format) if records is not None else None
+        )
+        self._records_offset = records.offset if records is not None else 0
+        self._short_record = short_record
+
+    def validate(self, frame: bytes | bytearray | memoryview) -> None:
+        """Raise :class:`ProtocolError` unless ``frame`` is well formed."""
+        size = len(frame)
+        if size < self.min_size:
+            raise ProtocolError(
+                f"{self.name}: {size} bytes, expected {self.min_size}"
+            )
+        if frame[0] != START_BYTE or frame[2] != self.message_id:
+            raise ProtocolError(
+                f"{self.name}: unexpected header "
+                f"{frame[0]:02x} {frame[2]:02x}"
+            )
+        if frame[1] + 1 != size:
+            raise ProtocolError(
+                f"{self.name}: length byte {frame[1]} for {size} bytes"
+            )
+        if crc_hqx(frame[:-CRC_SIZE], CRC_SEED) != (
+            (frame[-2] << 8) | frame[-1]
+        ):
+            raise ProtocolError(f"{self.name}: CRC mismatch")
+
+    def decode(self, frame: bytes | bytearray | memoryview) -> Any:
+        """Return the fields of a validated frame as a named tuple."""
+        self.validate(frame)
+        values: dict[str, Any] = {}
+        for layout, offset, names in self._runs:
+            values.update(zip(names, layout.unpack_from(frame, offset)))
+        return self.type(**values)
+
+    def iter_records(
+        self, frame: bytes | bytearray | memoryview
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield the repeated records of a validated frame."""
+        self.validate(frame)
+        record = self._records
+        if record is None:
+            raise TypeError(f"{self.name} has no records")
+        start = self._records_offset
+        size = len(frame) - CRC_SIZE - start
+        if size <= 0:
+            return iter(())
+        count, rest = divmod(size, record.size)
+        end = start + count * record.size
+        records = record.iter_unpack(memoryview(frame)[start:end])
+        if self._short_record is None or rest < self._short_record:
+            return records
+        last = bytes(frame[end:end + rest]).ljust(record.size, b'\x00')
+        return chain(records, (record.unpack(last),))
+
+
+def _overlaps(fields: dict[str, Field]) -> bool:
+    """Return True if any two fields share a byte."""
+    end = -1
+    for field in sorted(fields.values()):
+        if field.offset < end:
+            return True
+        end = field.offset + struct.calcsize(field.format)
+    return False
+
+
+# Requests
+
+POWER = Request('power', 0x84, bytes((0x0F, 0x02, 0x01)))
+STATUS_REQUEST = Request('status_request', 0x75, bytes((0x0F,)))
+SET_TIME = Request(
+    'set_time', 0xE2, bytes((0xF0, 0x00, 0x00)),
+    hour=Field(4, 'B'), minute=Field(5, 'B'),
+)
+# Settings share one message, the parameter id selects the setting
+SWITCHES = Request(
+    'switches', 0x90, bytes((0x0F, 0x00, 0x3F, 0, 0, 0, 0)),
+    mask=Field(9, 'B'),
+)
+AUTO_POWER_OFF = Request(
+    'auto_power_off', 0x90, bytes((0x0F, 0x00, 0x3E, 0, 0, 0, 0)),
+    value=Field(9, 'B'),
+)
+WATER_HARDNESS = Request(
+    'water_hardness', 0x90, bytes((0x0F, 0x00, 0x32, 0, 0, 0, 0)),
+    value=Field(9, 'B'),
+)
+WATER_TEMPERATURE = Request(
+    'water_temperature', 0x90, bytes((0x0F, 0x00, 0x3D, 0, 0, 0, 0)),
+    value=Field(9, 'B'),
+)
+STATISTICS = Request(
+    'statistics', 0xA2, bytes((0x0F, 0x00, 0x64, 0x0A)),
+    start=Field(4, '>H'), count=Field(6, 'B'),
+)
+LOAD_PROFILES = Request(
+    'load_profiles', 0xA4, bytes((0xF0, 0x01, 0x06)), last=Field(5, 'B')
+)
+SELECT_PROFILE = Request(
+    'select_profile', 0xA9, bytes((0xF0, 0x00)), profile=Field(4, 'B')
+)
+BEVERAGE_STOP = Request(
+    'beverage_stop', 0x83, bytes((0xF0, 0x00, 0x02, 0x06)),
+    recipe=Field(4, 'B'),
+)
+
+# Answers
+
+# Alarms are split over two little-endian words
+MONITOR_V2 = Answer(
+    'monitor_v2', 0x75,
+    nozzle_state=Field(4, 'B'),
+    switches=Field(5, '<H'),
+    alarms_low=Field(7, '<H'),
+    status=Field(9, 'B'),
+    sub_status=Field(10, 'B'),
+    alarms_high=Field(12, '<H'),
+)
+# The sub status shares its byte with the low switch byte
+MONITOR_V1 = Answer(
+    'monitor_v1', 0x70,
+    alarms=Field(4, '<H'),
+    status=Field(8, 'B'),
+    switches=Field(9, '<H'),
+    sub_status=Field(9, 'B'),
+)
+# The start id and its value form the first record
+STATISTICS_ANSWER = Answer(
+    'statistics_answer', 0xA2, records=Field(4, '>HI')
+)
+# Names are UTF-16, padded with zeros, each followed by one byte; the
+# last name may come without it
+PROFILES_ANSWER = Answer(
+    'profiles_answer', 0xA4, records=Field(4, '>20sB'), short_record=20
+)
+SELECT_PROFILE_ANSWER = Answer(
+    'select_profile_answer', 0xA9,
+    profile=Field(4, 'B'), status=Field(5, 'B'),
+)
+
+ANSWERS: dict[int, Answer] = {
+    answer.message_id: answer
+    for answer in (
+        MONITOR_V2, MONITOR_V1, STATISTICS_ANSWER, PROFILES_ANSWER,
+        SELECT_PROFILE_ANSWER,
+    )
+}
@@ -11,8 +11,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .base_entity import DelonghiDeviceEntity
-from .const import AVAILABLE_PROFILES, BEVERAGE_NONE, DOMAIN, POWER_OFF_OPTIONS
-from .device import BeverageEntityFeature, DelongiPrimadonna
+from .const import BEVERAGE_NONE, DOMAIN, POWER_OFF_OPTIONS
+from .device import BeverageEntityFeature, DelongiPrimadonna, DeviceUpdate
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +43,7 @@ class ProfileSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
     _attr_entity_category = EntityCategory.CONFIG
     _attr_translation_key = 'profile'
     _attr_icon = 'mdi:account'
+    _update_types = frozenset({DeviceUpdate.PROFILE})
 
     def __init__(self, delongh_device: DelongiPrimadonna, hass: HomeAssistant):
         super().__init__(delongh_device, hass)
@@ -61,9 +62,11 @@ class ProfileSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
     @property
     def current_option(self) -> str | None:
         """Return the currently active profile from the device."""
-        pid = self.device.active_profile_id
-        if pid is not None and pid in AVAILABLE_PROFILES:
-            return AVAILABLE_PROFILES[pid]
+        name = self.device.profile_registry.name(
+            self.device.active_profile_id
+        )
+        if name is not None:
+            return name
         return self._attr_current_option
 
     @property
@@ -73,17 +76,11 @@ class ProfileSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
-        profile_id = next(
-            (
-                pid
-                for pid, name in AVAILABLE_PROFILES.items()
-                if name == option
-            ),
-            None,
-        )
+        profile_id = self.device.profile_registry.profile_id(option)
         _LOGGER.debug("Select profile '%s' id=%s", option, profile_id)
         self.hass.async_create_task(self.device.select_profile(profile_id))
         self._attr_current_option = option
+        self.async_write_ha_state()
 
 
 class BeverageSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
@@ -136,6 +133,7 @@ class EnergySaveModeSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
             self.device.set_auto_power_off(power_off_interval)
         )
         self._attr_current_option = option
+        self.async_write_ha_state()
 
 
 class WaterHardnessSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
@@ -163,6 +161,7 @@ class WaterHardnessSelect(DelonghiDeviceEntity, SelectEntity, RestoreEntity):
             self.device.set_water_hardness(water_hardness)
         )
         self._attr_current_option = option
+        self.async_write_ha_state()
 
 
 class WaterTemperatureSelect(
@@ -193,3 +192,4 @@ class WaterTemperatureSelect(
             self.device.set_water_temperature(water_temperature)
         )
         self._attr_current_option = option
+        self.async_write_ha_state()
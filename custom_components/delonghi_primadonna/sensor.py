@@ -1,5 +1,7 @@
 """Sensor entities for Delonghi Primadonna."""
 
+from collections.abc import Callable
+from datetime import timedelta
 from typing import Any
 
 from homeassistant.components.sensor import (SensorDeviceClass, SensorEntity,
@@ -12,7 +14,7 @@ from homeassistant.helpers.restore_state import RestoreEntity
 
 from .base_entity import DelonghiDeviceEntity
 from .const import DOMAIN
-from .device import NOZZLE_STATE, DelongiPrimadonna
+from .device import NOZZLE_STATE, DelongiPrimadonna, DeviceUpdate
 from .machine_switch import MachineSwitch
 
 
@@ -57,13 +59,62 @@ async def async_setup_entry(
                 delongh_device, hass, 'filter_replace_count',
                 108, 'Filter Replacements', icon='mdi:filter',
             ),
+
+            # Usage over rolling periods
+            DelongiPrimadonnaUsageSensor(
+                delongh_device, hass, 'coffee_per_day',
+                -3077, timedelta(days=1), icon='mdi:coffee',
+            ),
+            DelongiPrimadonnaUsageSensor(
+                delongh_device, hass, 'water_per_week',
+                10106, timedelta(days=7), 'L', 'mdi:water',
+            ),
+
+            # Link metrics
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'response_latency',
+                lambda device: _milliseconds(
+                    device.metrics.response_latency.percentile(0.95)
+                ),
+                'ms', 'mdi:timer-outline',
+            ),
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'connect_latency',
+                lambda device: _milliseconds(
+                    device.metrics.connect_latency.percentile(0.5)
+                ),
+                'ms', 'mdi:bluetooth-connect',
+            ),
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'connect_attempts',
+                lambda device: device.metrics.connect_attempts,
+                icon='mdi:bluetooth-settings',
+            ),
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'command_timeouts',
+                lambda device: device.metrics.timeouts,
+                icon='mdi:timer-alert-outline',
+            ),
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'frame_rate',
+                lambda device: round(device.metrics.frame_rate.rate(), 2),
+                'frames/s', 'mdi:swap-vertical',
+            ),
+            DelongiPrimadonnaMetricSensor(
+                delongh_device, hass, 'crc_errors',
+                lambda device: device.decoder_stats['crc_errors'],
+                icon='mdi:alert-circle-check-outline',
+            ),
         ]
     )
-
-    hass.async_create_task(delongh_device.update_statistics())
     return True
 
 
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert a duration to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
 class DelongiPrimadonnaNozzleSensor(
     DelonghiDeviceEntity, SensorEntity, RestoreEntity
 ):
@@ -75,6 +126,7 @@ class DelongiPrimadonnaNozzleSensor(
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'nozzle_status'
+    _update_types = frozenset({DeviceUpdate.NOZZLE})
 
     _attr_options = list(NOZZLE_STATE.values())
 
@@ -109,6 +161,7 @@ class DelongiPrimadonnaStatusSensor(
 
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'device_status'
+    _update_types = frozenset({DeviceUpdate.STATUS, DeviceUpdate.ALARMS})
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -139,6 +192,7 @@ class DelongiPrimadonnaSwitchesSensor(
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = 'switches'
+    _update_types = frozenset({DeviceUpdate.SWITCHES})
     _attr_options = [
         'none',
         *[s.value for s in MachineSwitch if s not in (
@@ -173,6 +227,7 @@ class DelongiPrimadonnaStatisticsSensor(
 
     _attr_device_class = None
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _update_types = frozenset({DeviceUpdate.STATISTICS})
 
     def __init__(
         self,
@@ -198,8 +253,11 @@ class DelongiPrimadonnaStatisticsSensor(
         self._attr_icon = icon
 
     async def async_added_to_hass(self) -> None:
-        """Restore last known numeric state."""
+        """Restore last known numeric state and start polling it."""
         await super().async_added_to_hass()
+        self.async_on_remove(
+            self.device.statistics_scheduler.async_register(self._param_id)
+        )
         last_state = await self.async_get_last_state()
         if last_state is None:
             return
@@ -221,9 +279,81 @@ class DelongiPrimadonnaStatisticsSensor(
         """Return the icon of the sensor."""
         return self._attr_icon
 
-    async def async_update(self) -> None:
-        """Fetch new state data for the sensor."""
-        if self.device.connected:
-            self.hass.async_create_task(
-                self.device.update_statistics()
-            )
+
+class DelongiPrimadonnaUsageSensor(DelonghiDeviceEntity, SensorEntity):
+    """
+    Shows how much a counter grew over a rolling period.
+    """
+
+    # Polled because the period slides without new statistics
+    _attr_should_poll = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        device: DelongiPrimadonna,
+        hass: HomeAssistant,
+        sensor_type: str,
+        param_id: int,
+        period: timedelta,
+        native_unit_of_measurement: str = None,
+        icon: str = 'mdi:chart-line'
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, hass)
+        self._param_id = param_id
+        self._period = period
+        self._attr_unique_id = f"{device.mac}_{sensor_type}"
+        self._attr_translation_key = sensor_type
+        self._attr_native_unit_of_measurement = native_unit_of_measurement
+        self._attr_icon = icon
+
+    async def async_added_to_hass(self) -> None:
+        """Keep the counter polled while the sensor exists."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.device.statistics_scheduler.async_register(self._param_id)
+        )
+
+    @property
+    def native_value(self):
+        """Return the usage over the period."""
+        total = self.device.history.total_since(self._param_id, self._period)
+        return None if total is None else round(total, 2)
+
+
+class DelongiPrimadonnaMetricSensor(DelonghiDeviceEntity, SensorEntity):
+    """
+    Shows a link metric, polled because it changes with every frame.
+    """
+
+    _attr_should_poll = True
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        device: DelongiPrimadonna,
+        hass: HomeAssistant,
+        sensor_type: str,
+        value_fn: Callable[[DelongiPrimadonna], Any],
+        native_unit_of_measurement: str = None,
+        icon: str = 'mdi:chart-bar'
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, hass)
+        self._value_fn = value_fn
+        self._attr_unique_id = f"{device.mac}_{sensor_type}"
+        self._attr_translation_key = sensor_type
+        self._attr_native_unit_of_measurement = native_unit_of_measurement
+        self._attr_icon = icon
+
+    @property
+    def entity_category(self, **kwargs: Any) -> None:
+        """Return the category of the entity."""
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self):
+        """Return the current metric value."""
+        return self._value_fn(self.device)
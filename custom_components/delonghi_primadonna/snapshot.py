@@ -0,0 +1,107 @@
+"""Last known state of a Delonghi Primadonna machine.
+
+The state parsed from the machine is stored when it changes and
+restored before the platforms are set up, so entities start with the
+values the machine last reported instead of blank defaults and do not
+wait for the first Bluetooth exchange.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY
+from .machine_switch import MachineSwitch
+
+if TYPE_CHECKING:
+    from .device import DelongiPrimadonna
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Attributes of DeviceSwitches kept in the snapshot
+SWITCH_ATTRIBUTES = ('is_on', 'energy_save', 'cup_light', 'sounds')
+
+
+class DeviceSnapshot:
+    """Store and restore the parsed state of one machine."""
+
+    def __init__(
+        self, hass: HomeAssistant, device: DelongiPrimadonna
+    ) -> None:
+        """Initialize for ``device``."""
+        self._device = device
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f'{DOMAIN}.state_{device.mac.replace(":", "").lower()}',
+        )
+
+    async def async_load(self) -> bool:
+        """Restore the stored state, return True if there was one."""
+        data = await self._store.async_load()
+        if not data:
+            return False
+        try:
+            self._restore(data)
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.warning(
+                "Ignoring unreadable state of %s: %s", self._device.mac, error
+            )
+            return False
+        return True
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Store the current state after a quiet period."""
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Store the current state now, e.g. before unloading."""
+        await self._store.async_save(self._data_to_save())
+
+    def _restore(self, data: dict[str, Any]) -> None:
+        """Apply stored state to the device."""
+        device = self._device
+        device.status = data['status']
+        device.service = int(data['service'])
+        device.steam_nozzle = data['steam_nozzle']
+        device.hostname = data['hostname']
+        device.active_profile_id = data['active_profile_id']
+        device.active_switches = [
+            MachineSwitch(value) for value in data['active_switches']
+        ]
+        device.statistics = {
+            int(param_id): value
+            for param_id, value in data['statistics'].items()
+        }
+        for name in SWITCH_ATTRIBUTES:
+            setattr(device.switches, name, bool(data['switches'][name]))
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the state to store."""
+        device = self._device
+        return {
+            'status': device.status,
+            'service': device.service,
+            'steam_nozzle': device.steam_nozzle,
+            'hostname': device.hostname,
+            'active_profile_id': device.active_profile_id,
+            'active_switches': [
+                switch.value for switch in device.active_switches
+            ],
+            'statistics': {
+                str(param_id): value
+                for param_id, value in device.statistics.items()
+            },
+            'switches': {
+                name: getattr(device.switches, name)
+                for name in SWITCH_ATTRIBUTES
+            },
+        }
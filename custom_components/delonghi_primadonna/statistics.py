@@ -0,0 +1,456 @@
+"""Statistics polling for Delonghi Primadonna."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import (Awaitable, Callable, Iterable, Iterator,
+                             MutableMapping)
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import (DATA_STATISTICS_CATALOGUE, DOMAIN,
+                    STATISTICS_CATALOGUE_SAVE_DELAY, STATISTICS_FAST_INTERVAL,
+                    STATISTICS_FAST_WINDOW, STATISTICS_IDLE_INTERVAL,
+                    STATISTICS_OFF_INTERVAL, STATISTICS_SETTLE_DELAY)
+from .protocol import STATISTICS_ANSWER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DerivedMetric(NamedTuple):
+    """A value computed from machine parameters."""
+
+    sources: tuple[int, ...]
+    # Called with the source values, None for missing ones; returns
+    # None when the value cannot be computed
+    formula: Callable[..., int | float | None]
+
+
+def _total_coffee(beverages: int | None, ground: int | None) -> int | None:
+    """Return the beverages brewed from beans and pre-ground coffee."""
+    if beverages is None:
+        return None
+    return beverages + (ground or 0)
+
+
+def _water_litres(water: int | None) -> float | None:
+    """Return the water counter in litres (2000 units per litre)."""
+    if not water:
+        return None
+    return round(water / 2000.0, 2)
+
+
+# Values computed from machine parameters by id
+DERIVED_METRICS: dict[int, DerivedMetric] = {
+    -3077: DerivedMetric((3000, 3077), _total_coffee),
+    10106: DerivedMetric((106,), _water_litres),
+}
+
+# Most parameters a single statistics request may ask for
+MAX_RANGE_COUNT = 10
+
+# Widest read whose answer fits one frame even when every parameter in
+# it exists: 4 header bytes, the implicit value, 6 bytes per further
+# parameter and the CRC within 256 bytes
+MAX_DISCOVERY_COUNT = 41
+
+# Address blocks walked by discovery
+MAINTENANCE_PARAMETERS = range(100, 200)
+BEVERAGE_PARAMETERS = range(3000, 3100)
+DISCOVERY_BLOCKS = (MAINTENANCE_PARAMETERS, BEVERAGE_PARAMETERS)
+
+STORAGE_VERSION = 1
+
+
+def iter_statistics(frame: bytes) -> Iterator[tuple[int, int]]:
+    """Yield the ``(parameter id, value)`` pairs of a 0xA2 answer.
+
+    The start id echoed in the header and the value following it form
+    the first record, every further one carries its id, so parameters
+    that do not exist are skipped. Raises :class:`ProtocolError` for a
+    malformed frame.
+    """
+    return STATISTICS_ANSWER.iter_records(frame)
+
+
+def apply_derived_metrics(
+    statistics: MutableMapping[int, int | float], updated: Iterable[int]
+) -> None:
+    """Recompute the derived values whose sources were ``updated``."""
+    updated = set(updated)
+    for param_id, metric in DERIVED_METRICS.items():
+        if updated.isdisjoint(metric.sources):
+            continue
+        value = metric.formula(*map(statistics.get, metric.sources))
+        if value is not None:
+            statistics[param_id] = value
+
+
+def source_parameters(param_ids: Iterable[int]) -> set[int]:
+    """Return the machine parameters needed for the given ids."""
+    needed: set[int] = set()
+    for param_id in param_ids:
+        metric = DERIVED_METRICS.get(param_id)
+        needed.update(metric.sources if metric else (param_id,))
+    return needed
+
+
+def plan_ranges(
+    param_ids: Iterable[int], max_count: int = MAX_RANGE_COUNT
+) -> list[tuple[int, int]]:
+    """Return the fewest ``(start, count)`` reads covering the ids.
+
+    Each read starts at the lowest id not covered yet and is stretched
+    to the last id that still fits, which is optimal for reads of a
+    bounded width.
+    """
+    ranges: list[tuple[int, int]] = []
+    for param_id in sorted(set(param_ids)):
+        if ranges and param_id - ranges[-1][0] < max_count:
+            start = ranges[-1][0]
+            ranges[-1] = (start, param_id - start + 1)
+        else:
+            ranges.append((param_id, 1))
+    return ranges
+
+
+def plan_sparse_ranges(
+    param_ids: Iterable[int],
+    populated: Iterable[int],
+    max_count: int = MAX_DISCOVERY_COUNT,
+) -> list[tuple[int, int]]:
+    """Return the fewest reads covering the ids that exist.
+
+    Ids missing from ``populated`` are dropped. A read starts at a
+    wanted id and spans up to ``max_count`` addresses; it is stretched
+    to the last wanted id that fits.
+    """
+    existing = sorted(set(populated))
+    wanted = sorted(set(param_ids).intersection(existing))
+    ranges: list[tuple[int, int]] = []
+    for param_id in wanted:
+        if ranges and param_id - ranges[-1][0] < max_count:
+            start = ranges[-1][0]
+            ranges[-1] = (start, param_id - start + 1)
+        else:
+            ranges.append((param_id, 1))
+    return ranges
+
+
+def _populated_in(
+    populated: list[int], block: range
+) -> list[int]:
+    """Return the sorted populated ids inside an address block."""
+    return populated[
+        bisect_left(populated, block.start):bisect_right(
+            populated, block.stop - 1
+        )
+    ]
+
+
+class StatisticsCatalogue:
+    """Parameters that exist per product code, kept across restarts.
+
+    Machines of one model expose the same counters, so discovery runs
+    once per product code rather than once per machine.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty catalogue."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f'{DOMAIN}.statistics_catalogue'
+        )
+        self._models: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Restore the stored catalogue."""
+        data = await self._store.async_load()
+        if data:
+            self._models = data.get('models', {})
+
+    def get(self, product_code: str) -> tuple[list[int], int] | None:
+        """Return the populated ids and the read width of a model."""
+        model = self._models.get(product_code)
+        if model is None:
+            return None
+        return model['ids'], model['count']
+
+    @callback
+    def async_set(
+        self, product_code: str, param_ids: Iterable[int], count: int
+    ) -> None:
+        """Remember what discovery found for a model."""
+        self._models[product_code] = {
+            'ids': sorted(set(param_ids)),
+            'count': count,
+        }
+        self._store.async_delay_save(
+            lambda: {'models': self._models},
+            STATISTICS_CATALOGUE_SAVE_DELAY,
+        )
+
+
+async def async_get_statistics_catalogue(
+    hass: HomeAssistant,
+) -> StatisticsCatalogue:
+    """Return the catalogue shared by every machine, loading it once."""
+    future = hass.data.get(DATA_STATISTICS_CATALOGUE)
+    if future is None:
+        catalogue = StatisticsCatalogue(hass)
+        future = hass.async_create_task(_async_load(catalogue))
+        hass.data[DATA_STATISTICS_CATALOGUE] = future
+    try:
+        return await future
+    except Exception:
+        hass.data.pop(DATA_STATISTICS_CATALOGUE, None)
+        raise
+
+
+async def _async_load(catalogue: StatisticsCatalogue) -> StatisticsCatalogue:
+    """Load a catalogue and return it."""
+    await catalogue.async_load()
+    return catalogue
+
+
+class StatisticsScheduler:
+    """Poll the statistics that registered sensors need.
+
+    Sensors register parameter ids and the scheduler reads the merged
+    ranges covering them. The interval adapts to the machine: short
+    right after a beverage completes, long while it idles and longest
+    while it is off. Every trigger shares one refresh task.
+
+    With a ``catalogue`` the first refresh of an unknown model walks
+    the address blocks to learn which parameters exist. Afterwards only
+    existing parameters are read, every beverage counter included, in
+    reads as wide as the machine accepted.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        read: Callable[[int, int], Awaitable[bytes | None]],
+        is_ready: Callable[[], bool],
+        product_code: str | None = None,
+        catalogue: StatisticsCatalogue | None = None,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._read = read
+        self._is_ready = is_ready
+        self._product_code = product_code
+        self._catalogue = catalogue
+        self._params: Counter[int] = Counter()
+        self._ranges: list[tuple[int, int]] = []
+        # Existing parameters and the accepted read width, once known
+        self.populated: list[int] | None = None
+        self._read_count = MAX_RANGE_COUNT
+        self._discovery_failed = False
+        if catalogue is not None and product_code:
+            known = catalogue.get(product_code)
+            if known is not None:
+                self.populated, self._read_count = known
+        self._refresh: asyncio.Task | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._due = 0.0
+        self._active_until = 0.0
+        self._started = False
+        self.powered = False
+        self.last_refresh: float | None = None
+
+    @property
+    def ranges(self) -> list[tuple[int, int]]:
+        """Return the planned ``(start, count)`` reads."""
+        return list(self._ranges)
+
+    @property
+    def interval(self) -> float:
+        """Return the delay until the next regular refresh."""
+        if time.monotonic() < self._active_until:
+            return STATISTICS_FAST_INTERVAL
+        if self.powered:
+            return STATISTICS_IDLE_INTERVAL
+        return STATISTICS_OFF_INTERVAL
+
+    @callback
+    def async_register(self, param_id: int) -> CALLBACK_TYPE:
+        """Poll a parameter until the returned callback is called."""
+        sources = source_parameters((param_id,))
+        new = sources.difference(self._params)
+        self._params.update(sources)
+        if new:
+            self._plan()
+            self.async_refresh_soon()
+
+        @callback
+        def _unregister() -> None:
+            self._params.subtract(sources)
+            for source in sources:
+                if self._params[source] <= 0:
+                    del self._params[source]
+            self._plan()
+
+        return _unregister
+
+    @callback
+    def async_start(self) -> None:
+        """Start polling."""
+        self._started = True
+        self.async_refresh_soon()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop polling and cancel a running refresh."""
+        self._started = False
+        self._cancel_timer()
+        if self._refresh is not None and not self._refresh.done():
+            self._refresh.cancel()
+        self._refresh = None
+
+    @callback
+    def async_refresh_soon(self) -> None:
+        """Refresh shortly, coalescing triggers that arrive together."""
+        self._schedule(STATISTICS_SETTLE_DELAY)
+
+    @callback
+    def async_mark_activity(self) -> None:
+        """Poll at the fast interval after a beverage completed."""
+        self._active_until = time.monotonic() + STATISTICS_FAST_WINDOW
+        self._schedule(STATISTICS_FAST_INTERVAL)
+
+    @callback
+    def async_set_powered(self, powered: bool) -> None:
+        """Track the power state that selects the idle interval."""
+        if powered == self.powered:
+            return
+        self.powered = powered
+        self._schedule(self.interval)
+
+    @callback
+    def async_refresh(self) -> asyncio.Task:
+        """Return the running refresh, starting one if needed."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = self._hass.async_create_task(
+                self._async_refresh()
+            )
+        return self._refresh
+
+    async def _async_refresh(self) -> None:
+        """Read every planned range once."""
+        try:
+            if (
+                self.populated is None
+                and self._catalogue is not None
+                and self._product_code
+                and not self._discovery_failed
+            ):
+                await self._async_discover()
+            for start, count in list(self._ranges):
+                if await self._read(start, count) is None:
+                    # An unanswered read means the machine is gone;
+                    # keep the radio quiet until the next interval.
+                    break
+                # The machine answers again, so a failed discovery is
+                # retried on the next refresh
+                self._discovery_failed = False
+            self.last_refresh = time.monotonic()
+        except Exception as error:  # noqa: BLE001
+            _LOGGER.warning("Statistics refresh failed: %s", error)
+        finally:
+            self._schedule(self.interval, force=True)
+
+    @callback
+    def _plan(self) -> None:
+        """Plan the reads for the registered parameters."""
+        if not self._params:
+            self._ranges = []
+        elif self.populated is None:
+            self._ranges = plan_ranges(self._params)
+        else:
+            wanted = set(self._params)
+            wanted.update(_populated_in(self.populated, BEVERAGE_PARAMETERS))
+            # A registered id is read even when discovery did not see it
+            self._ranges = plan_sparse_ranges(
+                wanted, self.populated + list(self._params), self._read_count
+            )
+
+    async def _async_discover(self) -> None:
+        """Walk the address blocks and record what exists.
+
+        Consecutive reads overlap by one address, so only the first
+        address of a block arrives without an explicit id; the machine
+        echoes it whether or not it exists, so it always counts as
+        existing. A read without an answer is retried at half the width.
+        """
+        populated: set[int] = set()
+        count = MAX_DISCOVERY_COUNT
+        for block in DISCOVERY_BLOCKS:
+            start = block.start
+            while True:
+                width = min(count, block.stop - start)
+                frame = await self._read(start, width)
+                if frame is None:
+                    if count // 2 < 2:
+                        _LOGGER.info("Statistics discovery got no answer")
+                        self._discovery_failed = True
+                        return
+                    count //= 2
+                    continue
+                records = iter_statistics(frame)
+                first = next(records, None)
+                # The implicit value of a later read repeats the last
+                # address of the previous one
+                if first is not None and start == block.start:
+                    populated.add(first[0])
+                populated.update(param_id for param_id, _ in records)
+                if start + width >= block.stop:
+                    break
+                start += width - 1
+        _LOGGER.debug(
+            "Discovered %d statistics parameters (read width %d)",
+            len(populated), count,
+        )
+        self.populated = sorted(populated)
+        self._read_count = count
+        self._catalogue.async_set(self._product_code, populated, count)
+        self._plan()
+
+    @callback
+    def _schedule(self, delay: float, force: bool = False) -> None:
+        """Run the timer after ``delay`` unless it fires sooner."""
+        if not self._started:
+            return
+        due = time.monotonic() + delay
+        if not force and self._unsub_timer is not None and due >= self._due:
+            return
+        self._cancel_timer()
+        self._due = due
+        self._unsub_timer = async_call_later(
+            self._hass, delay, self._async_timer
+        )
+
+    @callback
+    def _cancel_timer(self) -> None:
+        """Cancel the pending timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_timer(self, now: datetime) -> None:
+        """Refresh when something is registered and the link is up."""
+        self._unsub_timer = None
+        if not self._ranges:
+            return
+        if not self._is_ready():
+            self._schedule(self.interval)
+            return
+        self.async_refresh()
@@ -28,6 +28,7 @@ async def async_setup_entry(
 
     switches = [
         DelongiPrimadonnaNotificationSwitch(delongh_device, hass),
+        DelongiPrimadonnaCaptureSwitch(delongh_device, hass),
         DelongiPrimadonnaPowerSaveSwitch(delongh_device, hass),
         DelongiPrimadonnaSoundsSwitch(delongh_device, hass),
     ]
@@ -71,11 +72,13 @@ class DelongiPrimadonnaCupLightSwitch(
         """Turn the device on."""
         self.hass.async_create_task(self.device.cup_light_on())
         self._attr_is_on = True
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the device off."""
         self.hass.async_create_task(self.device.cup_light_off())
         self._attr_is_on = False
+        self.async_write_ha_state()
 
 
 class DelongiPrimadonnaNotificationSwitch(
@@ -107,10 +110,57 @@ class DelongiPrimadonnaNotificationSwitch(
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the notification on."""
         self.device.notify = True
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the notification off."""
         self.device.notify = False
+        self.async_write_ha_state()
+
+
+class DelongiPrimadonnaCaptureSwitch(
+    DelonghiDeviceEntity, ToggleEntity, RestoreEntity
+):
+    """This switch records raw BLE packets to a capture file
+       which can be replayed offline for debug purposes
+    """
+
+    _attr_icon = 'mdi:record-rec'
+    _attr_translation_key = 'packet_capture'
+    _attr_entity_registry_enabled_default = False
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if (last_state := await self.async_get_last_state()) is not None:
+            if last_state.state == 'on':
+                await self.device.async_start_capture()
+
+    @property
+    def is_on(self, **kwargs: Any) -> bool:
+        """Checks is the capture running."""
+        return self.device.capture is not None
+
+    @property
+    def entity_category(self, **kwargs: Any) -> None:
+        """Return the category of the entity."""
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the capture file."""
+        if self.device.capture is None:
+            return None
+        return {'path': str(self.device.capture.path)}
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Start the capture."""
+        await self.device.async_start_capture()
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Stop the capture."""
+        await self.device.async_stop_capture()
+        self.async_write_ha_state()
 
 
 class DelongiPrimadonnaPowerSaveSwitch(
@@ -135,11 +185,13 @@ class DelongiPrimadonnaPowerSaveSwitch(
         """Turn the energy save on"""
         self.hass.async_create_task(self.device.energy_save_on())
         self._attr_is_on = True
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the energy save off"""
         self.hass.async_create_task(self.device.energy_save_off())
         self._attr_is_on = False
+        self.async_write_ha_state()
 
 
 class DelongiPrimadonnaSoundsSwitch(
@@ -164,11 +216,13 @@ class DelongiPrimadonnaSoundsSwitch(
         """Turn the sounds on."""
         self.hass.async_create_task(self.device.sound_alarm_on())
         self._attr_is_on = True
+        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the sounds off."""
         self.hass.async_create_task(self.device.sound_alarm_off())
         self._attr_is_on = False
+        self.async_write_ha_state()
 
 
 class DelongiPrimadonnaTimeSyncSwitch(
@@ -192,8 +246,10 @@ class DelongiPrimadonnaTimeSyncSwitch(
         """Turn the sounds on."""
         self.hass.async_create_task(self.device.set_time(datetime.now()))
         self._attr_is_on = True
+        self.schedule_update_ha_state()
 
     def turn_off(self, **kwargs: Any) -> None:
         """Turn the sounds off."""
         self.device.sync_time = False
         self._attr_is_on = False
+        self.schedule_update_ha_state()
@@ -0,0 +1,303 @@
+"""Benchmark the protocol hot paths.
+
+Reports time per operation and allocations for the parsers, the
+notification pipeline and the machine catalog lookups. Needs Home
+Assistant installed::
+
+    python script/benchmark.py
+    python script/benchmark.py --save before.json
+    python script/benchmark.py --compare before.json --threshold 0.2
+
+``--compare`` exits non-zero when a case got slower than the threshold.
+The cases that need no device also run under pytest-benchmark::
+
+    pytest tests/test_benchmark.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.const import CONF_MAC, CONF_MODEL, CONF_NAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from simulator import SimulatedMachine  # noqa: E402
+
+from custom_components.delonghi_primadonna import beverage  # noqa: E402
+from custom_components.delonghi_primadonna import commands  # noqa: E402
+from custom_components.delonghi_primadonna import model  # noqa: E402
+from custom_components.delonghi_primadonna import protocol  # noqa: E402
+from custom_components.delonghi_primadonna.const import \
+    CONF_KEEP_ALIVE  # noqa: E402
+from custom_components.delonghi_primadonna.device import (  # noqa: E402
+    DelongiPrimadonna, _notification_payload, find_notification,
+    parse_monitor_data)
+from custom_components.delonghi_primadonna.machine_switch import \
+    parse_switches  # noqa: E402
+
+PRODUCT_CODE = '0132215332'
+BLUETOOTH_NAME = 'D1532215332'
+
+_HEX_ROW = re.compile(r'^\|\s*(d0(?: [0-9a-f]{2})+)\s*\|', re.IGNORECASE)
+
+
+def notes_corpus() -> list[bytes]:
+    """Return the frames captured in DEBUG_NOTES.md."""
+    frames = []
+    with (ROOT / 'DEBUG_NOTES.md').open(encoding='utf-8') as file:
+        for line in file:
+            match = _HEX_ROW.match(line)
+            if match:
+                frames.append(bytes.fromhex(match.group(1)))
+    return frames
+
+
+def synthetic_corpus() -> dict[str, bytes]:
+    """Return simulated statistics, profile and monitor frames."""
+    machine = SimulatedMachine()
+    return {
+        'statistics': machine._handle_a2(
+            bytes([0x0D, 0x08, 0xA2, 0x0F, 0x00, 0x64, 0x0A, 0, 0])
+        )[0],
+        # The widest read discovery makes
+        'statistics_wide': machine._handle_a2(
+            bytes([0x0D, 0x08, 0xA2, 0x0F, 0x0B, 0xB8, 0x29, 0, 0])
+        )[0],
+        'profiles': machine._handle_a4(
+            bytes([0x0D, 0x07, 0xA4, 0xF0, 0x01, 0x04, 0, 0])
+        )[0],
+        'monitor': machine.monitor_frame(),
+    }
+
+
+def fragment(stream: bytes, sizes: Callable[[], int]) -> list[bytes]:
+    """Split a byte stream into chunks of the given sizes."""
+    chunks = []
+    offset = 0
+    while offset < len(stream):
+        size = sizes()
+        chunks.append(stream[offset:offset + size])
+        offset += size
+    return chunks
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> dict[str, float]:
+    """Return ns/op, peak bytes/op and retained blocks/op of a call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    runs = min(number, 1000)
+
+    tracemalloc.start()
+    try:
+        func()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        before_blocks = sum(
+            stat.count
+            for stat in tracemalloc.take_snapshot().statistics('filename')
+        )
+        for _ in range(runs):
+            func()
+        current, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(
+            stat.count
+            for stat in tracemalloc.take_snapshot().statistics('filename')
+        )
+    finally:
+        tracemalloc.stop()
+    return {
+        'ns_per_op': best / number * 1e9,
+        'peak_bytes': max(0, peak - before),
+        'retained_blocks_per_op': (after_blocks - before_blocks) / runs,
+        'retained_bytes_per_op': (current - before) / runs,
+    }
+
+
+def cases(device: DelongiPrimadonna) -> dict[str, Callable[[], object]]:
+    """Return the benchmark cases."""
+    notes = notes_corpus()
+    synthetic = synthetic_corpus()
+    frames = notes + list(synthetic.values())
+    monitor = [frame for frame in frames if frame[2] in (0x70, 0x75)]
+    stream = b''.join(frames)
+    rng = random.Random(0)
+    mtu_chunks = fragment(stream, lambda: 20)
+    random_chunks = fragment(stream, lambda: rng.randint(1, 40))
+    statistics = synthetic['statistics']
+    statistics_wide = synthetic['statistics_wide']
+    profiles = synthetic['profiles']
+
+    program = next(iter(device._programs.values()))
+    adjustable = next(
+        parameter for parameter in program.parameters if parameter.option
+    )
+    overrides = {adjustable.option: adjustable.low}
+
+    def beverage_compile() -> None:
+        beverage.encode_start.cache_clear()
+        program.start_frame(**overrides)
+
+    def monitor_parse() -> None:
+        for frame in monitor:
+            parse_monitor_data(frame)
+
+    def answers_decode() -> None:
+        for frame in frames:
+            answer = protocol.ANSWERS.get(frame[2])
+            if answer is None:
+                continue
+            try:
+                answer.decode(frame)
+            except protocol.ProtocolError:
+                pass
+
+    def switches_parse() -> None:
+        for frame in monitor:
+            parse_switches(frame)
+
+    def feed(chunks: list[bytes]) -> Callable[[], None]:
+        def _run() -> None:
+            device._device_status = None
+            for chunk in chunks:
+                device._process_raw_data(None, chunk)
+        return _run
+
+    def notification_lookup() -> None:
+        for frame in frames:
+            find_notification(frame)
+
+    def notification_cold() -> None:
+        _notification_payload.cache_clear()
+        for frame in frames:
+            _notification_payload(frame)
+
+    def notification_warm() -> None:
+        for frame in frames:
+            _notification_payload(frame)
+
+    def catalog_cold() -> None:
+        model.get_machine_catalog.cache_clear()
+        model.get_machine_models()
+
+    def model_lookup() -> None:
+        model.get_machine_model(PRODUCT_CODE)
+
+    def model_guess() -> None:
+        model.guess_machine_model(BLUETOOTH_NAME)
+
+    return {
+        'parse_monitor_data': monitor_parse,
+        'decode_answers': answers_decode,
+        'parse_switches': switches_parse,
+        'process_raw_data[mtu]': feed(mtu_chunks),
+        'process_raw_data[random]': feed(random_chunks),
+        'find_notification': notification_lookup,
+        'notification_payload[cold]': notification_cold,
+        'notification_payload[warm]': notification_warm,
+        'render_command': (
+            lambda: commands.STATISTICS.render(start=100, count=10)
+        ),
+        'beverage_start_frame[cold]': beverage_compile,
+        'beverage_start_frame[warm]': (
+            lambda: program.start_frame(**overrides)
+        ),
+        'parse_statistics': lambda: device._parse_statistics(statistics),
+        'parse_statistics[wide]': (
+            lambda: device._parse_statistics(statistics_wide)
+        ),
+        'parse_profile_response': (
+            lambda: device._parse_profile_response(profiles)
+        ),
+        'get_machine_models[source]': model._load_source_catalog,
+        'get_machine_models[cold]': catalog_cold,
+        'get_machine_models[warm]': model.get_machine_models,
+        'get_machine_model': model_lookup,
+        'guess_machine_model': model_guess,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run every selected case and return the measurements."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    device = DelongiPrimadonna(
+        {
+            CONF_MAC: '00:00:00:00:00:00',
+            CONF_NAME: 'Benchmark',
+            CONF_MODEL: PRODUCT_CODE,
+            CONF_KEEP_ALIVE: 0,
+        },
+        hass,
+    )
+    results = {}
+    try:
+        for name, func in cases(device).items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(func)
+            print(
+                f'{name:<28} {results[name]["ns_per_op"]:>14,.0f} ns/op '
+                f'{results[name]["peak_bytes"]:>10,.0f} B peak '
+                f'{results[name]["retained_blocks_per_op"]:>8.2f} blocks/op'
+            )
+            # Let the events fired by the notification path run
+            await asyncio.sleep(0)
+    finally:
+        await hass.async_stop(force=True)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline_path: Path, threshold: float
+) -> int:
+    """Print the change against a baseline, return 1 on regressions."""
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['ns_per_op']
+        change = result['ns_per_op'] / before - 1 if before else 0.0
+        marker = ''
+        if change > threshold:
+            marker = '  REGRESSION'
+            regressions += 1
+        print(f'{name:<28} {change:+8.1%}{marker}')
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', help='only run cases containing this')
+    parser.add_argument('--save', type=Path, help='write results as JSON')
+    parser.add_argument('--compare', type=Path, help='baseline JSON file')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='allowed slowdown against the baseline (default 0.2)',
+    )
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if args.compare:
+        return compare(results, args.compare, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Precompile MachinesModels.json into MachinesModels.bin.
+
+Run after editing the JSON catalog::
+
+    python script/build_catalog.py
+
+``--check`` exits non-zero when the committed blob is out of date.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+PACKAGE = (
+    Path(__file__).resolve().parent.parent
+    / 'custom_components'
+    / 'delonghi_primadonna'
+)
+SOURCE = PACKAGE / 'MachinesModels.json'
+TARGET = PACKAGE / 'MachinesModels.bin'
+
+
+def _load_format():
+    """Import catalog_format without importing the integration."""
+    spec = importlib.util.spec_from_file_location(
+        'catalog_format', PACKAGE / 'catalog_format.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _contents(catalog_format, blob: bytes) -> tuple:
+    """Return the decoded contents of a blob for comparison.
+
+    Compressed bytes may differ between zlib builds, so the check
+    compares what the loader would see instead.
+    """
+    catalog = catalog_format.CatalogBlob(blob)
+    return (
+        catalog.result,
+        catalog.name,
+        catalog.version,
+        [
+            (header, catalog.recipes(block))
+            for header, block in catalog.machines
+        ],
+    )
+
+
+def main() -> int:
+    """Build or verify the catalog blob."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='only verify that the blob matches the JSON catalog',
+    )
+    args = parser.parse_args()
+
+    catalog_format = _load_format()
+    with SOURCE.open('r', encoding='utf-8') as file:
+        blob = catalog_format.encode_catalog(json.load(file))
+
+    if args.check:
+        try:
+            current = _contents(catalog_format, TARGET.read_bytes())
+        except (OSError, ValueError) as error:
+            print(f'{TARGET.name} is unreadable: {error}')
+            return 1
+        if current != _contents(catalog_format, blob):
+            print(f'{TARGET.name} is out of date, run {Path(__file__).name}')
+            return 1
+        return 0
+
+    TARGET.write_bytes(blob)
+    print(f'Wrote {TARGET.name}: {len(blob)} bytes')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
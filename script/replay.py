@@ -0,0 +1,111 @@
+"""Replay a packet capture through the notification handler.
+
+Prints the resulting device state, decoder counters and the time the
+handler took. ``--dump`` lists the records instead and does not need
+Home Assistant::
+
+    python script/replay.py delonghi_primadonna_001122334455.dlcap
+    python script/replay.py capture.dlcap --speed 10
+    python script/replay.py capture.dlcap --dump
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import sys
+import tempfile
+import time
+from binascii import hexlify
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = ROOT / 'custom_components' / 'delonghi_primadonna'
+sys.path.insert(0, str(ROOT))
+
+
+def _load_format():
+    """Import capture_format without importing the integration."""
+    spec = importlib.util.spec_from_file_location(
+        'capture_format', PACKAGE / 'capture_format.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def dump(path: Path) -> None:
+    """Print every record of a capture."""
+    first = None
+    for direction, timestamp, payload in _load_format().iter_capture(path):
+        if first is None:
+            first = timestamp
+        print(
+            f'{(timestamp - first) / 1e9:10.3f} {direction.name} '
+            f'{hexlify(payload, " ").decode()}'
+        )
+
+
+async def replay(path: Path, speed: float, model: str) -> None:
+    """Replay a capture into a device and print what it ended up as."""
+    from homeassistant.const import CONF_MAC, CONF_MODEL, CONF_NAME
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.delonghi_primadonna.const import CONF_KEEP_ALIVE
+    from custom_components.delonghi_primadonna.device import DelongiPrimadonna
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    device = DelongiPrimadonna(
+        {
+            CONF_MAC: '00:00:00:00:00:00',
+            CONF_NAME: 'Replay',
+            CONF_MODEL: model,
+            CONF_KEEP_ALIVE: 0,
+        },
+        hass,
+    )
+    try:
+        start = time.perf_counter()
+        count = await device.async_replay(path, speed)
+        elapsed = time.perf_counter() - start
+        decoder = device._decoder
+        print(f'packets        {count} in {elapsed:.3f} s')
+        print(
+            f'frames         {decoder.frames} '
+            f'(crc errors {decoder.crc_errors}, '
+            f'dropped bytes {decoder.dropped_bytes}, '
+            f'suppressed {device.suppressed_frames})'
+        )
+        print(f'status         {device.status}')
+        print(f'power          {device.switches.is_on}')
+        print(f'steam nozzle   {device.steam_nozzle}')
+        print(f'switches       {[s.value for s in device.active_switches]}')
+        print(f'profile        {device.active_profile_id}')
+        print(f'statistics     {dict(sorted(device.statistics.items()))}')
+    finally:
+        await hass.async_stop(force=True)
+
+
+def main() -> int:
+    """Parse arguments and replay or dump the capture."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('capture', type=Path)
+    parser.add_argument(
+        '--speed',
+        type=float,
+        default=0,
+        help='timing scale, 1 for the original pace, 0 for no delays',
+    )
+    parser.add_argument('--model', default='0132215332')
+    parser.add_argument('--dump', action='store_true')
+    args = parser.parse_args()
+    if args.dump:
+        dump(args.capture)
+    else:
+        asyncio.run(replay(args.capture, args.speed, args.model))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Drive the integration against a simulated machine.
+
+Measures command round trips, statistics refreshes and notification
+parsing without hardware. Needs Home Assistant installed::
+
+    python script/simulate.py --commands 200 --mtu 20 --loss 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.const import CONF_MAC, CONF_MODEL, CONF_NAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from simulator import SimulatedMachine, SimulatorOptions  # noqa: E402
+
+from custom_components.delonghi_primadonna.commands import \
+    STATUS_REQUEST  # noqa: E402
+from custom_components.delonghi_primadonna.const import \
+    CONF_KEEP_ALIVE  # noqa: E402
+from custom_components.delonghi_primadonna.device import \
+    DelongiPrimadonna  # noqa: E402
+
+# Parameters shown by the bundled statistics sensors
+STATISTICS_SENSORS = (-3077, 3001, 10106, 105, 115, 108)
+
+
+def _report(name: str, samples: list[float]) -> None:
+    """Print latency percentiles in milliseconds."""
+    if not samples:
+        print(f'{name:<24} no samples')
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f'{name:<24} n={len(samples):<5} '
+        f'p50={statistics.median(ordered) * 1000:7.2f} ms '
+        f'p95={p95 * 1000:7.2f} ms '
+        f'max={ordered[-1] * 1000:7.2f} ms'
+    )
+
+
+async def _timed(coro) -> tuple[float, object]:
+    """Await a coroutine and return its duration and result."""
+    start = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - start, result
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the scenario and print the measurements."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    machine = SimulatedMachine()
+    options = SimulatorOptions(
+        latency=args.latency,
+        jitter=args.jitter,
+        mtu=args.mtu,
+        loss=args.loss,
+        disconnect_rate=args.disconnect_rate,
+        seed=args.seed,
+    )
+    device = DelongiPrimadonna(
+        {
+            CONF_MAC: '00:00:00:00:00:00',
+            CONF_NAME: 'Simulator',
+            CONF_MODEL: args.model,
+            CONF_KEEP_ALIVE: 0,
+        },
+        hass,
+        client_factory=machine.client_factory(options),
+    )
+    for param_id in STATISTICS_SENSORS:
+        device.statistics_scheduler.async_register(param_id)
+
+    try:
+        await device.get_device_name()
+
+        serial = []
+        for _ in range(args.commands):
+            duration, _ = await _timed(device.send_command(STATUS_REQUEST))
+            serial.append(duration)
+        _report('serial status', serial)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                device.send_command(STATUS_REQUEST)
+                for _ in range(args.commands)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        answered = sum(result is not None for result in results)
+        print(
+            f'{"pipelined status":<24} n={args.commands:<5} '
+            f'{args.commands / elapsed:9.1f} cmd/s answered={answered}'
+        )
+
+        refreshes = []
+        for _ in range(args.refreshes):
+            duration, _ = await _timed(device.update_statistics())
+            refreshes.append(duration)
+        _report('statistics refresh', refreshes)
+
+        frame = machine.monitor_frame()
+        chunks = [
+            frame[offset:offset + args.mtu]
+            for offset in range(0, len(frame), args.mtu)
+        ]
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            for chunk in chunks:
+                device._process_raw_data(None, bytearray(chunk))
+        elapsed = time.perf_counter() - start
+        print(
+            f'{"notification parsing":<24} n={args.frames:<5} '
+            f'{elapsed / args.frames * 1e6:9.2f} us/frame'
+        )
+        print(
+            f'machine requests={machine.requests} '
+            f'statistics ranges={device.statistics_scheduler.ranges}'
+        )
+    finally:
+        await device.disconnect()
+        await hass.async_stop(force=True)
+
+
+def main() -> int:
+    """Parse arguments and run the scenario."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='0132215332')
+    parser.add_argument('--commands', type=int, default=100)
+    parser.add_argument('--refreshes', type=int, default=10)
+    parser.add_argument('--frames', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--mtu', type=int, default=20)
+    parser.add_argument('--loss', type=float, default=0.0)
+    parser.add_argument('--disconnect-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,384 @@
+"""Simulated Delonghi machine for offline testing.
+
+:class:`SimulatedMachine` answers control frames the way a machine
+does and :class:`SimulatedBleakClient` stands in for ``BleakClient``,
+delivering the answers as MTU-sized notifications with configurable
+latency, loss and link drops. Pass
+:meth:`SimulatedMachine.client_factory` as ``client_factory`` to
+``DelongiPrimadonna`` to run the integration without hardware.
+
+The scripts in this directory import it after putting the repository
+root on ``sys.path``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import uuid
+from binascii import crc_hqx
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from bleak.exc import BleakError
+
+from custom_components.delonghi_primadonna.const import (
+    CONTROLL_CHARACTERISTIC, NAME_CHARACTERISTIC)
+from custom_components.delonghi_primadonna.frame import CRC_SEED, START_BYTE
+
+# Machine states reported in the monitor frame
+STATE_OFF = 0
+STATE_READY = 7
+STATE_BREWING = 0x0B
+# Sub state while a beverage is being prepared
+SUB_STATE_BREWING = 3
+
+PROFILE_NAME_SIZE = 20
+
+
+@dataclass(slots=True)
+class SimulatorOptions:
+    """Behaviour of the simulated radio link."""
+
+    # Delay between a write and its answer (seconds)
+    latency: float = 0.02
+    # Extra random delay added to every answer (seconds)
+    jitter: float = 0.0
+    # Largest notification payload, 20 bytes for the default ATT MTU
+    mtu: int = 20
+    # Probability that an answer is lost
+    loss: float = 0.0
+    # Probability that a write drops the link
+    disconnect_rate: float = 0.0
+    # Interval of unsolicited monitor frames, None to disable (seconds)
+    monitor_interval: float | None = None
+    # Time a beverage takes to brew (seconds)
+    brew_time: float = 1.0
+    # Seed of the random generator, fixed for repeatable runs
+    seed: int | None = 0
+
+
+def _crc_frame(answer_id: int, body: bytes | list[int]) -> bytes:
+    """Return a response frame with length and CRC filled in."""
+    frame = bytearray((START_BYTE, len(body) + 4, answer_id))
+    frame += bytes(body)
+    frame += crc_hqx(frame, CRC_SEED).to_bytes(2, 'big')
+    return bytes(frame)
+
+
+class SimulatedMachine:
+    """Protocol state of a simulated coffee machine."""
+
+    def __init__(self, name: str = 'D1234567') -> None:
+        """Initialize a powered, idle machine."""
+        self.name = name
+        self.powered = True
+        self.sub_status = 0
+        self.nozzle = 0
+        self.switches = 0
+        self.alarms = 0
+        self.brewing: int | None = None
+        self.profiles: dict[int, str] = {
+            1: 'Profile 1',
+            2: 'Profile 2',
+            3: 'Profile 3',
+            4: 'Guest',
+        }
+        self.active_profile = 1
+        self.settings: dict[int, int] = {}
+        self.clock: tuple[int, int] = (0, 0)
+        # Populated statistics parameters and their counters
+        self.statistics: dict[int, int] = {
+            **{pid: 10 * (pid - 99) for pid in range(100, 120)},
+            **{pid: pid - 2990 for pid in range(3000, 3010)},
+            **{pid: 3 for pid in range(3077, 3081)},
+        }
+        self.requests = 0
+        self.bad_frames = 0
+
+    @property
+    def state(self) -> int:
+        """Return the machine state byte."""
+        if not self.powered:
+            return STATE_OFF
+        return STATE_READY if self.brewing is None else STATE_BREWING
+
+    def monitor_frame(self) -> bytes:
+        """Return a v2 monitor data frame for the current state."""
+        alarms = self.alarms.to_bytes(4, 'little')
+        return _crc_frame(
+            0x75,
+            [
+                0x0F,
+                self.nozzle,
+                self.switches & 0xFF,
+                self.switches >> 8,
+                alarms[0],
+                alarms[1],
+                self.state,
+                self.sub_status,
+                0x00,
+                alarms[2],
+                alarms[3],
+                0x00,
+                0x00,
+                0x00,
+            ],
+        )
+
+    def handle(self, request: bytes) -> list[bytes]:
+        """Return the answers to a control frame."""
+        if (
+            len(request) < 5
+            or request[1] != len(request) - 1
+            or crc_hqx(request[:-2], CRC_SEED)
+            != int.from_bytes(request[-2:], 'big')
+        ):
+            self.bad_frames += 1
+            return []
+        self.requests += 1
+        answer_id = request[2]
+        handler = getattr(self, f'_handle_{answer_id:02x}', None)
+        if handler is None:
+            return [_crc_frame(answer_id, [request[3], 0x00])]
+        return handler(request)
+
+    def complete_beverage(self) -> None:
+        """Finish the running beverage and count it."""
+        if self.brewing is None:
+            return
+        param_id = 3000 + (self.brewing - 1) % 10
+        self.statistics[param_id] = self.statistics.get(param_id, 0) + 1
+        self.statistics[106] = self.statistics.get(106, 0) + 80
+        self.brewing = None
+        self.sub_status = 0
+
+    def client_factory(
+        self, options: SimulatorOptions | None = None
+    ) -> Callable[..., SimulatedBleakClient]:
+        """Return a factory building clients connected to this machine."""
+
+        def _factory(
+            disconnected_callback: Callable | None = None,
+        ) -> SimulatedBleakClient:
+            return SimulatedBleakClient(
+                self, options, disconnected_callback=disconnected_callback
+            )
+
+        return _factory
+
+    def _handle_75(self, request: bytes) -> list[bytes]:
+        """Answer a status request."""
+        return [self.monitor_frame()]
+
+    def _handle_84(self, request: bytes) -> list[bytes]:
+        """Power the machine on."""
+        self.powered = True
+        return [_crc_frame(0x84, [0x0F, 0x00]), self.monitor_frame()]
+
+    def _handle_83(self, request: bytes) -> list[bytes]:
+        """Start or stop a beverage."""
+        recipe_id, action = request[4], request[5]
+        if action == 0x01 and self.powered:
+            self.brewing = recipe_id
+            self.sub_status = SUB_STATE_BREWING
+        elif action == 0x02:
+            self.brewing = None
+            self.sub_status = 0
+        return [
+            _crc_frame(0x83, [0xF0, recipe_id, action]),
+            self.monitor_frame(),
+        ]
+
+    def _handle_90(self, request: bytes) -> list[bytes]:
+        """Store a machine setting."""
+        # The value is the last byte of the 0x90 body
+        param = request[5]
+        self.settings[param] = request[9]
+        return [_crc_frame(0x90, [0x0F, 0x00, param, 0x00])]
+
+    def _handle_a2(self, request: bytes) -> list[bytes]:
+        """Answer a statistics range read."""
+        start = (request[4] << 8) | request[5]
+        count = request[6]
+        body = bytearray((0x0F, request[4], request[5]))
+        body += self.statistics.get(start, 0).to_bytes(4, 'big')
+        for param_id in range(start + 1, start + count):
+            if param_id in self.statistics:
+                body += param_id.to_bytes(2, 'big')
+                body += self.statistics[param_id].to_bytes(4, 'big')
+        return [_crc_frame(0xA2, body)]
+
+    def _handle_a4(self, request: bytes) -> list[bytes]:
+        """Answer a profile name read."""
+        first, count = request[4], request[5]
+        body = bytearray((0xF0,))
+        for profile_id in range(first, first + count):
+            name = self.profiles.get(profile_id, '')
+            body += name.encode('utf-16-be')[:PROFILE_NAME_SIZE].ljust(
+                PROFILE_NAME_SIZE, b'\x00'
+            )
+            body.append(profile_id)
+        return [_crc_frame(0xA4, body)]
+
+    def _handle_a9(self, request: bytes) -> list[bytes]:
+        """Switch the active profile."""
+        profile_id = request[4]
+        status = 0x00 if profile_id in self.profiles else 0x01
+        if status == 0x00:
+            self.active_profile = profile_id
+        return [_crc_frame(0xA9, [0xF0, profile_id, status])]
+
+    def _handle_e2(self, request: bytes) -> list[bytes]:
+        """Set the machine clock."""
+        self.clock = (request[4], request[5])
+        return [_crc_frame(0xE2, [0xF0, 0x00])]
+
+
+class SimulatedBleakClient:
+    """In-memory replacement for ``BleakClient``."""
+
+    def __init__(
+        self,
+        machine: SimulatedMachine,
+        options: SimulatorOptions | None = None,
+        disconnected_callback: Callable | None = None,
+    ) -> None:
+        """Initialize a disconnected client."""
+        self.machine = machine
+        self.options = options or SimulatorOptions()
+        self._disconnected_callback = disconnected_callback
+        self._random = random.Random(self.options.seed)
+        self._connected = False
+        self._notify: Callable | None = None
+        self._handles: list[asyncio.TimerHandle] = []
+        self._monitor_task: asyncio.Task | None = None
+        # Answers waiting for delivery as (due time, frame), in order
+        self._outbox: deque[tuple[float, bytes]] = deque()
+        self.writes = 0
+        self.notifications = 0
+        self.lost = 0
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True while the simulated link is up."""
+        return self._connected
+
+    async def connect(self, **kwargs) -> bool:
+        """Bring the link up after one latency period."""
+        await asyncio.sleep(self.options.latency)
+        self._connected = True
+        if self.options.monitor_interval:
+            self._monitor_task = asyncio.get_running_loop().create_task(
+                self._push_monitor()
+            )
+        return True
+
+    async def disconnect(self) -> bool:
+        """Take the link down."""
+        self._drop_link()
+        return True
+
+    async def start_notify(self, char_specifier, callback: Callable) -> None:
+        """Register the notification callback."""
+        self._require_link()
+        self._notify = callback
+
+    async def stop_notify(self, char_specifier) -> None:
+        """Unregister the notification callback."""
+        self._notify = None
+
+    async def read_gatt_char(self, char_specifier) -> bytearray:
+        """Read the device name characteristic."""
+        self._require_link()
+        if uuid.UUID(str(char_specifier)) != uuid.UUID(NAME_CHARACTERISTIC):
+            raise BleakError(f'Characteristic {char_specifier} not readable')
+        return bytearray(self.machine.name.encode('utf-8'))
+
+    async def write_gatt_char(
+        self, char_specifier, data, response: bool | None = None
+    ) -> None:
+        """Deliver a control frame and schedule the answers."""
+        self._require_link()
+        self.writes += 1
+        if self._random.random() < self.options.disconnect_rate:
+            self._drop_link()
+            raise BleakError('Simulated link loss')
+        for frame in self.machine.handle(bytes(data)):
+            if self._random.random() < self.options.loss:
+                self.lost += 1
+                continue
+            self._send_later(frame, self.options.latency)
+        if self.machine.brewing is not None and data[2] == 0x83:
+            self._call_later(self.options.brew_time, self._finish_beverage)
+
+    def _require_link(self) -> None:
+        """Fail like Bleak does on a closed link."""
+        if not self._connected:
+            raise BleakError('Not connected')
+
+    def _send_later(self, frame: bytes, delay: float) -> None:
+        """Notify a frame after ``delay``, keeping answers in order."""
+        loop = asyncio.get_running_loop()
+        if self.options.jitter:
+            delay += self._random.uniform(0, self.options.jitter)
+        due = loop.time() + delay
+        if self._outbox:
+            due = max(due, self._outbox[-1][0])
+        self._outbox.append((due, frame))
+        if len(self._outbox) == 1:
+            self._call_later(delay, self._flush)
+
+    def _flush(self) -> None:
+        """Deliver every answer that is due, then wait for the next."""
+        now = asyncio.get_running_loop().time()
+        while self._outbox and self._outbox[0][0] <= now:
+            self._deliver(self._outbox.popleft()[1])
+        if self._outbox:
+            self._call_later(self._outbox[0][0] - now, self._flush)
+
+    def _call_later(self, delay: float, action: Callable, *args) -> None:
+        """Schedule an action that is cancelled with the link."""
+        self._handles = [h for h in self._handles if not h.cancelled()]
+        self._handles.append(
+            asyncio.get_running_loop().call_later(delay, action, *args)
+        )
+
+    def _deliver(self, frame: bytes) -> None:
+        """Split a frame into MTU-sized notifications."""
+        if not self._connected or self._notify is None:
+            return
+        mtu = max(1, self.options.mtu)
+        for offset in range(0, len(frame), mtu):
+            self.notifications += 1
+            self._notify(
+                CONTROLL_CHARACTERISTIC,
+                bytearray(frame[offset:offset + mtu]),
+            )
+
+    def _finish_beverage(self) -> None:
+        """Complete the beverage and push the new state."""
+        self.machine.complete_beverage()
+        self._send_later(self.machine.monitor_frame(), 0)
+
+    async def _push_monitor(self) -> None:
+        """Send monitor frames like an idle machine does."""
+        while self._connected:
+            await asyncio.sleep(self.options.monitor_interval)
+            self._send_later(self.machine.monitor_frame(), 0)
+
+    def _drop_link(self) -> None:
+        """Close the link and report it like Bleak."""
+        if not self._connected:
+            return
+        self._connected = False
+        for handle in self._handles:
+            handle.cancel()
+        self._handles.clear()
+        self._outbox.clear()
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
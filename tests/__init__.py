@@ -0,0 +1 @@
+"""Tests for the Delonghi Primadonna integration."""
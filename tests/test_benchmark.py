@@ -0,0 +1,186 @@
+"""Benchmarks of the protocol hot paths.
+
+Run with pytest-benchmark installed; the module is skipped otherwise.
+``script/benchmark.py`` also measures allocations and the device level
+notification pipeline.
+"""
+
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from custom_components.delonghi_primadonna import beverage, model, protocol
+from custom_components.delonghi_primadonna.device import (
+    _notification_payload, find_notification, parse_monitor_data)
+from custom_components.delonghi_primadonna.frame import FrameDecoder
+from custom_components.delonghi_primadonna.machine_switch import parse_switches
+from custom_components.delonghi_primadonna.statistics import iter_statistics
+
+pytest.importorskip('pytest_benchmark')
+
+PRODUCT_CODE = '0132215332'
+BLUETOOTH_NAME = 'D1532215332'
+
+_HEX_ROW = re.compile(r'^\|\s*(d0(?: [0-9a-f]{2})+)\s*\|', re.IGNORECASE)
+NOTES = Path(__file__).resolve().parent.parent / 'DEBUG_NOTES.md'
+
+
+def statistics_frame(start: int, count: int) -> bytes:
+    """Return a 0xA2 answer with every parameter of a range present."""
+    body = bytearray((0xD0, 0, 0xA2, 0x0F))
+    for param_id in range(start, start + count):
+        body += param_id.to_bytes(2, 'big') + param_id.to_bytes(4, 'big')
+    body[1] = len(body) + 1
+    return protocol.seal_payload(bytes(body))
+
+
+def profiles_frame(names: list[str]) -> bytes:
+    """Return a 0xA4 answer with the given profile names."""
+    body = bytearray((0xD0, 0, 0xA4, 0xF0))
+    for index, name in enumerate(names, 1):
+        body += name.encode('utf-16-be').ljust(20, b'\x00') + bytes((index,))
+    body[1] = len(body) + 1
+    return protocol.seal_payload(bytes(body))
+
+
+with NOTES.open(encoding='utf-8') as _file:
+    NOTES_FRAMES = [
+        bytes.fromhex(match.group(1))
+        for match in map(_HEX_ROW.match, _file)
+        if match
+    ]
+STATISTICS_FRAME = statistics_frame(100, 10)
+# The widest read discovery makes
+STATISTICS_WIDE_FRAME = statistics_frame(3000, 41)
+PROFILES_FRAME = profiles_frame(['Mario', 'Luigi', 'Peach', 'Toad'])
+FRAMES = NOTES_FRAMES + [STATISTICS_FRAME, STATISTICS_WIDE_FRAME,
+                         PROFILES_FRAME]
+MONITOR_FRAMES = [frame for frame in FRAMES if frame[2] in (0x70, 0x75)]
+
+
+def chunks(sizes) -> list[bytes]:
+    """Split the frame corpus into chunks of the given sizes."""
+    stream = b''.join(FRAMES)
+    result = []
+    offset = 0
+    while offset < len(stream):
+        size = sizes()
+        result.append(stream[offset:offset + size])
+        offset += size
+    return result
+
+
+@pytest.mark.parametrize('sizes', [
+    pytest.param(lambda: 20, id='mtu'),
+    pytest.param(lambda rng=random.Random(0): rng.randint(1, 40), id='random'),
+])
+def test_frame_decoder(benchmark, sizes):
+    """Reassemble notification chunks into frames."""
+    data = chunks(sizes)
+
+    def feed():
+        decoder = FrameDecoder()
+        return sum(1 for chunk in data for _ in decoder.feed(chunk))
+
+    assert benchmark(feed) == len(FRAMES)
+
+
+def test_parse_monitor_data(benchmark):
+    """Decode every recorded monitor frame."""
+    def parse():
+        return [parse_monitor_data(frame) for frame in MONITOR_FRAMES]
+
+    assert all(benchmark(parse))
+
+
+def test_decode_answers(benchmark):
+    """Decode the corpus with the declarative answer layouts."""
+    def decode():
+        decoded = 0
+        for frame in FRAMES:
+            answer = protocol.ANSWERS.get(frame[2])
+            if answer is None:
+                continue
+            if answer.type._fields:
+                answer.decode(frame)
+            else:
+                answer.validate(frame)
+            decoded += 1
+        return decoded
+
+    assert benchmark(decode) == len(FRAMES)
+
+
+def test_parse_switches(benchmark):
+    """Read the switch bits of the monitor frames."""
+    benchmark(lambda: [parse_switches(frame) for frame in MONITOR_FRAMES])
+
+
+@pytest.mark.parametrize('frame', [
+    pytest.param(STATISTICS_FRAME, id='narrow'),
+    pytest.param(STATISTICS_WIDE_FRAME, id='wide'),
+])
+def test_iter_statistics(benchmark, frame):
+    """Unpack the records of a statistics answer."""
+    assert benchmark(lambda: dict(iter_statistics(frame)))
+
+
+def test_find_notification(benchmark):
+    """Look up the known notifications of the corpus."""
+    benchmark(lambda: [find_notification(frame) for frame in FRAMES])
+
+
+@pytest.mark.parametrize('cold', [True, False], ids=['cold', 'warm'])
+def test_notification_payload(benchmark, cold):
+    """Build event data and notification texts."""
+    def build():
+        if cold:
+            _notification_payload.cache_clear()
+        return [_notification_payload(frame) for frame in FRAMES]
+
+    benchmark(build)
+
+
+def test_render_command(benchmark):
+    """Render a request with fields."""
+    benchmark(protocol.STATISTICS.render, start=100, count=10)
+
+
+@pytest.mark.parametrize('cold', [True, False], ids=['cold', 'warm'])
+def test_beverage_start_frame(benchmark, cold):
+    """Build a start frame with an override."""
+    program = beverage.BeverageProgram('Espresso', 1, (
+        beverage.Parameter(beverage.Ingredient.COFFEE, 'coffee_qty', 40,
+                           20, 80),
+        beverage.Parameter(beverage.Ingredient.TASTE, 'aroma', 3, 0, 5),
+        beverage.Parameter(beverage.Ingredient.TEMPERATURE, 'temperature',
+                           0, 0, 3),
+    ))
+
+    def build():
+        if cold:
+            beverage.encode_start.cache_clear()
+        return program.start_frame(aroma=4)
+
+    assert benchmark(build)
+
+
+def test_machine_catalog_cold(benchmark):
+    """Load the machine catalog blob."""
+    def load():
+        model.get_machine_catalog.cache_clear()
+        return model.get_machine_models()
+
+    assert benchmark(load)
+
+
+def test_get_machine_model(benchmark):
+    """Look a machine up by product code."""
+    assert benchmark(model.get_machine_model, PRODUCT_CODE) is not None
+
+
+def test_guess_machine_model(benchmark):
+    """Guess a machine from its Bluetooth name."""
+    benchmark(model.guess_machine_model, BLUETOOTH_NAME)
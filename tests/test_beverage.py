@@ -0,0 +1,177 @@
+"""Tests for the beverage start frames."""
+
+import pytest
+
+from custom_components.delonghi_primadonna.beverage import (BeverageError,
+                                                            BeverageProgram,
+                                                            Ingredient,
+                                                            Parameter,
+                                                            encode_start,
+                                                            recipe_parameters)
+from custom_components.delonghi_primadonna.const import (AMERICANO_ON,
+                                                         ESPRESSO_ON,
+                                                         HOTWATER_ON, STEAM_ON)
+from custom_components.delonghi_primadonna.machine_entities import Recipe
+
+
+@pytest.mark.parametrize('recipe_id, ingredients, values, recorded', [
+    (0x01,
+     (Ingredient.COFFEE, Ingredient.TASTE, Ingredient.DOUBLE,
+      Ingredient.TEMPERATURE),
+     (40, 3, 0, 0), ESPRESSO_ON),
+    (0x06,
+     (Ingredient.COFFEE, Ingredient.TASTE, Ingredient.HOT_WATER,
+      Ingredient.TEMPERATURE),
+     (40, 3, 110, 0), AMERICANO_ON),
+    (0x10, (Ingredient.HOT_WATER, Ingredient.ACCESSORY), (250, 1),
+     HOTWATER_ON),
+])
+def test_encode_start_matches_recorded_frames(
+    recipe_id, ingredients, values, recorded
+):
+    """Frames equal the ones recorded from the official app."""
+    assert encode_start(recipe_id, ingredients, values) == bytes(recorded)
+
+
+def test_encode_start_value_widths():
+    """Quantities take two bytes, other values one."""
+    frame = encode_start(
+        0x07, (Ingredient.MILK, Ingredient.TASTE), (0x0123, 4)
+    )
+    assert frame[:6] == bytes((0x0D, 0x0D, 0x83, 0xF0, 0x07, 0x01))
+    assert frame[6:12] == bytes((0x09, 0x01, 0x23, 0x02, 0x04, 0x06))
+    assert frame[1] == len(frame) - 1
+
+
+def test_encode_start_is_cached():
+    """Repeating a beverage reuses its frame."""
+    ingredients = (Ingredient.COFFEE, Ingredient.TEMPERATURE)
+    assert encode_start(2, ingredients, (100, 1)) is encode_start(
+        2, ingredients, (100, 1)
+    )
+
+
+def test_encode_start_rejects_overflow():
+    """A value that does not fit its field is refused."""
+    with pytest.raises(OverflowError):
+        encode_start(2, (Ingredient.TASTE,), (256,))
+
+
+ESPRESSO = BeverageProgram('Espresso', 1, (
+    Parameter(Ingredient.COFFEE, 'coffee_qty', 40, 20, 80),
+    Parameter(Ingredient.TASTE, 'aroma', 3, 0, 5),
+    Parameter(Ingredient.DOUBLE, None, 0, 0, 0),
+    Parameter(Ingredient.TEMPERATURE, 'temperature', 0, 0, 3),
+))
+
+
+def test_program_default_frame():
+    """The default frame uses the recipe values."""
+    assert ESPRESSO.default_frame == bytes(ESPRESSO_ON)
+    assert ESPRESSO.start_frame() is ESPRESSO.default_frame
+    assert ESPRESSO.options == {'coffee_qty', 'aroma', 'temperature'}
+
+
+def test_program_overrides():
+    """Overrides replace their values only."""
+    frame = ESPRESSO.start_frame(coffee_qty=60, temperature=2)
+    ingredients = tuple(
+        parameter.ingredient for parameter in ESPRESSO.parameters
+    )
+    assert frame == encode_start(1, ingredients, (60, 3, 0, 2))
+    assert frame[6:16] == bytes(
+        (0x01, 0x00, 0x3C, 0x02, 0x03, 0x08, 0x00, 0x00, 0x02, 0x06)
+    )
+
+
+@pytest.mark.parametrize('overrides', [
+    {'coffee_qty': 10}, {'coffee_qty': 81}, {'aroma': 6},
+    {'milk_qty': 100},
+])
+def test_program_rejects_overrides(overrides):
+    """Values outside the bounds and unsupported options are refused."""
+    with pytest.raises(BeverageError):
+        ESPRESSO.start_frame(**overrides)
+
+
+def test_program_recipe_id_fits_a_byte():
+    """Recipe ids above 255 cannot be encoded."""
+    with pytest.raises(BeverageError):
+        BeverageProgram('Broken', 256, ())
+
+
+HOT_WATER = Recipe(
+    id='16', ingredients=['15', '24', '25', '28'],
+    coffee_qty=250, min_coffee=20, max_coffee=420,
+    milk_qty=0, min_milk=0, max_milk=0, taste=0,
+)
+STEAM = Recipe(
+    id='17', ingredients=['9', '24', '25', '28'],
+    coffee_qty=0, min_coffee=0, max_coffee=0,
+    milk_qty=900, min_milk=50, max_milk=900, taste=0,
+)
+CAPPUCCINO = Recipe(
+    id='7', ingredients=['1', '2', '9', '24', '25'],
+    coffee_qty=80, min_coffee=20, max_coffee=180,
+    milk_qty=160, min_milk=50, max_milk=900, taste=0,
+)
+
+
+@pytest.mark.parametrize('recipe, recorded', [
+    (HOT_WATER, HOTWATER_ON),
+    (STEAM, STEAM_ON),
+])
+def test_recipe_matches_recorded_frame(recipe, recorded):
+    """Catalog recipes compile to the frames recorded from the app."""
+    program = BeverageProgram.from_recipe('Beverage', recipe)
+    assert program.default_frame == bytes(recorded)
+
+
+def test_recipe_parameters():
+    """Coffee recipes end with the temperature."""
+    assert [
+        (parameter.ingredient, parameter.default, parameter.low,
+         parameter.high)
+        for parameter in recipe_parameters(CAPPUCCINO)
+    ] == [
+        (Ingredient.COFFEE, 80, 20, 180),
+        (Ingredient.TASTE, 3, 0, 5),
+        (Ingredient.MILK, 160, 50, 900),
+        (Ingredient.TEMPERATURE, 0, 0, 3),
+    ]
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'ingredients': ['1', '2', '12', '24', '25']}, 'unsupported'),
+    ({'ingredients': ['1', '2', '27', '24', '25']}, 'unsupported'),
+    ({'ingredients': ['1', '2', '0', '28']}, 'unsupported'),
+    ({'ingredients': ['9', '0', '28']}, 'unsupported'),
+    ({'ingredients': ['1', '15']}, 'hot water'),
+    ({'ingredients': ['24', '25']}, 'no ingredients'),
+    ({'ingredients': []}, 'no ingredients'),
+    ({'ingredients': ['1', 'x']}, 'invalid'),
+    ({'coffee_qty': 0}, 'coffee'),
+    ({'coffee_qty': None}, 'coffee'),
+    ({'max_coffee': 0}, 'coffee'),
+    ({'min_coffee': 0}, 'coffee'),
+    ({'coffee_qty': 200}, 'coffee'),
+    ({'milk_qty': 0}, 'milk'),
+    ({'max_milk': None}, 'milk'),
+])
+def test_recipe_parameters_rejects(changes, message):
+    """Recipes that cannot be encoded faithfully are refused."""
+    recipe = Recipe(**{
+        'id': '7', 'ingredients': ['1', '2', '9'], 'coffee_qty': 80,
+        'min_coffee': 20, 'max_coffee': 180, 'milk_qty': 160,
+        'min_milk': 50, 'max_milk': 900, **changes,
+    })
+    with pytest.raises(BeverageError, match=message):
+        recipe_parameters(recipe)
+
+
+def test_water_only_recipe_needs_quantity():
+    """Hot water keeps its quantity in the coffee fields."""
+    recipe = Recipe(id='16', ingredients=['15', '28'], coffee_qty=0,
+                    min_coffee=20, max_coffee=420)
+    with pytest.raises(BeverageError, match='hot water'):
+        recipe_parameters(recipe)
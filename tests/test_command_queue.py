@@ -0,0 +1,195 @@
+"""Tests for the command scheduler."""
+
+import asyncio
+
+import pytest
+
+from custom_components.delonghi_primadonna.command_queue import (
+    CoalescedWriter, CommandScheduler)
+from custom_components.delonghi_primadonna.commands import SWITCHES
+
+STATUS = bytes((0x0D, 0x05, 0x75, 0x0F, 0x00))
+STATUS_ANSWER = bytes((0xD0, 0x05, 0x75, 0x0F, 0x00))
+STATISTICS = bytes((0x0D, 0x08, 0xA2, 0x0F, 0x00, 0x64, 0x0A, 0x00))
+STATISTICS_ANSWER = bytes((0xD0, 0x05, 0xA2, 0x0F, 0x00))
+
+
+class Writer:
+    """Frame writer recording what was sent."""
+
+    def __init__(self, delay: float = 0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.frames: list[bytes] = []
+
+    async def __call__(self, frame, priority):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.frames.append(frame)
+
+
+def test_response_resolves_request():
+    """A response is matched to the request with the same id."""
+    async def run():
+        writer = Writer()
+        scheduler = CommandScheduler(writer, timeout=1)
+        request = asyncio.ensure_future(scheduler.async_request(STATUS))
+        await asyncio.sleep(0)
+        assert scheduler.async_resolve(STATUS_ANSWER)
+        assert await request == STATUS_ANSWER
+        assert writer.frames == [STATUS]
+        await asyncio.sleep(0)
+        assert scheduler.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_responses_match_by_id_in_order():
+    """Requests with different ids are resolved independently."""
+    async def run():
+        scheduler = CommandScheduler(Writer(), timeout=1)
+        first = await scheduler.async_submit(STATUS)
+        second = await scheduler.async_submit(STATISTICS)
+        third = await scheduler.async_submit(STATUS)
+        assert scheduler.in_flight == 3
+        assert scheduler.async_resolve(STATISTICS_ANSWER)
+        assert scheduler.async_resolve(STATUS_ANSWER)
+        assert second.result() == STATISTICS_ANSWER
+        assert first.done() and not third.done()
+        assert not scheduler.async_resolve(STATISTICS_ANSWER)
+        scheduler.async_cancel_all()
+        assert third.cancelled()
+
+    asyncio.run(run())
+
+
+def test_unmatched_and_short_frames():
+    """Frames nobody waits for are not resolved."""
+    scheduler = CommandScheduler(Writer())
+    assert not scheduler.async_resolve(STATUS_ANSWER)
+    assert not scheduler.async_resolve(b'\xd0\x05')
+
+
+def test_timeout():
+    """A request without a response fails with a timeout."""
+    async def run():
+        scheduler = CommandScheduler(Writer(), timeout=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.async_request(STATUS)
+        await asyncio.sleep(0)
+        assert scheduler.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_timeout_starts_after_the_write():
+    """Time spent writing does not count against the response."""
+    async def run():
+        scheduler = CommandScheduler(Writer(delay=0.05), timeout=0.03)
+        request = asyncio.ensure_future(scheduler.async_request(STATUS))
+        await asyncio.sleep(0.06)
+        assert scheduler.async_resolve(STATUS_ANSWER)
+        assert await request == STATUS_ANSWER
+
+    asyncio.run(run())
+
+
+def test_failed_write_drops_the_request():
+    """A request whose write failed frees its slot at once."""
+    async def run():
+        scheduler = CommandScheduler(
+            Writer(error=OSError('link lost')), max_in_flight=1, timeout=1
+        )
+        for _ in range(3):
+            with pytest.raises(OSError):
+                await scheduler.async_submit(STATUS)
+            assert scheduler.in_flight == 0
+            await asyncio.sleep(0)
+        assert not scheduler.async_resolve(STATUS_ANSWER)
+
+    asyncio.run(run())
+
+
+def test_in_flight_limit():
+    """Only ``max_in_flight`` requests are outstanding at once."""
+    async def run():
+        writer = Writer()
+        scheduler = CommandScheduler(writer, max_in_flight=2, timeout=1)
+        await scheduler.async_submit(STATUS)
+        await scheduler.async_submit(STATUS)
+        blocked = asyncio.ensure_future(scheduler.async_submit(STATISTICS))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        assert len(writer.frames) == 2
+        scheduler.async_resolve(STATUS_ANSWER)
+        await asyncio.sleep(0.01)
+        assert blocked.done()
+        assert writer.frames[-1] == STATISTICS
+        scheduler.async_cancel_all()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+
+class Switches:
+    """Switch mask written the way the device renders it."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.mask = 0
+        self.frames: list[bytes] = []
+
+    async def write(self):
+        frame = SWITCHES.render(mask=self.mask)
+        await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+
+def test_coalesced_changes_write_once():
+    """Changes made within the cooldown go out as one write."""
+    async def run():
+        switches = Switches()
+        writer = CoalescedWriter(switches.write, 0.01)
+        switches.mask = 0x10
+        first = asyncio.ensure_future(writer.async_call())
+        switches.mask = 0x18
+        await asyncio.gather(first, writer.async_call())
+        assert switches.frames == [SWITCHES.render(mask=0x18)]
+
+    asyncio.run(run())
+
+
+def test_change_during_write_is_written():
+    """A toggle made while a write is in flight gets its own write."""
+    async def run():
+        switches = Switches(delay=0.05)
+        writer = CoalescedWriter(switches.write, 0.01)
+        switches.mask = 0x10
+        first = asyncio.ensure_future(writer.async_call())
+        await asyncio.sleep(0.03)
+        assert switches.frames == []
+        switches.mask = 0x18
+        await asyncio.gather(first, writer.async_call())
+        assert switches.frames == [
+            SWITCHES.render(mask=0x10),
+            SWITCHES.render(mask=0x18),
+        ]
+
+    asyncio.run(run())
+
+
+def test_cancel_drops_pending_change():
+    """Cancelling stops the write that has not gone out yet."""
+    async def run():
+        switches = Switches()
+        writer = CoalescedWriter(switches.write, 0.05)
+        switches.mask = 0x10
+        call = asyncio.ensure_future(writer.async_call())
+        await asyncio.sleep(0)
+        writer.async_cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert switches.frames == []
+
+    asyncio.run(run())
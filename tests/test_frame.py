@@ -0,0 +1,126 @@
+"""Tests for the notification frame decoder."""
+
+from binascii import crc_hqx
+
+import pytest
+
+from custom_components.delonghi_primadonna.frame import (CRC_SEED,
+                                                         MAX_FRAME_SIZE,
+                                                         FrameDecoder)
+
+
+def make_frame(answer_id: int, body: bytes = b'') -> bytes:
+    """Return a sealed answer frame."""
+    payload = bytes((0xD0, len(body) + 4, answer_id)) + body
+    return payload + crc_hqx(payload, CRC_SEED).to_bytes(2, 'big')
+
+
+MONITOR = make_frame(0x75, bytes(range(1, 17)))
+STATISTICS = make_frame(0xA2, bytes((0x0F, 0x00, 0x64, 0, 0, 0, 7)))
+
+
+def decode(decoder: FrameDecoder, *chunks: bytes) -> list[bytes]:
+    """Feed chunks and return copies of the decoded frames."""
+    return [
+        bytes(frame) for chunk in chunks for frame in decoder.feed(chunk)
+    ]
+
+
+def test_whole_frames():
+    """Frames arriving in one chunk are yielded in order."""
+    decoder = FrameDecoder()
+    assert decode(decoder, MONITOR + STATISTICS) == [MONITOR, STATISTICS]
+    assert decoder.frames == 2
+    assert len(decoder) == 0
+
+
+@pytest.mark.parametrize('size', [1, 2, 5, 20])
+def test_fragmented_frames(size):
+    """Frames split over MTU-sized chunks are reassembled."""
+    decoder = FrameDecoder()
+    data = MONITOR + STATISTICS
+    chunks = [data[i:i + size] for i in range(0, len(data), size)]
+    assert decode(decoder, *chunks) == [MONITOR, STATISTICS]
+    assert decoder.crc_errors == 0
+    assert decoder.dropped_bytes == 0
+
+
+def test_crc_corrupted_frame():
+    """A frame with a bad CRC is skipped and the next one is kept."""
+    decoder = FrameDecoder()
+    corrupted = bytearray(MONITOR)
+    corrupted[-1] ^= 0xFF
+    assert decode(decoder, bytes(corrupted) + STATISTICS) == [STATISTICS]
+    assert decoder.frames == 1
+    assert decoder.crc_errors == 1
+    # The start byte of the broken frame is resynchronised, the rest
+    # is dropped while seeking the next start byte
+    assert decoder.resynced_bytes == 1
+    assert decoder.dropped_bytes == len(MONITOR) - 1
+
+
+def test_resync_after_garbage():
+    """Bytes before a start byte are dropped."""
+    decoder = FrameDecoder()
+    garbage = bytes((0x00, 0x13, 0x37, 0xFF))
+    assert decode(decoder, garbage + MONITOR) == [MONITOR]
+    assert decoder.dropped_bytes == len(garbage)
+
+
+def test_resync_on_short_length():
+    """A start byte with an impossible length byte is skipped."""
+    decoder = FrameDecoder()
+    assert decode(decoder, bytes((0xD0, 0x01)) + MONITOR) == [MONITOR]
+    assert decoder.resynced_bytes == 1
+    assert decoder.dropped_bytes == 1
+
+
+def test_garbage_without_start_byte():
+    """A buffer without any start byte is discarded."""
+    decoder = FrameDecoder()
+    assert decode(decoder, bytes(10)) == []
+    assert decoder.dropped_bytes == 10
+    assert len(decoder) == 0
+
+
+def test_partial_frame_is_kept():
+    """An incomplete frame waits for the rest of its bytes."""
+    decoder = FrameDecoder()
+    assert decode(decoder, MONITOR[:-3]) == []
+    assert len(decoder) == len(MONITOR) - 3
+    assert decode(decoder, MONITOR[-3:]) == [MONITOR]
+
+
+def test_ring_buffer_wraparound():
+    """Frames crossing the end of the ring buffer decode intact."""
+    decoder = FrameDecoder(capacity=MAX_FRAME_SIZE)
+    frames = [
+        make_frame(0xA2, bytes((index,)) * (7 + index % 11))
+        for index in range(64)
+    ]
+    data = b''.join(frames)
+    chunks = [data[i:i + 20] for i in range(0, len(data), 20)]
+    assert decode(decoder, *chunks) == frames
+    assert decoder.frames == len(frames)
+    assert decoder.crc_errors == 0
+
+
+def test_chunk_larger_than_buffer():
+    """A chunk larger than the buffer is drained as it is written."""
+    decoder = FrameDecoder(capacity=MAX_FRAME_SIZE)
+    frames = [MONITOR] * (2 * MAX_FRAME_SIZE // len(MONITOR) + 1)
+    assert decode(decoder, b''.join(frames)) == frames
+
+
+def test_reset_discards_buffered_bytes():
+    """A reset drops a half received frame."""
+    decoder = FrameDecoder()
+    decode(decoder, MONITOR[:5])
+    decoder.reset()
+    assert decode(decoder, STATISTICS) == [STATISTICS]
+
+
+def test_capacity_must_hold_a_frame():
+    """The buffer must be able to hold the largest frame."""
+    with pytest.raises(ValueError):
+        FrameDecoder(capacity=MAX_FRAME_SIZE - 1)
@@ -0,0 +1,104 @@
+"""Tests for the counter usage history."""
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.delonghi_primadonna.const import (
+    HISTORY_DAILY_BUCKETS, HISTORY_HOURLY_BUCKETS, HISTORY_RAW_SAMPLES)
+from custom_components.delonghi_primadonna.history import HOUR, CounterHistory
+
+DAY = 24 * HOUR
+# Midnight UTC, so hourly and daily buckets line up with the samples
+EPOCH = datetime(2024, 1, 1).timestamp() // DAY * DAY
+
+
+def day_start(timestamp: float) -> int:
+    """Return the local start of the day of ``timestamp``."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    return int(dt_util.start_of_local_day(local).timestamp())
+
+
+def record(history: CounterHistory, value: float, timestamp: float) -> float:
+    """Record a total at ``timestamp``."""
+    return history.record(value, timestamp, day_start(timestamp))
+
+
+def test_first_total_is_the_baseline():
+    """The first total seen has no delta."""
+    history = CounterHistory()
+    assert record(history, 100, EPOCH) == 0
+    assert record(history, 103, EPOCH + 60) == 3
+    assert history.sum == 3
+    assert history.total_since(EPOCH) == 3
+
+
+def test_counter_reset_becomes_baseline():
+    """A lower total is not counted as usage."""
+    history = CounterHistory()
+    record(history, 100, EPOCH)
+    assert record(history, 5, EPOCH + 60) == 0
+    assert record(history, 7, EPOCH + 120) == 2
+    assert history.sum == 2
+
+
+def test_raw_samples_are_exact():
+    """Recent usage is summed from the samples after ``start``."""
+    history = CounterHistory()
+    record(history, 0, EPOCH)
+    for minute in range(1, 11):
+        record(history, minute, EPOCH + minute * 60)
+    assert history.total_since(EPOCH + 5 * 60) == 6
+    assert history.total_since(EPOCH + 11 * 60) == 0
+
+
+def test_hourly_buckets_after_raw_eviction():
+    """Once samples are dropped, hourly buckets cover the period."""
+    history = CounterHistory()
+    record(history, 0, EPOCH)
+    step = HOUR // 4
+    for index in range(1, HISTORY_RAW_SAMPLES * 2):
+        record(history, index, EPOCH + index * step)
+    assert len(history.raw.starts) == HISTORY_RAW_SAMPLES
+    assert not history.raw.covers(EPOCH + HOUR)
+    # The bucket holding ``start`` counts as a whole
+    assert history.total_since(EPOCH + HOUR + 60) == history.sum - 3
+    assert history.hourly.total_since(EPOCH) == history.sum
+
+
+def test_daily_buckets_after_hourly_eviction():
+    """The oldest periods are summed by local day."""
+    history = CounterHistory()
+    record(history, 0, EPOCH)
+    hours = HISTORY_HOURLY_BUCKETS + 48
+    for hour in range(1, hours + 1):
+        record(history, hour, EPOCH + hour * HOUR)
+    assert len(history.hourly.starts) == HISTORY_HOURLY_BUCKETS
+    assert not history.hourly.covers(EPOCH + HOUR)
+    assert history.total_since(EPOCH) == history.sum == hours
+    assert len(history.daily.starts) <= HISTORY_DAILY_BUCKETS
+
+
+def test_round_trip():
+    """A stored history is restored with its tiers and evictions."""
+    history = CounterHistory()
+    record(history, 0, EPOCH)
+    for index in range(1, HISTORY_RAW_SAMPLES + 10):
+        record(history, index * 2, EPOCH + index * 600)
+    restored = CounterHistory.from_dict(history.as_dict())
+    assert restored.value == history.value
+    assert restored.sum == history.sum
+    for tier in ('raw', 'hourly', 'daily'):
+        assert getattr(restored, tier).as_list() == getattr(
+            history, tier
+        ).as_list()
+    assert restored.raw.evicted_until == history.raw.evicted_until
+    start = EPOCH + timedelta(hours=5).total_seconds()
+    assert restored.total_since(start) == history.total_since(start)
+
+
+def test_empty_round_trip():
+    """A history without samples keeps nothing evicted."""
+    restored = CounterHistory.from_dict(CounterHistory().as_dict())
+    assert restored.value is None
+    assert restored.raw.covers(0)
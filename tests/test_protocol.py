@@ -0,0 +1,151 @@
+"""Tests for the protocol message codecs."""
+
+from binascii import crc_hqx
+
+import pytest
+
+from custom_components.delonghi_primadonna import protocol
+from custom_components.delonghi_primadonna.frame import CRC_SEED
+from custom_components.delonghi_primadonna.protocol import (Answer, Field,
+                                                            ProtocolError,
+                                                            Request,
+                                                            seal_payload)
+
+
+def sealed(*values: int) -> bytes:
+    """Return the bytes followed by their CRC."""
+    payload = bytes(values)
+    return payload + crc_hqx(payload, CRC_SEED).to_bytes(2, 'big')
+
+
+@pytest.mark.parametrize('request_, values, expected', [
+    (protocol.POWER, {}, sealed(0x0D, 0x07, 0x84, 0x0F, 0x02, 0x01)),
+    (protocol.STATUS_REQUEST, {}, sealed(0x0D, 0x05, 0x75, 0x0F)),
+    (protocol.SET_TIME, {'hour': 7, 'minute': 45},
+     sealed(0x0D, 0x07, 0xE2, 0xF0, 0x07, 0x2D)),
+    (protocol.SWITCHES, {'mask': 0b101},
+     sealed(0x0D, 0x0B, 0x90, 0x0F, 0x00, 0x3F, 0, 0, 0, 0x05)),
+    (protocol.AUTO_POWER_OFF, {'value': 3},
+     sealed(0x0D, 0x0B, 0x90, 0x0F, 0x00, 0x3E, 0, 0, 0, 0x03)),
+    (protocol.STATISTICS, {'start': 3000, 'count': 10},
+     sealed(0x0D, 0x08, 0xA2, 0x0F, 0x0B, 0xB8, 0x0A)),
+    (protocol.LOAD_PROFILES, {'last': 3},
+     sealed(0x0D, 0x07, 0xA4, 0xF0, 0x01, 0x03)),
+    (protocol.SELECT_PROFILE, {'profile': 2},
+     sealed(0x0D, 0x06, 0xA9, 0xF0, 0x02)),
+    (protocol.BEVERAGE_STOP, {'recipe': 1},
+     sealed(0x0D, 0x08, 0x83, 0xF0, 0x01, 0x02, 0x06)),
+])
+def test_render(request_, values, expected):
+    """Requests render to the recorded frames."""
+    assert request_.render(**values) == expected
+
+
+def test_render_checks_fields():
+    """Missing, unknown and out of range fields are refused."""
+    with pytest.raises(TypeError):
+        protocol.SET_TIME.render(hour=7)
+    with pytest.raises(TypeError):
+        protocol.SET_TIME.render(hour=7, minute=0, second=0)
+    with pytest.raises(ProtocolError):
+        protocol.SET_TIME.render(hour=7, minute=256)
+
+
+def test_seal_payload():
+    """Sealing appends the big-endian CRC."""
+    assert seal_payload(b'\x0d\x05\x75\x0f') == sealed(0x0D, 0x05, 0x75, 0x0F)
+
+
+def test_render_reuses_buffer_safely():
+    """Renders do not leak values into each other."""
+    first = protocol.SELECT_PROFILE.render(profile=1)
+    protocol.SELECT_PROFILE.render(profile=4)
+    assert protocol.SELECT_PROFILE.render(profile=1) == first
+
+
+def test_field_outside_payload():
+    """A field must lie inside the request body."""
+    with pytest.raises(ValueError):
+        Request('broken', 0x01, bytes((0x0F,)), value=Field(5, 'B'))
+
+
+def test_decode_monitor_v2():
+    """Little-endian words and single bytes are decoded."""
+    frame = sealed(
+        0xD0, 0x12, 0x75, 0x0F, 0x04, 0x05, 0x01, 0x40, 0x02, 0x07, 0x03,
+        0x64, 0x10, 0x20, 0x00, 0x00, 0x00
+    )
+    fields = protocol.MONITOR_V2.decode(frame)
+    assert fields.nozzle_state == 0x04
+    assert fields.switches == 0x0105
+    assert fields.alarms_low == 0x0240
+    assert fields.status == 0x07
+    assert fields.sub_status == 0x03
+    assert fields.alarms_high == 0x2010
+
+
+def test_decode_monitor_v1_overlapping_fields():
+    """Fields sharing a byte are decoded one by one."""
+    frame = sealed(
+        0xD0, 0x0C, 0x70, 0x0F, 0x01, 0x02, 0x00, 0x00, 0x07, 0x05, 0x01
+    )
+    fields = protocol.MONITOR_V1.decode(frame)
+    assert fields.alarms == 0x0201
+    assert fields.status == 0x07
+    assert fields.switches == 0x0105
+    assert fields.sub_status == 0x05
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda frame: frame[:-1], 'bytes'),
+    (lambda frame: b'\x0d' + frame[1:], 'header'),
+    (lambda frame: frame[:2] + b'\xa4' + frame[3:], 'header'),
+    (lambda frame: frame[:1] + b'\x20' + frame[2:], 'length'),
+    (lambda frame: frame[:-1] + bytes((frame[-1] ^ 1,)), 'CRC'),
+])
+def test_validate_rejects_malformed(change, message):
+    """Start byte, message id, length and CRC are checked."""
+    frame = sealed(0xD0, 0x07, 0xA9, 0xF0, 0x02, 0x00)
+    protocol.SELECT_PROFILE_ANSWER.validate(frame)
+    with pytest.raises(ProtocolError, match=message):
+        protocol.SELECT_PROFILE_ANSWER.decode(change(frame))
+
+
+def test_iter_records_ignores_partial_record():
+    """Trailing bytes shorter than a record are skipped."""
+    name = 'Mario'.encode('utf-16-be').ljust(20, b'\x00')
+    body = b'\xf0' + name + b'\x01' + bytes(5)
+    frame = sealed(0xD0, len(body) + 4, 0xA4, *body)
+    assert list(protocol.PROFILES_ANSWER.iter_records(frame)) == [
+        (name, 1)
+    ]
+
+
+def test_iter_records_accepts_short_last_record():
+    """The last profile name may come without its trailing byte."""
+    first = 'Mario'.encode('utf-16-be').ljust(20, b'\x00')
+    last = 'Anna'.encode('utf-16-be').ljust(20, b'\x00')
+    body = b'\xf0' + first + b'\x01' + last
+    frame = sealed(0xD0, len(body) + 4, 0xA4, *body)
+    assert list(protocol.PROFILES_ANSWER.iter_records(frame)) == [
+        (first, 1), (last, 0)
+    ]
+
+
+def test_iter_records_without_records():
+    """Only answers with a repeated group have records."""
+    frame = sealed(0xD0, 0x07, 0xA9, 0xF0, 0x02, 0x00)
+    with pytest.raises(TypeError):
+        list(protocol.SELECT_PROFILE_ANSWER.iter_records(frame))
+
+
+def test_min_size_covers_fields():
+    """The minimum size includes the last field and the CRC."""
+    answer = Answer('example', 0x01, value=Field(6, '>H'))
+    assert answer.min_size == 10
+
+
+def test_answers_by_id():
+    """Every answer is registered by its message id."""
+    assert protocol.ANSWERS[0x75] is protocol.MONITOR_V2
+    assert protocol.ANSWERS[0xA2] is protocol.STATISTICS_ANSWER
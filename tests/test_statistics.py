@@ -0,0 +1,174 @@
+"""Tests for the statistics read planners, parser and scheduler."""
+
+import asyncio
+
+import pytest
+
+from custom_components.delonghi_primadonna.protocol import (ProtocolError,
+                                                            seal_payload)
+from custom_components.delonghi_primadonna.statistics import (
+    MAX_DISCOVERY_COUNT, MAX_RANGE_COUNT, StatisticsScheduler,
+    apply_derived_metrics, iter_statistics, plan_ranges, plan_sparse_ranges,
+    source_parameters)
+
+
+def covered(ranges):
+    """Return every id read by the ranges."""
+    return {
+        param_id
+        for start, count in ranges
+        for param_id in range(start, start + count)
+    }
+
+
+def test_plan_ranges_merges_nearby_ids():
+    """Ids within one read width share a read."""
+    assert plan_ranges([3000, 3001, 3009, 3010, 105]) == [
+        (105, 1), (3000, 10), (3010, 1)
+    ]
+
+
+def test_plan_ranges_empty():
+    """Nothing to read gives no reads."""
+    assert plan_ranges([]) == []
+
+
+@pytest.mark.parametrize('max_count', [1, 3, MAX_RANGE_COUNT])
+def test_plan_ranges_covers_every_id(max_count):
+    """Every id is read and no read is wider than allowed."""
+    ids = [1, 2, 7, 8, 9, 15, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50]
+    ranges = plan_ranges(ids, max_count)
+    assert covered(ranges) >= set(ids)
+    assert all(1 <= count <= max_count for _, count in ranges)
+    assert [start for start, _ in ranges] == sorted(
+        start for start, _ in ranges
+    )
+
+
+def test_plan_sparse_ranges_skips_missing_ids():
+    """Ids the machine does not have are not read."""
+    ranges = plan_sparse_ranges(
+        [100, 101, 150, 3000, 3005], populated=[100, 150, 3000, 3005]
+    )
+    assert ranges == [(100, 1), (150, 1), (3000, 6)]
+
+
+def test_plan_sparse_ranges_stretches_to_width():
+    """A read spans up to the discovery width."""
+    populated = [3000, 3000 + MAX_DISCOVERY_COUNT - 1,
+                 3000 + MAX_DISCOVERY_COUNT]
+    assert plan_sparse_ranges(populated, populated) == [
+        (3000, MAX_DISCOVERY_COUNT), (3000 + MAX_DISCOVERY_COUNT, 1)
+    ]
+
+
+def test_plan_sparse_ranges_nothing_populated():
+    """Without populated ids nothing is read."""
+    assert plan_sparse_ranges([100, 101], populated=[]) == []
+
+
+def statistics_answer(start, values):
+    """Return a 0xA2 answer carrying ``(id, value)`` records."""
+    body = bytearray((0xD0, 0, 0xA2, 0x0F))
+    for param_id, value in [(start, values[start])] + [
+        item for item in values.items() if item[0] != start
+    ]:
+        body += param_id.to_bytes(2, 'big') + value.to_bytes(4, 'big')
+    body[1] = len(body) + 1
+    return seal_payload(bytes(body))
+
+
+def test_iter_statistics():
+    """Records are read as id and value pairs."""
+    frame = statistics_answer(3000, {3000: 12, 3002: 5, 3077: 1})
+    assert list(iter_statistics(frame)) == [(3000, 12), (3002, 5), (3077, 1)]
+
+
+def test_iter_statistics_rejects_bad_crc():
+    """A corrupted answer is refused."""
+    frame = bytearray(statistics_answer(100, {100: 1}))
+    frame[-1] ^= 0xFF
+    with pytest.raises(ProtocolError):
+        list(iter_statistics(bytes(frame)))
+
+
+def test_derived_metrics():
+    """Derived values follow their sources."""
+    statistics = {3000: 10, 3077: 4, 106: 5000}
+    apply_derived_metrics(statistics, [3000, 106])
+    assert statistics[-3077] == 14
+    assert statistics[10106] == 2.5
+    assert source_parameters([-3077, 10106, 105]) == {3000, 3077, 106, 105}
+
+
+class Catalogue:
+    """Catalogue keeping discovered parameters in memory."""
+
+    def __init__(self):
+        self.models = {}
+
+    def get(self, product_code):
+        return self.models.get(product_code)
+
+    def async_set(self, product_code, populated, count):
+        self.models[product_code] = (sorted(populated), count)
+
+
+def test_failed_discovery_is_retried_once_the_machine_answers():
+    """Discovery runs again after a refresh that got answers."""
+    answering = False
+    reads = []
+
+    async def read(start, count):
+        reads.append((start, count))
+        if not answering:
+            return None
+        return statistics_answer(start, {start: 1})
+
+    async def run():
+        nonlocal answering
+        catalogue = Catalogue()
+        scheduler = StatisticsScheduler(
+            None, read, lambda: True, '0132215332', catalogue
+        )
+        scheduler._ranges = [(105, 1)]
+        await scheduler._async_refresh()
+        assert scheduler.populated is None
+        # A failed discovery is not repeated while reads go unanswered
+        reads.clear()
+        await scheduler._async_refresh()
+        assert reads == [(105, 1)]
+        answering = True
+        await scheduler._async_refresh()
+        assert scheduler.populated is None
+        await scheduler._async_refresh()
+        assert scheduler.populated is not None
+        assert catalogue.get('0132215332') is not None
+
+    asyncio.run(run())
+
+
+def test_discovery_keeps_block_start_and_registered_ids():
+    """A zero at a block start and ids discovery missed are still read."""
+    machine = {100: 7, 101: 3, 3000: 0, 3001: 2}
+
+    async def read(start, count):
+        values = {start: machine.get(start, 0)}
+        values.update(
+            (param_id, value) for param_id, value in machine.items()
+            if start < param_id < start + count
+        )
+        return statistics_answer(start, values)
+
+    async def run():
+        catalogue = Catalogue()
+        scheduler = StatisticsScheduler(
+            None, read, lambda: True, '0132215332', catalogue
+        )
+        scheduler._params.update((100, 150))
+        await scheduler._async_discover()
+        assert scheduler.populated == [100, 101, 3000, 3001]
+        assert catalogue.get('0132215332')[0] == scheduler.populated
+        assert {100, 150, 3000, 3001} <= covered(scheduler._ranges)
+
+    asyncio.run(run())